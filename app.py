@@ -1,10 +1,36 @@
+import contextlib
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import numpy as np
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode, JsCode
+from datetime import datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from shift_optimizer.engine import ExpectedHCEngine
+from shift_optimizer.formatting import format_table_value
+from shift_optimizer.planning import (
+    HC_GRID_ROWS,
+    ROSTER_PAGE_SIZES,
+    build_hc_grid_frame,
+    calculate_dynamic_metrics,
+    create_shift_breakdown_text,
+    filter_employee_data_by_selections,
+    generate_dynamic_table_data,
+    get_gap_status_info,
+    normalize_filter_selection,
+    page_employee_data_by_selections,
+    patch_hc_grid_column,
+    roster_filter_options,
+    should_show_alert,
+    validate_and_adjust_totals,
+)
+from shift_optimizer.rollup import RollupEngine
+from shift_optimizer.archive import archive_root, rollup_observed
+from shift_optimizer.dataset import load_roster, roster_source, source_fingerprint
+from shift_optimizer.memory import SessionMemoryAccountant, process_session_bytes
+from shift_optimizer.profiling import annotate, phase, profile_log_path, profile_run, profiling_enabled
+from shift_optimizer.sample_data import DEFAULT_DEPARTMENTS
+from shift_optimizer.tracing import traced
+from shift_optimizer.seeding import seeded_rng
 
 # Page configuration
 st.set_page_config(
@@ -170,22 +196,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+
 # Initialize session state for data
 if 'data_initialized' not in st.session_state:
     st.session_state.data_initialized = True
     # Initialize view toggle - updated to 4 views
     st.session_state.current_view = "Shift Summary"
     
-    # Sample data based on the mockup - exact values from PDF
-    st.session_state.departments = {
-        'Kitchen': -7,
-        'Production': 7,
-        'Sanitation': 10,
-        'Quality': 0,
-        'Warehouse': -2,
-        'Fulfillment': 0,
-        'Shipping': 5
-    }
+    st.session_state.departments = dict(DEFAULT_DEPARTMENTS)
     
     # Initialize hedge attendance rates storage
     # Key format: "2026-02-12_1st" (date_shift)
@@ -198,125 +216,119 @@ if 'data_initialized' not in st.session_state:
     st.session_state.page_view = "Rollup View"
 
 
- 
-    st.session_state.employee_data = [
-        # Kitchen Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'EMP001', 'Employee Name': 'John Smith', 'Hire Date': '2023-01-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'EMP002', 'Employee Name': 'Mary Davis', 'Hire Date': '2022-08-20', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP101', 'Employee Name': 'Mike Wilson', 'Hire Date': '2026-02-01', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'EMP005', 'Employee Name': 'Carlos Rodriguez', 'Hire Date': '2023-11-08', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'EMP003', 'Employee Name': 'Lisa Brown', 'Hire Date': '2021-12-10', 'Workday Schedule': '14:00-22:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'NEW HIRES', 'Employee ID': 'NEW001', 'Employee Name': 'David Garcia', 'Hire Date': '2026-02-10', 'Workday Schedule': '14:00-22:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Training'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'TEMP', 'Employee ID': 'TMP102', 'Employee Name': 'Amanda Taylor', 'Hire Date': '2026-01-28', 'Workday Schedule': '14:00-22:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'EMP004', 'Employee Name': 'Jennifer Lee', 'Hire Date': '2023-06-05', 'Workday Schedule': '22:00-06:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FLEX', 'Employee ID': 'FLX201', 'Employee Name': 'Robert Martinez', 'Hire Date': '2024-03-12', 'Workday Schedule': '22:00-06:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Flexible'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'EMP006', 'Employee Name': 'Patricia White', 'Hire Date': '2022-05-18', 'Workday Schedule': '22:00-06:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
-        
-        # Production Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'PRD001', 'Employee Name': 'James Wilson', 'Hire Date': '2023-03-22', 'Workday Schedule': '06:00-14:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'PRD002', 'Employee Name': 'Emma Johnson', 'Hire Date': '2022-11-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP201', 'Employee Name': 'Kevin Chen', 'Hire Date': '2026-01-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'PRD003', 'Employee Name': 'Rachel Adams', 'Hire Date': '2023-07-10', 'Workday Schedule': '14:00-22:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FLEX', 'Employee ID': 'FLX301', 'Employee Name': 'Anthony Davis', 'Hire Date': '2024-01-08', 'Workday Schedule': '14:00-22:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Flexible'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'PRD004', 'Employee Name': 'Stephanie Lee', 'Hire Date': '2022-09-05', 'Workday Schedule': '22:00-06:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
-        
-        # Sanitation Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'SAN001', 'Employee Name': 'Daniel Brown', 'Hire Date': '2023-02-14', 'Workday Schedule': '06:00-14:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP301', 'Employee Name': 'Maria Gonzalez', 'Hire Date': '2026-01-20', 'Workday Schedule': '06:00-14:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'SAN002', 'Employee Name': 'Christopher Moore', 'Hire Date': '2023-05-30', 'Workday Schedule': '14:00-22:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'SAN003', 'Employee Name': 'Jessica Taylor', 'Hire Date': '2022-12-12', 'Workday Schedule': '22:00-06:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
-        
-        # Quality Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'QUA001', 'Employee Name': 'Thomas Anderson', 'Hire Date': '2023-04-18', 'Workday Schedule': '06:00-14:00', 'Department': 'Quality', 'Manager': 'Janet Wilson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'QUA002', 'Employee Name': 'Nicole Martinez', 'Hire Date': '2022-10-25', 'Workday Schedule': '06:00-14:00', 'Department': 'Quality', 'Manager': 'Janet Wilson', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'NEW HIRES', 'Employee ID': 'NEW002', 'Employee Name': 'Brian Clark', 'Hire Date': '2026-02-05', 'Workday Schedule': '14:00-22:00', 'Department': 'Quality', 'Manager': 'Janet Wilson', 'Roster Bucket': 'Training'},
-        
-        # Warehouse Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'WHR001', 'Employee Name': 'Matthew Garcia', 'Hire Date': '2023-01-30', 'Workday Schedule': '06:00-14:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'WHR002', 'Employee Name': 'Ashley Thompson', 'Hire Date': '2022-08-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP401', 'Employee Name': 'Ryan Miller', 'Hire Date': '2026-01-25', 'Workday Schedule': '06:00-14:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'WHR003', 'Employee Name': 'Michelle White', 'Hire Date': '2023-06-20', 'Workday Schedule': '14:00-22:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FLEX', 'Employee ID': 'FLX401', 'Employee Name': 'Steven Lopez', 'Hire Date': '2024-02-14', 'Workday Schedule': '22:00-06:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Flexible'},
-        
-        # Fulfillment Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'FUL001', 'Employee Name': 'Amanda Rodriguez', 'Hire Date': '2023-03-08', 'Workday Schedule': '06:00-14:00', 'Department': 'Fulfillment', 'Manager': 'David Chang', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP501', 'Employee Name': 'Jonathan Smith', 'Hire Date': '2026-02-08', 'Workday Schedule': '06:00-14:00', 'Department': 'Fulfillment', 'Manager': 'David Chang', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'FUL002', 'Employee Name': 'Samantha Davis', 'Hire Date': '2022-11-30', 'Workday Schedule': '14:00-22:00', 'Department': 'Fulfillment', 'Manager': 'David Chang', 'Roster Bucket': 'Active'},
-        
-        # Shipping Department
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'SHP001', 'Employee Name': 'Gregory Wilson', 'Hire Date': '2023-05-12', 'Workday Schedule': '06:00-14:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'SHP002', 'Employee Name': 'Kimberly Johnson', 'Hire Date': '2022-07-22', 'Workday Schedule': '06:00-14:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'TEMP', 'Employee ID': 'TMP601', 'Employee Name': 'Eric Brown', 'Hire Date': '2026-01-18', 'Workday Schedule': '14:00-22:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Active'},
-        {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'NEW HIRES', 'Employee ID': 'NEW003', 'Employee Name': 'Catherine Martinez', 'Hire Date': '2026-02-12', 'Workday Schedule': '14:00-22:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Training'},
-    ]
+@st.cache_resource(max_entries=1, show_spinner="Loading roster...")
+def load_shared_roster(fingerprint, path):
+    """One read-only roster per server process, shared by every session
+
+    Keyed on the source fingerprint, so editing the roster file loads a new copy
+    and evicts the old one. Sessions never mutate it (filters return copies).
+    """
+    return load_roster(path)
+
+
+def get_roster():
+    """Columnar, indexed roster shared by the filters and the roster details table"""
+    path = roster_source()
+    return load_shared_roster(source_fingerprint(path), path)
+
+
+# Profiled reruns kept in the session for the sidebar panel
+PROFILE_HISTORY = 20
+
+# Session entries the app rebuilds when missing; the only ones evicted when a session is over budget
+DERIVED_SESSION_KEYS = ('planning_state', 'rollup_engine', 'rerun_profiles')
+
+
+def get_memory_accountant():
+    """This session's memory accountant (budget from SHIFT_OPTIMIZER_SESSION_BUDGET_MB)"""
+    if 'memory_accountant' not in st.session_state:
+        st.session_state.memory_accountant = SessionMemoryAccountant(DERIVED_SESSION_KEYS)
+    return st.session_state.memory_accountant
+
+
+def forward_msg_element(msg):
+    """Element type a message to the browser carries: markdown, plotly_chart, component:<name>, ..."""
+    kind = msg.WhichOneof('type')
+    if kind != 'delta':
+        return kind
+    delta_kind = msg.delta.WhichOneof('type')
+    if delta_kind != 'new_element':
+        return delta_kind
+    element = msg.delta.new_element
+    element_kind = element.WhichOneof('type')
+    if element_kind == 'component_instance':
+        return f"component:{element.component_instance.component_name}"
+    return element_kind
+
+
+@contextlib.contextmanager
+def profiled(run):
+    """Profile a rerun (shift_optimizer.profiling) including the size of every message sent to the browser
     
-    # Add punch data to employees
-    import random
-    random.seed(42)  # Consistent punch data
-    
-    # Punch rates should be very close to attendance assumptions (±1-3% variance)
-    # This ensures Actual Punches ≈ Expected HC
-    punch_rates = {
-        'FTE': 0.91,          # Attendance assumption ~90%, so 91% is 1% over
-        'TEMP': 0.86,         # Attendance assumption ~84%, so 86% is 2% over
-        'NEW HIRES': 0.48,    # Show up rate ~50%, so 48% is 2% under
-        'FLEX': 0.51,         # Show up rate ~50%, so 51% is 1% over
-        'WW/GS': 0.99         # Show up rate ~100%, so 99% is 1% under
-    }
-    
-    for emp in st.session_state.employee_data:
-        worker_type = emp['Worker Type']
-        punch_rate = punch_rates.get(worker_type, 0.90)
-        
-        # Determine if employee punched in
-        punched_in = random.random() < punch_rate
-        emp['Punched_In'] = punched_in
-        
-        if punched_in:
-            # Parse schedule to add variance to punch times
-            schedule = emp['Workday Schedule']
-            start_time, end_time = schedule.split('-')
-            start_hour, start_min = map(int, start_time.split(':'))
-            end_hour, end_min = map(int, end_time.split(':'))
-            
-            # Add random variance to punch times (±5 minutes)
-            punch_variance = random.randint(-5, 5)
-            punch_hour = start_hour
-            punch_min = start_min + punch_variance
-            
-            # Handle minute overflow
-            if punch_min >= 60:
-                punch_hour += 1
-                punch_min -= 60
-            elif punch_min < 0:
-                punch_hour -= 1
-                punch_min += 60
-            
-            emp['Punch_Time'] = f"{punch_hour:02d}:{punch_min:02d}"
-            
-            # Calculate hours worked (with small variance)
-            scheduled_hours = ((end_hour * 60 + end_min) - (start_hour * 60 + start_min)) / 60
-            hours_variance = random.uniform(-0.25, 0.25)
-            hours_worked = round(scheduled_hours + hours_variance, 2)
-            emp['Hours_Worked'] = hours_worked
-            
-            # Punch out time
-            punch_out_variance = random.randint(-5, 5)
-            punch_out_hour = end_hour
-            punch_out_min = end_min + punch_out_variance
-            
-            if punch_out_min >= 60:
-                punch_out_hour += 1
-                punch_out_min -= 60
-            elif punch_out_min < 0:
-                punch_out_hour -= 1
-                punch_out_min += 60
-                
-            emp['Punch_Out_Time'] = f"{punch_out_hour:02d}:{punch_out_min:02d}"
-        else:
-            emp['Punch_Time'] = None
-            emp['Punch_Out_Time'] = None
-            emp['Hours_Worked'] = 0
+    Usable as a decorator; a fragment decorated with it gets its own profile on a
+    fragment rerun and is timed as a phase of the full rerun otherwise.
+    """
+    ctx = get_script_run_ctx()
+    with profile_run(run, session=ctx.session_id if ctx is not None else None) as profile:
+        if profile is None or ctx is None:
+            yield
+            return
+        
+        # Wrap this session's outgoing message queue to record each message's serialized size.
+        # _enqueue is private to Streamlit; where a release lacks it, only phase timings are recorded.
+        send = ctx._enqueue if hasattr(ctx, '_enqueue') else None
+        if send is not None:
+            def enqueue(msg):
+                profile.payload(forward_msg_element(msg), msg.ByteSize())
+                send(msg)
+
+            ctx._enqueue = enqueue
+        try:
+            yield
+        finally:
+            if send is not None:
+                ctx._enqueue = send
+            history = st.session_state.setdefault('rerun_profiles', [])
+            history.append(profile)
+            del history[:-PROFILE_HISTORY]
+            get_memory_accountant().touch('rerun_profiles')
+
+
+def render_profile_panel():
+    """Sidebar debug panel: phase timings and payload sizes of the latest profiled rerun"""
+    profiles = st.session_state.get('rerun_profiles', [])
+    with st.sidebar.expander("⏱️ Rerun profile", expanded=True):
+        if not profiles:
+            st.caption("No profiled reruns yet.")
+            return
+        
+        latest = profiles[-1].record()
+        st.markdown(f"**{latest['run']}** - {latest['ms']:.0f} ms, {latest['payload_bytes'] / 1024:.1f} KiB sent")
+        st.dataframe(pd.DataFrame(latest['phases'], columns=['phase', 'ms', 'calls']), hide_index=True)
+        
+        payloads = pd.DataFrame(latest['payloads'], columns=['phase', 'element', 'bytes', 'messages'])
+        payloads['KiB'] = (payloads['bytes'] / 1024).round(1)
+        st.dataframe(payloads.sort_values('bytes', ascending=False)[['phase', 'element', 'messages', 'KiB']],
+                     hide_index=True)
+        
+        # Fragment reruns can't draw in the sidebar; they show up here on the next full rerun
+        st.markdown("**Recent reruns**")
+        recent = pd.DataFrame([
+            {'run': profile.run, 'ms': round(profile.seconds * 1000, 1), 'KiB': round(profile.payload_bytes / 1024, 1)}
+            for profile in reversed(profiles)
+        ])
+        st.dataframe(recent, hide_index=True)
+        st.caption(f"Logged to {profile_log_path()}")
+        
+        accountant = get_memory_accountant()
+        sessions, process_bytes = process_session_bytes()
+        st.markdown(f"**Session state** - {accountant.total_bytes / 2**20:.2f} of {accountant.budget_bytes / 2**20:.0f} MiB "
+                    f"({sessions} sessions, {process_bytes / 2**20:.1f} MiB in this process)")
+        sizes = pd.DataFrame(sorted(accountant.sizes.items(), key=lambda item: -item[1]), columns=['entry', 'bytes'])
+        sizes['KiB'] = (sizes['bytes'] / 1024).round(1)
+        st.dataframe(sizes[['entry', 'KiB']], hide_index=True)
+        if accountant.evicted:
+            st.caption(f"Evicted to stay under budget: {', '.join(accountant.evicted)}")
 
 
 def calculate_metrics():
@@ -333,8 +345,10 @@ def calculate_metrics():
         'gap_percentage': gap_percentage
     }
 
+@traced
 def create_plotly_table_with_tooltips(df, hover_data=None):
     """Create a Plotly table with hover tooltips"""
+    import plotly.graph_objects as go
     
     # Prepare header values
     headers = list(df.columns)
@@ -379,6 +393,7 @@ def create_plotly_table_with_tooltips(df, hover_data=None):
 
 def create_transposed_shift_summary_table_with_tooltips(filtered_data=None):
     """Create transposed shift summary table matching the screenshot structure"""
+    import plotly.graph_objects as go
     
     # Use filtered data if provided, otherwise use all data
     data_to_use = filtered_data if filtered_data else st.session_state.shift_summary_transposed
@@ -400,7 +415,7 @@ def create_transposed_shift_summary_table_with_tooltips(filtered_data=None):
         
         for col in columns:
             value = st.session_state.shift_summary_transposed[col][row_name]
-            row_data.append(str(value))
+            row_data.append(str(format_table_value(row_name, value)))
             
             # Add tooltip data based on the row type
             if row_name == 'Total Needed':
@@ -468,7 +483,7 @@ def create_transposed_shift_summary_table_with_tooltips(filtered_data=None):
         ),
         cells=dict(
             values=[['Total Needed', 'Total Expected', 'Total Gap', 'Total Attendance Assumption', 'Total Punches']] + 
-                   [[data_to_use[col][row] for row in rows] for col in columns],
+                   [[format_table_value(row, data_to_use[col][row]) for row in rows] for col in columns],
             fill_color=[['#f9f9f9'] * len(rows)] + 
                       [['white' for row in rows] for col in columns],
             align='center',
@@ -487,6 +502,7 @@ def create_transposed_shift_summary_table_with_tooltips(filtered_data=None):
 
 def create_weekly_hc_details_table_with_tooltips():
     """Create transposed HC details table matching the screenshot structure"""
+    import plotly.graph_objects as go
     
     # Prepare the transposed structure
     columns = list(st.session_state.weekly_hc_details_transposed.keys())
@@ -522,6 +538,7 @@ def create_weekly_hc_details_table_with_tooltips():
 
 def create_transposed_attendance_assumptions_table(filtered_data=None):
     """Create transposed attendance assumptions table matching the screenshot structure - UPDATED TO USE TRANSPOSED VERSION"""
+    import plotly.graph_objects as go
     
     # Use filtered data if provided, otherwise use all data
     data_to_use = filtered_data if filtered_data else st.session_state.attendance_assumptions_transposed
@@ -556,7 +573,7 @@ def create_transposed_attendance_assumptions_table(filtered_data=None):
         col_values = []
         col_colors = []
         for row in rows:
-            value = data_to_use[col][row]
+            value = format_table_value(row, data_to_use[col][row])
             col_values.append(value)
             col_colors.append('white')
         cell_values.append(col_values)
@@ -590,6 +607,7 @@ def create_transposed_attendance_assumptions_table(filtered_data=None):
 
 def create_transposed_hc_details_table_with_tooltips(filtered_data=None):
     """Create transposed HC details table matching the screenshot structure"""
+    import plotly.graph_objects as go
     
     # Use filtered data if provided, otherwise use all data
     data_to_use = filtered_data if filtered_data else st.session_state.weekly_hc_details_transposed
@@ -638,101 +656,20 @@ def create_employee_details_table_with_tooltips(selected_dept, filtered_employee
     """Create employee details table with exact columns and tooltips"""
     # Use filtered employees if provided, otherwise filter by department only
     if filtered_employees is not None:
-        filtered_data = filtered_employees
+        df = filtered_employees
     else:
-        filtered_data = [emp for emp in st.session_state.employee_data if emp['Department'] == selected_dept]
+        df = get_roster().filter(selected_dept)
     
-    if not filtered_data:
+    if df.empty:
         return None
     
-    # Create DataFrame with exact columns: Week, Day/Shift, Worker Type, Employee ID, Employee Name, Hire Date, Workday Schedule, Department, Manager, Roster Bucket
-    df = pd.DataFrame(filtered_data)
+    # Columns: Week, Day/Shift, Worker Type, Employee ID, Employee Name, Hire Date, Workday Schedule, Department, Manager, Roster Bucket
     return create_plotly_table_with_tooltips(df)
 
 def create_employee_details_table(selected_dept):
     """Create employee details table for selected department"""
     # Filter employees by department
-    filtered_data = [emp for emp in st.session_state.employee_data if emp['Department'] == selected_dept]
-    df = pd.DataFrame(filtered_data)
-    return df
-
-def calculate_dynamic_metrics(location, department, week, selected_date, shifts):
-    """Calculate dynamic metrics based on filter selections"""
-    
-    # Base metrics that vary by location
-    base_metrics = {
-        "AZ Goodyear": {"needed": 100, "expected": 80, "gap": 20},
-        "IL Aurora": {"needed": 85, "expected": 75, "gap": 10}, 
-        "AZ Phoenix": {"needed": 120, "expected": 95, "gap": 25},
-        "IL Lake Zurich": {"needed": 90, "expected": 85, "gap": 5},
-        "IL Burr Ridge": {"needed": 75, "expected": 70, "gap": 5}
-    }
-    
-    # Department multipliers
-    dept_multipliers = {
-        "Kitchen": 1.0,
-        "Production": 0.8,
-        "Sanitation": 0.6,
-        "Quality": 0.4,
-        "Warehouse": 0.9,
-        "Fulfillment": 0.7,
-        "Shipping": 0.5
-    }
-    
-    # Week variations (recent weeks have different patterns)
-    week_variations = {
-        "2026-W08": 1.0,
-        "2026-W07": 0.95,
-        "2026-W09": 1.05,
-        "2026-W06": 0.9,
-        "2026-W10": 1.1
-    }
-    
-    # Shift adjustments (fewer shifts selected = lower numbers)
-    shift_multiplier = len(shifts) / 3.0 if shifts else 1.0
-    
-    # Get base metrics for location
-    base = base_metrics.get(location, base_metrics["AZ Goodyear"])
-    
-    # Apply all multipliers
-    dept_mult = dept_multipliers.get(department, 1.0)
-    week_mult = week_variations.get(week, 1.0)
-    
-    # Calculate final metrics
-    needed = int(base["needed"] * dept_mult * week_mult * shift_multiplier)
-    expected = int(base["expected"] * dept_mult * week_mult * shift_multiplier)
-    gap = needed - expected
-    
-    # Calculate percentage changes vs "last week"
-    needed_change = int((week_mult - 0.95) * 100)  # Simulate vs previous week
-    expected_change = int((week_mult - 0.9) * 100 + 10)  # Different baseline
-    
-    gap_change = 3  # Default gap change vs previous week
-    
-    # Calculate punches (approximately 90-95% of expected)
-    punches = int(expected * 0.92)
-    punches_change = 4  # Default punches change vs previous week
-    
-    return {
-        "needed": needed,
-        "expected": expected, 
-        "gap": gap,
-        "needed_change": needed_change,
-        "expected_change": expected_change,
-        "gap_change": gap_change,
-        "punches": punches,
-        "punches_change": punches_change,
-        "gap_percentage": int((gap / needed * 100)) if needed > 0 else 0
-    }
-
-def get_gap_status_info(gap, gap_percentage):
-    """Get gap status with appropriate styling and messaging"""
-    if gap == 0:
-        return "✅ Fully Staffed", "gap-neutral", "#28a745"
-    elif gap > 0:
-        return f"↘️ Understaffed by {abs(gap_percentage)}%", "gap-negative", "#dc3545"
-    else:
-        return f"📊 Overstaffed by {abs(gap_percentage)}%", "gap-positive", "#28a745"
+    return get_roster().filter(selected_dept)
 
 def create_attendance_html_table_with_tooltips(filtered_attendance_data):
     """Create HTML table with tooltips for attendance assumption data - transposed structure"""
@@ -830,7 +767,7 @@ def create_attendance_html_table_with_tooltips(filtered_attendance_data):
         
         for shift_key in sorted(columns):
             data = filtered_attendance_data[shift_key]
-            value = data[row_name]
+            value = format_table_value(row_name, data[row_name])
             
             # Get appropriate tooltip
             tooltip = ""
@@ -1145,7 +1082,7 @@ def create_shift_summary_html_table_with_tooltips(filtered_shift_data):
         
         for shift_key in sorted(columns):
             data = filtered_shift_data[shift_key]
-            value = data[row_name]
+            value = format_table_value(row_name, data[row_name])
             
             # Get appropriate tooltip
             tooltip = ""
@@ -1298,7 +1235,7 @@ def create_html_table_with_tooltips(data_dict, rows, table_title, tooltip_mappin
         html_content += f"<td class='row-header'>{row}</td>"
         
         for col in columns:
-            value = data_dict[col].get(row, '')
+            value = format_table_value(row, data_dict[col].get(row, ''))
             tooltip_text = ""
             
             # Get tooltip text based on mapping
@@ -1365,133 +1302,8 @@ def render_metric_with_tooltip(metric_name: str, tooltip_text: str):
         unsafe_allow_html=True,
     )
 
-def should_show_alert(gap, gap_percentage):
-    """Determine if critical staffing alert should be shown"""
-    return gap > 0 and abs(gap_percentage) >= 15  # Show alert if understaffed by 15% or more
-
-def generate_dynamic_table_data(location, department, week, selected_dates, shifts):
-    """Generate dynamic table data based on all filter selections"""
-    
-    # Base multipliers by location (similar to Overview section)
-    location_multipliers = {
-        "AZ Goodyear": 1.0,
-        "IL Aurora": 0.85, 
-        "AZ Phoenix": 1.2,
-        "IL Lake Zurich": 0.9,
-        "IL Burr Ridge": 0.75
-    }
-    
-    # Department multipliers
-    dept_multipliers = {
-        "Kitchen": 1.0,
-        "Production": 0.8,
-        "Sanitation": 0.6,
-        "Quality": 0.4,
-        "Warehouse": 0.9,
-        "Fulfillment": 0.7,
-        "Shipping": 0.5
-    }
-    
-    # Week variations
-    week_variations = {
-        "2026-W08": 1.0,
-        "2026-W07": 0.95,
-        "2026-W09": 1.05,
-        "2026-W06": 0.9,
-        "2026-W10": 1.1
-    }
-    
-    # Get multipliers
-    loc_mult = location_multipliers.get(location, 1.0)
-    dept_mult = dept_multipliers.get(department, 1.0)
-    week_mult = week_variations.get(week, 1.0)
-    
-    # Shift multipliers - different staffing levels per shift
-    shift_multipliers = {
-        "1st": 1.2,   # Morning shift - typically needs more staff
-        "2nd": 1.0,   # Afternoon shift - standard staffing
-        "3rd": 0.7    # Night shift - typically needs less staff
-    }
-    
-    # Base template data - will be modified by multipliers
-    base_shift_template = {
-        'Total Needed': 91,
-        'Total Expected': 79,
-        'Total Gap': -12,
-        'Total Attendance Assumption': '89%',
-        'Total Punches': 106,
-        'tooltip_needed': 'â€¢ FTE: 35\nâ€¢ TEMP: 35\nâ€¢ WW: 20\nâ€¢ FLEX: 0',
-        'tooltip_expected': '+3% vs prev week',
-        'tooltip_gap': '+3% vs prev week',
-        'tooltip_attendance': '+3% vs prev week',
-        'tooltip_punches': '+3% vs prev week'
-    }
-    
-    base_hc_template = {
-        'FTE': 48,
-        'TEMP': 30,
-        'NEW HIRES': 0,
-        'FLEX': 1,
-        'WW/GS': 0,
-        'VEH/MEH': 2,
-        'PTO': 1,
-        'tooltip_fte': '+15 vs prev week',
-        'tooltip_temp': '+3% vs prev week'
-    }
-    
-    base_attendance_template = {
-        'FTE Attendance Assumption': '90%',
-        'TEMP Attendance Assumption': '84%',
-        'NEW HIRES Show Up Rate': '50%',
-        'FLEX Show Up Rate': '50%',
-        'WW/GS Show Up Rate': '100.00%',
-        'VEH Show Up Rate': '80.00%',
-        'PTO Rate': '50%',
-        'tooltip_fte': '+15% vs prev week',
-        'tooltip_temp': '+3% vs prev week'
-    }
-    
-    # Generate dynamic data for each selected date and shift
-    dynamic_shift_data = {}
-    dynamic_hc_data = {}
-    dynamic_attendance_data = {}
-    
-    for selected_date in selected_dates:
-        date_str = selected_date.strftime("%Y-%m-%d")
-        day_str = selected_date.strftime("%a")
-        
-        for shift in shifts:
-            shift_num = shift[0]  # Convert "1st" to "1"
-            key = f"{date_str} {day_str} Shift {shift_num}"
-            
-            # Get shift multiplier
-            shift_mult = shift_multipliers.get(shift, 1.0)
-            
-            # Apply multipliers to shift data
-            shift_data = base_shift_template.copy()
-            shift_data['Total Needed'] = int(shift_data['Total Needed'] * loc_mult * dept_mult * week_mult * shift_mult)
-            shift_data['Total Expected'] = int(shift_data['Total Expected'] * loc_mult * dept_mult * week_mult * shift_mult)
-            shift_data['Total Gap'] = shift_data['Total Expected'] - shift_data['Total Needed']
-            shift_data['Total Punches'] = int(shift_data['Total Punches'] * loc_mult * dept_mult * week_mult * shift_mult)
-            
-            # Add shift data to dictionary
-            dynamic_shift_data[key] = shift_data
-            
-            # Apply multipliers to HC data
-            hc_data = base_hc_template.copy()
-            hc_data['FTE'] = int(hc_data['FTE'] * loc_mult * dept_mult * week_mult * shift_mult)
-            hc_data['TEMP'] = int(hc_data['TEMP'] * loc_mult * dept_mult * week_mult * shift_mult)
-            hc_data['FLEX'] = int(hc_data['FLEX'] * loc_mult * dept_mult * week_mult * shift_mult)
-            
-            dynamic_hc_data[key] = hc_data
-            
-            # Attendance data (percentages don't change much, but can vary slightly)
-            attendance_data = base_attendance_template.copy()
-            dynamic_attendance_data[key] = attendance_data
-    
-    return dynamic_shift_data, dynamic_hc_data, dynamic_attendance_data
-
-def create_combined_hc_attendance_aggrid_table(filtered_hc_data, filtered_attendance_data, expected_hc_total):
+@traced
+def create_combined_hc_attendance_aggrid_table(filtered_hc_data, filtered_attendance_data, expected_hc_total, hc_engine=None):
     """Create combined HC and Attendance Assumption table using AG-Grid with inline editing for hedge row
     
     Returns:
@@ -1501,330 +1313,18 @@ def create_combined_hc_attendance_aggrid_table(filtered_hc_data, filtered_attend
         grid_height: Height of grid
         actual_total: Actual calculated total Expected HC from the table
     """
+    from st_aggrid import GridOptionsBuilder, JsCode
     
-    # Calculate actual punches from employee data
-    # Since sample employee_data is limited, calculate punches as % of Expected HC with realistic variance
-    def calculate_punch_totals_from_expected(filtered_hc_data, filtered_attendance_data):
-        """Calculate actual punch counts based on Expected HC with realistic ±1-3% variance"""
-        import random
-        random.seed(42)  # Consistent results
-        
-        punch_data = {}
-        
-        # Variance rates: slight over/under attendance relative to expectation
-        variance_rates = {
-            'FTE': 1.01,          # 1% over expected
-            'TEMP': 0.98,         # 2% under expected
-            'NEW HIRES': 0.96,    # 4% under expected
-            'FLEX': 1.02,         # 2% over expected
-            'WW/GS': 0.99,        # 1% under expected
-            'VEH/MEH': 1.00,      # Exactly at expected
-            'PTO': 1.00           # Exactly at expected (should be negative anyway)
-        }
-        
-        for shift_key in filtered_hc_data.keys():
-            shift_punches = {}
-            hc_data = filtered_hc_data.get(shift_key, {})
-            attendance_data = filtered_attendance_data.get(shift_key, {})
-            
-            # Get hedge for this shift
-            parts = shift_key.split(' ')
-            date_str = parts[0]
-            shift_num = parts[-1]
-            hedge_key = f"{date_str}_{shift_num}st"
-            hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0.0)
-            try:
-                hedge_rate = float(hedge_rate)
-            except (ValueError, TypeError):
-                hedge_rate = 0.0
-            
-            # Calculate punches for each employee type
-            for emp_type, data_key in [('FTE', 'FTE'), ('TEMP', 'TEMP'), ('NEW HIRES', 'NEW HIRES'), 
-                                       ('FLEX', 'FLEX'), ('WW/GS', 'WW/GS'), ('VEH/MEH', 'VEH/MEH'), ('PTO', 'PTO')]:
-                roster_hc = hc_data.get(data_key, 0)
-                
-                # Get attendance
-                att_keys = {
-                    'FTE': 'FTE Attendance Assumption',
-                    'TEMP': 'TEMP Attendance Assumption',
-                    'NEW HIRES': 'NEW HIRES Show Up Rate',
-                    'FLEX': 'FLEX Show Up Rate',
-                    'WW/GS': 'WW/GS Show Up Rate',
-                    'VEH/MEH': 'VEH Show Up Rate',
-                    'PTO': 'PTO Rate'
-                }
-                attendance_str = attendance_data.get(att_keys.get(emp_type, f'{emp_type} Attendance Assumption'), '0%')
-                attendance_pct = float(attendance_str.rstrip('%')) / 100.0 if attendance_str != 'N/A' else 0
-                
-                # Apply hedge for FTE and TEMP
-                if emp_type in ['FTE', 'TEMP']:
-                    hedged_attendance_pct = attendance_pct + (hedge_rate / 100.0)
-                    hedged_attendance_pct = max(0, min(1, hedged_attendance_pct))
-                else:
-                    hedged_attendance_pct = attendance_pct
-                
-                # Calculate expected HC
-                expected_hc = roster_hc * hedged_attendance_pct
-                
-                # Calculate actual punches with variance
-                variance_rate = variance_rates.get(emp_type, 1.00)
-                actual_punches = round(expected_hc * variance_rate)
-                
-                shift_punches[data_key] = actual_punches
-            
-            punch_data[shift_key] = shift_punches
-        
-        return punch_data
-    
-    punch_totals = calculate_punch_totals_from_expected(filtered_hc_data, filtered_attendance_data)
-
-    
-    # Employee types in order
-    employee_types = [
-        'FTE',
-        'TEMP', 
-        'NEW HIRES',
-        'Day Labor (Flex)',
-        'Day Labor (WW/GS)',
-        'Overtime (VEH/MEH)',
-        'Time Off (VER/MTO)',
-        'Hedge Attendance Rate (+/-) ✏️',
-        'Total Expected HC'
-    ]
-    
-    # Mapping to data keys
-    data_key_mapping = {
-        'FTE': 'FTE',
-        'TEMP': 'TEMP',
-        'NEW HIRES': 'NEW HIRES',
-        'Day Labor (Flex)': 'FLEX',
-        'Day Labor (WW/GS)': 'WW/GS',
-        'Overtime (VEH/MEH)': 'VEH/MEH',
-        'Time Off (VER/MTO)': 'PTO'
-    }
+    # Roster, attendance, expected HC and punches all come from the shared engine
+    if hc_engine is None:
+        hc_engine = ExpectedHCEngine.from_table_data(filtered_hc_data, filtered_attendance_data, st.session_state.hedge_rates)
     
-    attendance_key_mapping = {
-        'FTE': 'FTE Attendance Assumption',
-        'TEMP': 'TEMP Attendance Assumption',
-        'NEW HIRES': 'NEW HIRES Show Up Rate',
-        'Day Labor (Flex)': 'FLEX Show Up Rate',
-        'Day Labor (WW/GS)': 'WW/GS Show Up Rate',
-        'Overtime (VEH/MEH)': 'VEH Show Up Rate',
-        'Time Off (VER/MTO)': 'PTO Rate'
-    }
+    # Employee types in order, followed by the hedge and total rows
+    employee_types = HC_GRID_ROWS
     
     columns_list = sorted(list(filtered_hc_data.keys()))
     
-    # Build dataframe
-    table_data = {'Employee Type': []}
-    
-    # Initialize columns for each shift - now with 5 columns: Roster, Attendance, Expected, Punches, Variance
-    for idx, shift_key in enumerate(columns_list):
-        parts = shift_key.split(' ')
-        date_str = parts[0]
-        shift_num = parts[-1]
-        
-        col_prefix = f'S{idx+1}'
-        table_data[f'{col_prefix}_Roster'] = []  # Renamed from Scheduled
-        table_data[f'{col_prefix}_Attendance'] = []
-        table_data[f'{col_prefix}_Expected'] = []
-        table_data[f'{col_prefix}_Punches'] = []  # NEW: Actual punches
-        table_data[f'{col_prefix}_Punch_Variance'] = []  # NEW: Variance from expected
-        table_data[f'{col_prefix}_Variance'] = []  # WoW variance for tooltip coloring
-        table_data[f'{col_prefix}_Tooltip'] = []
-        table_data[f'{col_prefix}_Attendance_Tooltip'] = []
-        # Enhanced tooltip data columns
-        table_data[f'{col_prefix}_Current_HC'] = []
-        table_data[f'{col_prefix}_Previous_HC'] = []
-        table_data[f'{col_prefix}_Absolute_Change'] = []
-        table_data[f'{col_prefix}_Cohort_Breakdown'] = []
-    
-    # Populate data rows
-    for emp_type in employee_types:
-        if emp_type == 'Hedge Attendance Rate (+/-) ✏️':
-            # Hedge row
-            table_data['Employee Type'].append(emp_type)
-            for idx, shift_key in enumerate(columns_list):
-                parts = shift_key.split(' ')
-                date_str = parts[0]
-                shift_num = parts[-1]
-                hedge_key = f"{date_str}_{shift_num}st"
-                hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0.0)
-                
-                # Ensure hedge_rate is numeric
-                try:
-                    hedge_rate = float(hedge_rate)
-                except (ValueError, TypeError):
-                    hedge_rate = 0.0
-                
-                col_prefix = f'S{idx+1}'
-                table_data[f'{col_prefix}_Roster'].append(hedge_rate)
-                table_data[f'{col_prefix}_Attendance'].append('')
-                table_data[f'{col_prefix}_Expected'].append('')  # Empty for hedge row
-                table_data[f'{col_prefix}_Punches'].append('')  # Empty for hedge row
-                table_data[f'{col_prefix}_Punch_Variance'].append('')  # Empty for hedge row
-                table_data[f'{col_prefix}_Variance'].append(None)
-                table_data[f'{col_prefix}_Tooltip'].append('')
-                table_data[f'{col_prefix}_Attendance_Tooltip'].append('')
-                # Enhanced tooltip data (empty for hedge row)
-                table_data[f'{col_prefix}_Current_HC'].append(0)
-                table_data[f'{col_prefix}_Previous_HC'].append(0)
-                table_data[f'{col_prefix}_Absolute_Change'].append(0)
-                table_data[f'{col_prefix}_Cohort_Breakdown'].append('{}')
-                
-        elif emp_type == 'Total Expected HC':
-            # Total row - will be calculated from Expected HC column after dataframe is built
-            table_data['Employee Type'].append(emp_type)
-            for idx, shift_key in enumerate(columns_list):
-                col_prefix = f'S{idx+1}'
-                # Placeholder - will be calculated later
-                table_data[f'{col_prefix}_Roster'].append('')  # Empty for total row
-                table_data[f'{col_prefix}_Attendance'].append('')  # Empty for total row
-                table_data[f'{col_prefix}_Expected'].append(0)  # Will be summed later
-                table_data[f'{col_prefix}_Punches'].append(0)  # Will be summed later
-                table_data[f'{col_prefix}_Punch_Variance'].append(0)  # Will be calculated later
-                table_data[f'{col_prefix}_Variance'].append(None)
-                table_data[f'{col_prefix}_Tooltip'].append('')
-                table_data[f'{col_prefix}_Attendance_Tooltip'].append('')
-                # Enhanced tooltip data (empty for total row)
-                table_data[f'{col_prefix}_Current_HC'].append(0)
-                table_data[f'{col_prefix}_Previous_HC'].append(0)
-                table_data[f'{col_prefix}_Absolute_Change'].append(0)
-                table_data[f'{col_prefix}_Cohort_Breakdown'].append('{}')
-        else:
-            # Regular employee type row
-            table_data['Employee Type'].append(emp_type)
-            data_key = data_key_mapping.get(emp_type, emp_type)
-            att_key = attendance_key_mapping.get(emp_type, f'{emp_type} Attendance Assumption')
-            
-            for idx, shift_key in enumerate(columns_list):
-                hc_data = filtered_hc_data.get(shift_key, {})
-                attendance_data = filtered_attendance_data.get(shift_key, {})
-                
-                hc_value = hc_data.get(data_key, 0)
-                attendance_value = attendance_data.get(att_key, 'N/A')
-                tooltip_hc = hc_data.get(f'tooltip_{data_key.lower()}', '+3% vs prev week')
-                tooltip_att = attendance_data.get(f'tooltip_{data_key.lower()}', '+3% vs prev week')
-                
-                # Extract variance percentage
-                variance = None
-                import re
-                match = re.search(r'([+-]?\d+)%?\s*vs\s*prev\s*week', tooltip_hc)
-                if match:
-                    variance = float(match.group(1))
-                
-                # Calculate previous week HC and cohort breakdown for enhanced tooltips
-                current_hc = hc_value
-                if variance is not None:
-                    # Calculate previous HC from variance percentage
-                    previous_hc = round(current_hc / (1 + variance/100))
-                    absolute_change = current_hc - previous_hc
-                    
-                    # Generate realistic demographic cohort breakdown
-                    # Distribute the change across demographic cohorts realistically
-                    cohort_breakdown = {}
-                    if absolute_change != 0:
-                        import random
-                        random.seed(hash(f"{emp_type}_{shift_key}"))  # Consistent randomization
-                        
-                        # Internal cohort codes
-                        cohorts = ['Cohort A', 'Cohort B', 'Cohort C', 'Cohort D']
-                        
-                        # Generate proportions that sum to absolute_change
-                        remaining = absolute_change
-                        for i, cohort in enumerate(cohorts[:-1]):
-                            # Allocate 20-40% of remaining to this cohort
-                            proportion = random.uniform(0.2, 0.4)
-                            cohort_value = round(remaining * proportion)
-                            cohort_breakdown[cohort] = cohort_value
-                            remaining -= cohort_value
-                        
-                        # Last cohort gets remainder
-                        cohort_breakdown[cohorts[-1]] = remaining
-                        
-                        # Remove cohorts with 0 change
-                        cohort_breakdown = {k: v for k, v in cohort_breakdown.items() if v != 0}
-                else:
-                    previous_hc = current_hc
-                    absolute_change = 0
-                    cohort_breakdown = {}
-                
-                # Get hedge rate for this shift to modify attendance
-                parts_hedge = shift_key.split(' ')
-                date_str_hedge = parts_hedge[0]
-                shift_num_hedge = parts_hedge[-1]
-                hedge_key = f"{date_str_hedge}_{shift_num_hedge}st"
-                hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0.0)
-                
-                # Ensure hedge_rate is numeric
-                try:
-                    hedge_rate = float(hedge_rate)
-                except (ValueError, TypeError):
-                    hedge_rate = 0.0
-                
-                # Parse attendance percentage
-                attendance_pct = float(attendance_value.rstrip('%')) / 100.0 if attendance_value != 'N/A' else 0
-                
-                # Apply hedge to attendance for FTE and TEMP
-                if emp_type in ['FTE', 'TEMP']:
-                    hedged_attendance_pct = attendance_pct + (hedge_rate / 100.0)
-                    hedged_attendance_pct = max(0, min(1, hedged_attendance_pct))  # Clamp between 0 and 1
-                    # Display the modified attendance percentage
-                    modified_attendance_value = f"{round(hedged_attendance_pct * 100)}%"
-                else:
-                    hedged_attendance_pct = attendance_pct
-                    modified_attendance_value = attendance_value
-                
-                col_prefix = f'S{idx+1}'
-                table_data[f'{col_prefix}_Roster'].append(hc_value)  # Renamed from Scheduled
-                table_data[f'{col_prefix}_Attendance'].append(modified_attendance_value)  # Show modified attendance
-                table_data[f'{col_prefix}_Variance'].append(variance)
-                table_data[f'{col_prefix}_Tooltip'].append(tooltip_hc)
-                table_data[f'{col_prefix}_Attendance_Tooltip'].append(tooltip_att)
-                
-                # Add enhanced tooltip data
-                table_data[f'{col_prefix}_Current_HC'].append(current_hc)
-                table_data[f'{col_prefix}_Previous_HC'].append(previous_hc)
-                table_data[f'{col_prefix}_Absolute_Change'].append(absolute_change)
-                
-                # Store cohort breakdown as JSON string
-                import json
-                table_data[f'{col_prefix}_Cohort_Breakdown'].append(json.dumps(cohort_breakdown))
-                
-                # Calculate Expected HC = Roster × Modified Attendance
-                expected_hc = round(hc_value * hedged_attendance_pct)
-                table_data[f'{col_prefix}_Expected'].append(expected_hc)
-                
-                # Add actual punch data
-                punch_count = punch_totals.get(shift_key, {}).get(data_key, 0)
-                table_data[f'{col_prefix}_Punches'].append(punch_count)
-                
-                # Calculate punch variance (Actual - Expected)
-                punch_variance = punch_count - expected_hc
-                table_data[f'{col_prefix}_Punch_Variance'].append(punch_variance)
-    
-    df = pd.DataFrame(table_data)
-    
-    # Calculate Total Expected HC row by summing Expected HC, Punches, and Punch_Variance columns
-    total_row_idx = df[df['Employee Type'] == 'Total Expected HC'].index
-    if len(total_row_idx) > 0:
-        total_idx = total_row_idx[0]
-        # Sum all values for non-total, non-hedge rows
-        for idx, shift_key in enumerate(columns_list):
-            col_prefix = f'S{idx+1}'
-            expected_col = f'{col_prefix}_Expected'
-            punches_col = f'{col_prefix}_Punches'
-            variance_col = f'{col_prefix}_Punch_Variance'
-            
-            # Sum expected HC for all employee types (exclude hedge and total rows)
-            employee_rows = df[(df['Employee Type'] != 'Total Expected HC') & 
-                              (~df['Employee Type'].str.contains('Hedge Attendance Rate', na=False))]
-            total_expected = employee_rows[expected_col].sum()
-            total_punches = employee_rows[punches_col].sum()
-            
-            df.at[total_idx, expected_col] = round(total_expected)
-            df.at[total_idx, punches_col] = int(total_punches)
-            df.at[total_idx, variance_col] = int(total_punches - total_expected)
+    df = build_hc_grid_frame(filtered_hc_data, filtered_attendance_data, hc_engine)
     
     # JavaScript functions for AG-Grid
     row_style_jscode = JsCode("""
@@ -2278,592 +1778,54 @@ def create_combined_hc_attendance_aggrid_table(filtered_hc_data, filtered_attend
     # Header (45px) + rows (40px each for better readability) + padding (50px)
     grid_height = 45 + (num_rows * 40) + 50
     
-    # Calculate actual total Expected HC from the table (sum across all shifts)
-    total_row = df[df['Employee Type'] == 'Total Expected HC']
-    actual_total = 0
-    if not total_row.empty:
-        columns_list = sorted(list(filtered_hc_data.keys()))
-        for idx, shift_key in enumerate(columns_list):
-            col_prefix = f'S{idx+1}'
-            expected_col = f'{col_prefix}_Expected'
-            actual_total += total_row[expected_col].values[0]
-    
-    return df, gridOptions, custom_css, grid_height, int(actual_total)
-    """Create combined HC and Attendance Assumption table with color coding for variance"""
-    
-    
-    tooltip_css = """
-    <style>
-    .combined-table {
-        width: 100%;
-        border-collapse: collapse;
-        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-        font-size: 12px;
-        margin: 10px 0;
-    }
-    .combined-table th {
-        background-color: #f1f1f1;
-        color: #2E4057;
-        font-weight: bold;
-        padding: 8px;
-        text-align: center;
-        border: 1px solid #ddd;
-        font-size: 11px;
-    }
-    .combined-table td {
-        padding: 6px 8px;
-        text-align: center;
-        border: 1px solid #ddd;
-        position: relative;
-        cursor: help;
-    }
-    .combined-table td.row-header {
-        background-color: #f9f9f9;
-        font-weight: bold;
-        text-align: left;
-        cursor: default;
-    }
-    .combined-table td.total-row {
-        background-color: #e8f4f8;
-        font-weight: bold;
-    }
-    .combined-table td.hedge-row {
-        font-weight: bold;
-        font-style: italic;
-    }
-    .combined-table td.row-header.hedge-row {
-        background-color: #fff3cd;
-    }
-    .hedge-input-container {
-        background-color: #fff3cd;
-        border: 1px solid #ddd;
-        padding: 6px 8px;
-        text-align: center;
-        font-size: 12px;
-        min-height: 35px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-    }
-    .variance-high {
-        background-color: #ffcccc !important;
-    }
-    .variance-medium {
-        background-color: #ffe6cc !important;
-    }
-    .variance-low {
-        background-color: #ffffcc !important;
-    }
-    .header-info {
-        font-size: 14px;
-        font-weight: bold;
-        padding: 10px;
-        background-color: #f9f9f9;
-        border-radius: 4px;
-    }
-    .legend {
-        font-size: 12px;
-        font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-        margin-top: 10px;
-    }
-    .legend-item {
-        display: inline-block;
-        margin-right: 20px;
-    }
-    .legend-color {
-        display: inline-block;
-        width: 15px;
-        height: 15px;
-        margin-right: 5px;
-        border: 1px solid #ddd;
-        vertical-align: middle;
-    }
-    .tooltip-text {
-        visibility: hidden;
-        background-color: #555;
-        color: #fff;
-        text-align: left;
-        border-radius: 6px;
-        padding: 8px;
-        position: absolute;
-        z-index: 1000;
-        bottom: 125%;
-        left: 50%;
-        margin-left: -100px;
-        width: 200px;
-        opacity: 0;
-        transition: opacity 0.3s;
-        font-size: 11px;
-        white-space: pre-line;
-        box-shadow: 0px 4px 8px rgba(0,0,0,0.2);
-    }
-    .combined-table td:hover .tooltip-text {
-        visibility: visible;
-        opacity: 1;
-    }
-    .tooltip-text::after {
-        content: "";
-        position: absolute;
-        top: 100%;
-        left: 50%;
-        margin-left: -5px;
-        border-width: 5px;
-        border-style: solid;
-        border-color: #555 transparent transparent transparent;
-    }
-    </style>
-    """
-    
-    # Employee types in order
-    employee_types = [
-        'FTE',
-        'TEMP', 
-        'NEW HIRES',
-        'Day Labor (Flex)',
-        'Day Labor (WW/GS)',
-        'Overtime (VEH/MEH)',
-        'Time Off (VER/MTO)'
-    ]
-    
-    # Mapping to data keys
-    data_key_mapping = {
-        'FTE': 'FTE',
-        'TEMP': 'TEMP',
-        'NEW HIRES': 'NEW HIRES',
-        'Day Labor (Flex)': 'FLEX',
-        'Day Labor (WW/GS)': 'WW/GS',
-        'Overtime (VEH/MEH)': 'VEH/MEH',
-        'Time Off (VER/MTO)': 'PTO'
-    }
-    
-    attendance_key_mapping = {
-        'FTE': 'FTE Attendance Assumption',
-        'TEMP': 'TEMP Attendance Assumption',
-        'NEW HIRES': 'NEW HIRES Show Up Rate',
-        'Day Labor (Flex)': 'FLEX Show Up Rate',
-        'Day Labor (WW/GS)': 'WW/GS Show Up Rate',
-        'Overtime (VEH/MEH)': 'VEH Show Up Rate',
-        'Time Off (VER/MTO)': 'PTO Rate'
-    }
-    
-    columns = sorted(list(filtered_hc_data.keys()))
-    
-    # Build HTML
-    html_content = tooltip_css
-    
-    # Header with expected HC
-    # Remove header with expected HC - not needed
-    # html_content += f"<div class='header-info'>Expected Headcount ({expected_hc_total})</div>"
-    # Legend
-    html_content += "<div class='legend'>"
-    html_content += "<strong>Legend</strong><br>"
-    html_content += "<span class='legend-item'><span class='legend-color variance-high'></span>>20% variance from last week</span>"
-    html_content += "<span class='legend-item'><span class='legend-color variance-medium'></span>10-20% variance from last week</span>"
-    html_content += "</div>"
-    
-    # Table
-    html_content += "<table class='combined-table'>"
-    
-    # Header row
-    html_content += "<tr><th>Employee Type</th>"
-    for shift_key in columns:
-        parts = shift_key.split(' ')
-        date = parts[0]
-        day = parts[1]
-        shift_num = parts[-1]
-        html_content += f"<th colspan='2'>{date} {day}<br>Shift {shift_num}</th>"
-    html_content += "</tr>"
-    
-    # Sub-header row for Headcount / Attendance Assumption
-    html_content += "<tr><th></th>"
-    for _ in columns:
-        html_content += "<th>Scheduled<br>Headcount</th><th>Attendance<br>Assumption</th>"
-    html_content += "</tr>"
-    
-    # Data rows
-    for emp_type in employee_types:
-        html_content += "<tr>"
-        
-        # Add hyperlinks to specific row labels
-        if emp_type == 'Overtime (VEH/MEH)':
-            html_content += f"""<td class='row-header'>
-                <a href='https://example.com/overtime-details' 
-                   target='_blank'
-                   style='color: #2E4057; text-decoration: none; border-bottom: 1px dashed #2E4057;'
-                   title='View Overtime Details'>
-                    {emp_type} 🔗
-                </a>
-            </td>"""
-        elif emp_type == 'Day Labor (WW/GS)':
-            html_content += f"""<td class='row-header'>
-                <a href='https://example.com/day-labor-details' 
-                   target='_blank'
-                   style='color: #2E4057; text-decoration: none; border-bottom: 1px dashed #2E4057;'
-                   title='View Day Labor Details'>
-                    {emp_type} 🔗
-                </a>
-            </td>"""
-        else:
-            html_content += f"<td class='row-header'>{emp_type}</td>"
-        
-        data_key = data_key_mapping.get(emp_type, emp_type)
-        attendance_key = attendance_key_mapping.get(emp_type, f'{emp_type} Attendance Assumption')
-        
-        for shift_key in columns:
-            hc_data = filtered_hc_data.get(shift_key, {})
-            attendance_data = filtered_attendance_data.get(shift_key, {})
-            
-            # Get headcount value
-            hc_value = hc_data.get(data_key, 0)
-            
-            # Get attendance value
-            attendance_value = attendance_data.get(attendance_key, 'N/A')
-            
-            # Get tooltip for headcount
-            tooltip_hc = hc_data.get(f'tooltip_{data_key.lower()}', '+3% vs prev week')
-            
-            # Get tooltip for attendance
-            tooltip_attendance = attendance_data.get(f'tooltip_{data_key.lower()}', '+3% vs prev week')
-            
-           # Determine variance class by parsing the tooltip
-            variance_class = ''
-            if tooltip_hc and 'vs prev week' in tooltip_hc:
-                # Extract percentage from tooltip (e.g., "+15% vs prev week" -> 15)
-                import re
-                match = re.search(r'([+-]?\d+)%?\s*vs\s*prev\s*week', tooltip_hc)
-                if match:
-                    variance_pct = abs(int(match.group(1)))  # Get absolute value
-                    if variance_pct > 20:
-                        variance_class = 'variance-high'
-                    elif variance_pct >= 10:
-                        variance_class = 'variance-medium'
-           
-            # Headcount cell with variance color (if applicable)
-            if variance_class:
-                html_content += f"<td class='{variance_class}'>{hc_value}<span class='tooltip-text'>{tooltip_hc}</span></td>"
-            else:
-                html_content += f"<td>{hc_value}<span class='tooltip-text'>{tooltip_hc}</span></td>"
-            
-            # Attendance cell (no variance coloring)
-            html_content += f"<td>{attendance_value}<span class='tooltip-text'>{tooltip_attendance}</span></td>"
-        
-        html_content += "</tr>"
-    
-    # Hedge Attendance Rate row (display-only, shows current hedge values)
-    html_content += "<tr>"
-    html_content += "<td class='row-header'>Hedge Attendance Rate (+/-)</td>"
-    
-    for shift_key in columns:
-        # Extract date and shift from key (format: "2026-02-12 Thu Shift 1")
-        parts = shift_key.split(' ')
-        date_str = parts[0]
-        shift_num = parts[-1]
-        hedge_key = f"{date_str}_{shift_num}st"
-        
-        # Get hedge rate from session state
-        hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0)
-        hedge_display = f"{hedge_rate:+.1f}%" if hedge_rate != 0 else "-"
-        
-        tooltip_hedge = f"Hedge rate for {date_str} Shift {shift_num}: {hedge_rate:+.1f}%<br>Click 'Edit Hedge Rates' below to modify"
-        
-        # Display hedge rate (spans 2 columns to match the table structure) - NO background color class
-        html_content += f"<td colspan='2' style='font-weight: bold; font-style: italic;'>{hedge_display}<span class='tooltip-text'>{tooltip_hedge}</span></td>"
-    
-    html_content += "</tr>"
-    
-    # Total row
-    html_content += "<tr>"
-    html_content += "<td class='row-header'>Total Expected HC</td>"
-    
-    for shift_key in columns:
-        hc_data = filtered_hc_data.get(shift_key, {})
-        attendance_data = filtered_attendance_data.get(shift_key, {})
-        
-        # Extract date and shift for hedge lookup
-        parts = shift_key.split(' ')
-        date_str = parts[0]
-        shift_num = parts[-1]
-        hedge_key = f"{date_str}_{shift_num}st"
-        hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0)
-
-        
-
-        
-        # Calculate total Expected HC (Scheduled HC × (Attendance Assumption + Hedge))
-        total_expected_hc = 0
-        for emp_type in employee_types:
-            data_key = data_key_mapping.get(emp_type, emp_type)
-            attendance_key = attendance_key_mapping.get(emp_type, f'{emp_type} Attendance Assumption')
-            
-            # Get scheduled HC
-            scheduled_hc = hc_data.get(data_key, 0)
-            
-            # Get attendance assumption and convert percentage to decimal
-            attendance_str = attendance_data.get(attendance_key, '0%')
-            attendance_pct = float(attendance_str.rstrip('%')) / 100.0
-            
-            # Apply hedge rate only to FTE and TEMP (as per user requirement)
-            if emp_type in ['FTE', 'TEMP']:
-                hedged_attendance_pct = attendance_pct + (hedge_rate / 100.0)
-                # Clamp to valid range [0, 1]
-                hedged_attendance_pct = max(0, min(1, hedged_attendance_pct))
-            else:
-                hedged_attendance_pct = attendance_pct
-            
-            # Calculate expected HC for this employee type
-            total_expected_hc += scheduled_hc * hedged_attendance_pct
-        
-        # Round to nearest integer
-        total_expected_hc = round(total_expected_hc)
-        
-        html_content += f"<td class='total-row' colspan='2'>{total_expected_hc}</td>"
-
-    
-    html_content += "</tr>"
-    html_content += "</table>"
-    
-    return html_content
+    # Total Expected HC across all shifts, as summed by the engine
+    return df, gridOptions, custom_css, grid_height, hc_engine.total
 
 
 
-def validate_and_adjust_hc_totals(filtered_hc_data, filtered_attendance_data, overview_expected, employee_types, data_key_mapping, attendance_key_mapping):
-    """Ensure HC table Expected HC totals match overview metrics exactly"""
-    if not filtered_hc_data or not filtered_attendance_data:
-        return filtered_hc_data
-    
-    # Calculate current total expected HC across all shifts
-    current_total = 0
-    for shift_key in filtered_hc_data.keys():
-        hc_data = filtered_hc_data[shift_key]
-        attendance_data = filtered_attendance_data[shift_key]
-        
-        for emp_type in employee_types:
-            data_key = data_key_mapping.get(emp_type, emp_type)
-            attendance_key = attendance_key_mapping.get(emp_type, f'{emp_type} Attendance Assumption')
-            
-            scheduled = hc_data.get(data_key, 0)
-            att_str = attendance_data.get(attendance_key, '0%')
-            att_pct = float(att_str.rstrip('%')) / 100.0
-            
-            current_total += scheduled * att_pct
-    
-    # Calculate adjustment ratio
-    if current_total > 0:
-        ratio = overview_expected / current_total
-    else:
-        return filtered_hc_data
-    
-    # Apply ratio uniformly to all scheduled HC values
-    adjusted_hc_data = {}
-    for shift_key, hc_data in filtered_hc_data.items():
-        adjusted_hc_data[shift_key] = hc_data.copy()
-        
-        for emp_type in employee_types:
-            data_key = data_key_mapping.get(emp_type, emp_type)
-            if data_key in hc_data:
-                adjusted_hc_data[shift_key][data_key] = int(round(hc_data[data_key] * ratio))
-    
-    return adjusted_hc_data
-
-def validate_and_adjust_totals(filtered_shift_data, overview_metrics, shifts):
-    """Ensure table totals match overview metrics"""
-    if not filtered_shift_data or not shifts:
-        return filtered_shift_data
-    
-    # Calculate current table totals
-    table_needed_total = sum(data['Total Needed'] for data in filtered_shift_data.values())
-    table_expected_total = sum(data['Total Expected'] for data in filtered_shift_data.values())
-    
-    # Get target totals from overview
-    target_needed = overview_metrics['needed']
-    target_expected = overview_metrics['expected']
-    
-    # Calculate adjustment ratios
-    needed_ratio = target_needed / table_needed_total if table_needed_total > 0 else 1
-    expected_ratio = target_expected / table_expected_total if table_expected_total > 0 else 1
-    
-    # Adjust each shift's values proportionally
-    adjusted_data = {}
-    for key, data in filtered_shift_data.items():
-        adjusted_data[key] = data.copy()
-        adjusted_data[key]['Total Needed'] = int(data['Total Needed'] * needed_ratio)
-        adjusted_data[key]['Total Expected'] = int(data['Total Expected'] * expected_ratio)
-        adjusted_data[key]['Total Gap'] = adjusted_data[key]['Total Expected'] - adjusted_data[key]['Total Needed']
-    
-    return adjusted_data
-
-def create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, metric_key, filtered_hc_data=None, filtered_attendance_data=None, overview_total=None):
-    """
-    Create shift breakdown text for each date and shift combination.
-    For 'Total Expected', calculates from HC data × attendance (matching the table).
-    For other metrics, distributes the overview_total proportionally across shifts.
-    
-    Args:
-        filtered_shift_data: Dict with keys like "2026-02-12 Thu Shift 1" containing metric values
-        selected_dates: List of selected date objects
-        shifts: List of selected shift strings (e.g., ["1st", "2nd"])
-        metric_key: The metric to display (e.g., 'Total Needed', 'Total Expected')
-        filtered_hc_data: HC data for calculating Expected HC
-        filtered_attendance_data: Attendance data for calculating Expected HC
-        overview_total: The total from overview KPIs to distribute proportionally
+@traced
+def get_planning_state(filter_key, filtered_hc_data, filtered_attendance_data):
+    """Expected HC engine and grid for one filter selection, kept in session state
     
-    Returns:
-        HTML string with breakdown by date and shift
+    Built once per filter selection. Later reruns reuse it, and hedge changes only
+    recompute and patch the affected date/shift columns (see sync_planning_hedges).
     """
-    if not filtered_shift_data or not selected_dates or not shifts:
-        return ""
-    
-    # Define mappings for Expected HC calculation
-    employee_types = ['FTE', 'TEMP', 'NEW HIRES', 'Day Labor (Flex)', 'Day Labor (WW/GS)', 'Overtime (VEH/MEH)', 'Time Off (VER/MTO)']
-    data_key_mapping = {
-        'FTE': 'FTE', 'TEMP': 'TEMP', 'NEW HIRES': 'NEW HIRES', 
-        'Day Labor (Flex)': 'FLEX', 'Day Labor (WW/GS)': 'WW/GS', 
-        'Overtime (VEH/MEH)': 'VEH/MEH', 'Time Off (VER/MTO)': 'PTO'
-    }
-    attendance_key_mapping = {
-        'FTE': 'FTE Attendance Assumption', 'TEMP': 'TEMP Attendance Assumption', 
-        'NEW HIRES': 'NEW HIRES Show Up Rate', 'Day Labor (Flex)': 'FLEX Show Up Rate', 
-        'Day Labor (WW/GS)': 'WW/GS Show Up Rate', 'Overtime (VEH/MEH)': 'VEH Show Up Rate', 
-        'Time Off (VER/MTO)': 'PTO Rate'
-    }
-    
-    # If overview_total is provided, calculate proportional distribution
-    if overview_total is not None:
-        # First, calculate the sum from filtered_shift_data to get proportions
-        shift_totals = {}
-        sum_from_data = 0
-        
-        for date in selected_dates:
-            date_str = date.strftime("%Y-%m-%d")
-            day_abbr = date.strftime("%a")
-            
-            for shift in shifts:
-                shift_num = shift[0]
-                key = f"{date_str} {day_abbr} Shift {shift_num}"
-                
-                if key in filtered_shift_data:
-                    value = filtered_shift_data[key].get(metric_key, 0)
-                    shift_totals[key] = value
-                    sum_from_data += value
-        
-        # Calculate proportional values that sum to overview_total
-        # Use absolute values for proportion calculation to handle negative gaps
-        shift_abs_totals = {k: abs(v) for k, v in shift_totals.items()}
-        sum_abs = sum(shift_abs_totals.values())
-        
-        breakdown_lines = []
-        for date in selected_dates:
-            date_str = date.strftime("%Y-%m-%d")
-            day_abbr = date.strftime("%a")
-            
-            shift_values = []
-            for shift in shifts:
-                shift_num = shift[0]
-                key = f"{date_str} {day_abbr} Shift {shift_num}"
-                
-                if key in shift_totals:
-                    # Proportionally distribute using absolute values
-                    if sum_abs > 0:
-                        proportion = shift_abs_totals[key] / sum_abs
-                        adjusted_value = round(overview_total * proportion)
-                    else:
-                        adjusted_value = 0
-                    shift_values.append(f"Shift {shift_num}: {adjusted_value}")
-            
-            if shift_values:
-                breakdown_lines.append(f"{day_abbr} {' | '.join(shift_values)}")
-        
-        return "<br>".join(breakdown_lines) if breakdown_lines else ""
+    get_memory_accountant().touch('planning_state')
+    state = st.session_state.get('planning_state')
+    if state is not None and state['key'] == filter_key:
+        sync_planning_hedges(state, st.session_state.hedge_rates)
+        return state
     
-    # Original logic for Expected HC
-    breakdown_lines = []
+    hc_engine = ExpectedHCEngine.from_table_data(filtered_hc_data, filtered_attendance_data, st.session_state.hedge_rates)
     
-    for date in selected_dates:
-        date_str = date.strftime("%Y-%m-%d")
-        day_abbr = date.strftime("%a")  # e.g., "Thu", "Fri"
-        
-        shift_values = []
-        for shift in shifts:
-            # Extract shift number (e.g., "1st" -> "1")
-            shift_num = shift[0]
-            # Build the key to match the data structure
-            key = f"{date_str} {day_abbr} Shift {shift_num}"
-            
-            if key in filtered_shift_data:
-                # For Total Expected, calculate from HC × Attendance (matching table logic)
-                if metric_key == 'Total Expected' and filtered_hc_data and filtered_attendance_data:
-                    hc_data = filtered_hc_data.get(key, {})
-                    attendance_data = filtered_attendance_data.get(key, {})
-                    
-                    # Get hedge rate for this date/shift
-                    hedge_key = f"{date_str}_{shift_num}st"
-                    hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0)
-                    
-                    total_expected_hc = 0
-                    for emp_type in employee_types:
-                        data_key = data_key_mapping.get(emp_type, emp_type)
-                        attendance_key = attendance_key_mapping.get(emp_type, f'{emp_type} Attendance Assumption')
-                        
-                        # Get scheduled HC
-                        scheduled_hc = hc_data.get(data_key, 0)
-                        
-                        # Get attendance assumption and convert percentage to decimal
-                        attendance_str = attendance_data.get(attendance_key, '0%')
-                        attendance_pct = float(attendance_str.rstrip('%')) / 100.0
-                        
-                        # Apply hedge rate only to FTE and TEMP (as per user requirement)
-                        if emp_type in ['FTE', 'TEMP']:
-                            hedged_attendance_pct = attendance_pct + (hedge_rate / 100.0)
-                            # Clamp to valid range [0, 1]
-                            hedged_attendance_pct = max(0, min(1, hedged_attendance_pct))
-                        else:
-                            hedged_attendance_pct = attendance_pct
-                        
-                        # Calculate expected HC for this employee type
-                        total_expected_hc += scheduled_hc * hedged_attendance_pct
-                    
-                    value = round(total_expected_hc)
-                else:
-                    # For other metrics, read from filtered_shift_data
-                    value = filtered_shift_data[key].get(metric_key, 0)
-                
-                shift_values.append(f"Shift {shift_num}: {value}")
-        
-        if shift_values:
-            breakdown_lines.append(f"{day_abbr} {' | '.join(shift_values)}")
+    # Needed HC is 20-25% above Expected HC; the buffer is fixed per filter selection
+    rng = seeded_rng("needed_buffer", *filter_key)
     
-    return "<br>".join(breakdown_lines) if breakdown_lines else ""
+    state = {
+        'key': filter_key,
+        'hc_engine': hc_engine,
+        'buffer_pct': rng.uniform(1.20, 1.25),
+        'columns': sorted(filtered_hc_data.keys()),
+        'grid': None,
+        'grid_view_mode': None,
+    }
+    st.session_state.planning_state = state
+    return state
 
-def filter_employee_data_by_selections(employee_data, selected_department, selected_dates, shifts, worker_type_filter=None, employee_id_filter=None, schedule_filter=None, roster_bucket_filter=None):
-    """Filter employee data based on department, dates, shifts, and additional filters"""
-    filtered_employees = []
-    
-    # Convert shift format for comparison ("1st" -> "1st")
-    shift_filters = shifts if shifts else ["1st", "2nd", "3rd"]
-    
-    # Convert selected dates to string format for comparison
-    date_filters = [date.strftime("%Y-%m-%d") for date in selected_dates] if selected_dates else []
-    
-    for emp in employee_data:
-        # Check department match
-        dept_matches = (emp['Department'] == selected_department)
-        
-        # Check date match
-        date_matches = (emp['Date'] in date_filters) if date_filters else True
-        
-        # Check shift match
-        shift_matches = (emp['Shift'] in shift_filters) if shift_filters else True
-        
-        # Apply additional filters
-        worker_type_matches = (emp['Worker Type'] in worker_type_filter) if worker_type_filter else True
-        employee_id_matches = (employee_id_filter.upper() in emp['Employee ID'].upper()) if employee_id_filter else True
-        schedule_matches = (emp['Workday Schedule'] in schedule_filter) if schedule_filter else True
-        roster_bucket_matches = (emp['Roster Bucket'] in roster_bucket_filter) if roster_bucket_filter else True
+
+def sync_planning_hedges(state, hedge_rates):
+    """Apply changed hedge rates to the cached engine and grid, one date/shift column at a time"""
+    hc_engine = state['hc_engine']
+    for idx, shift_key in enumerate(state['columns']):
+        parts = shift_key.split(' ')
+        hedge_key = f"{parts[0]}_{parts[-1]}st"
+        try:
+            hedge_rate = float(hedge_rates.get(hedge_key, 0.0))
+        except (ValueError, TypeError):
+            hedge_rate = 0.0
         
-        if dept_matches and date_matches and shift_matches and worker_type_matches and employee_id_matches and schedule_matches and roster_bucket_matches:
-            filtered_employees.append(emp)
-    
-    return filtered_employees
+        if hc_engine.update_hedge(shift_key, hedge_rate) and state['grid'] is not None:
+            patch_hc_grid_column(state['grid'][0], hc_engine, shift_key, f'S{idx+1}')
 
 
 def main():
@@ -2871,15 +1833,14 @@ def main():
     st.sidebar.markdown("# 📊 Labor Planning")
     st.sidebar.markdown("---")
     
+    # Keyed to the session state, so the widget keeps its identity when the view changes
+    # (an index computed from the current view made every other switch get lost)
     page_view = st.sidebar.radio(
         "Select View",
         ["Rollup View", "Detailed View"],
-        index=0 if st.session_state.page_view == "Rollup View" else 1
+        key="page_view"
     )
-    
-    # Update session state
-    st.session_state.page_view = page_view
-    
+
     st.sidebar.markdown("---")
     st.sidebar.markdown("""
     **Rollup View**  
@@ -2890,10 +1851,20 @@ def main():
     """)
     
     # Route to appropriate view
-    if page_view == "Rollup View":
-        rollup_view()
-    else:
-        detailed_view()
+    with profiled(page_view):
+        if page_view == "Rollup View":
+            rollup_view()
+        else:
+            detailed_view()
+        
+        # Keep the session under its memory budget by dropping the least recently used derived entries
+        with phase("session memory"):
+            accountant = get_memory_accountant()
+            accountant.enforce(st.session_state)
+        annotate(session_bytes=accountant.total_bytes)
+    
+    if profiling_enabled():
+        render_profile_panel()
 
 
 def rollup_view():
@@ -2945,90 +1916,48 @@ def rollup_view():
         st.warning("Please select at least one date to view data.")
         return
     
+    annotate(location=location, week=week, dates=[date.strftime("%Y-%m-%d") for date in selected_dates])
+    
     # Generate rollup data
-    rollup_data = generate_rollup_data(selected_dates)
+    with phase("rollup data"):
+        rollup_data = generate_rollup_data(selected_dates, location, week)
     
     # Display rollup table
     st.markdown('<div class="section-header">Department Summary</div>', unsafe_allow_html=True)
-    display_rollup_table(rollup_data, selected_dates)
+    with phase("rollup grid"):
+        display_rollup_table(rollup_data, selected_dates)
 
 
-def generate_rollup_data(selected_dates):
-    """Generate aggregated rollup data by department, shift, and date"""
-    departments = list(st.session_state.departments.keys())
-    shifts = ['1st', '2nd', '3rd']
+
+@traced(rows=len)
+def generate_rollup_data(selected_dates, location, week):
+    """Generate aggregated rollup data by department, shift, and date
     
-    rollup_data = []
+    Uses the session's RollupEngine so only dates added since the last run are
+    computed. With SHIFT_OPTIMIZER_ARCHIVE set, observed figures come from the
+    archive's Location/Week partition. The engine is rebuilt when the department
+    settings or the location/week change.
+    """
+    root = archive_root()
+    source = (str(root), location, week) if root is not None else None
     
-    for dept in departments:
-        dept_rows = []
-        dept_totals = {date.strftime("%Y-%m-%d"): {'needed': 0, 'expected': 0, 'punches': 0} for date in selected_dates}
-        
-        for shift in shifts:
-            row = {'Department': dept, 'Shift': shift}
-            
-            # Calculate metrics for each date
-            for date in selected_dates:
-                date_str = date.strftime("%Y-%m-%d")
-                date_key = date.strftime("%Y-%m-%d %a")
-                
-                # Generate sample data
-                import random
-                random.seed(hash(f"{dept}_{shift}_{date_str}"))
-                
-                dept_mult = st.session_state.departments[dept]
-                shift_mult = {'1st': 1.2, '2nd': 1.0, '3rd': 0.8}.get(shift, 1.0)
-                
-                base_expected = int(100 * dept_mult * shift_mult)
-                expected = base_expected + random.randint(-5, 5)
-                needed = int(expected * random.uniform(1.20, 1.25))
-                punches = int(expected * random.uniform(0.98, 1.02))
-                
-                expected_gap = expected - needed
-                actual_gap = punches - expected
-                
-                row[f'{date_key}_Needed'] = needed
-                row[f'{date_key}_Expected'] = expected
-                row[f'{date_key}_Expected_Gap'] = expected_gap
-                row[f'{date_key}_Punches'] = punches
-                row[f'{date_key}_Actual_Gap'] = actual_gap
-                
-                # Accumulate for department totals
-                dept_totals[date_str]['needed'] += needed
-                dept_totals[date_str]['expected'] += expected
-                dept_totals[date_str]['punches'] += punches
-            
-            dept_rows.append(row)
-        
-        # Add all shift rows for this department
-        rollup_data.extend(dept_rows)
-        
-        # Add total row for this department
-        total_row = {'Department': f'{dept} - Total', 'Shift': ''}
-        for date in selected_dates:
-            date_str = date.strftime("%Y-%m-%d")
-            date_key = date.strftime("%Y-%m-%d %a")
-            
-            needed = dept_totals[date_str]['needed']
-            expected = dept_totals[date_str]['expected']
-            punches = dept_totals[date_str]['punches']
-            
-            total_row[f'{date_key}_Needed'] = needed
-            total_row[f'{date_key}_Expected'] = expected
-            total_row[f'{date_key}_Expected_Gap'] = expected - needed
-            total_row[f'{date_key}_Punches'] = punches
-            total_row[f'{date_key}_Actual_Gap'] = punches - expected
-        
-        rollup_data.append(total_row)
+    get_memory_accountant().touch('rollup_engine')
+    engine = st.session_state.get('rollup_engine')
+    if engine is None or not engine.matches(st.session_state.departments, source):
+        departments = st.session_state.departments
+        observed = rollup_observed(root, location, week, list(departments)) if root is not None else None
+        engine = RollupEngine(departments, observed=observed, source=source)
+        st.session_state.rollup_engine = engine
     
-    return rollup_data
+    return engine.frame(selected_dates)
 
 
+@traced
 def display_rollup_table(rollup_data, selected_dates):
     """Display the rollup table using AG-Grid with alternating department colors and date columns"""
     from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode, JsCode
     
-    df = pd.DataFrame(rollup_data)
+    df = rollup_data
     
     # Get list of departments for alternating colors
     departments = list(st.session_state.departments.keys())
@@ -3209,16 +2138,17 @@ def display_rollup_table(rollup_data, selected_dates):
     if len(selected_dates) > 3:
         st.markdown("*Scroll horizontally to see all dates →*")
     
-    AgGrid(
-        df,
-        gridOptions=gridOptions,
-        update_mode=GridUpdateMode.NO_UPDATE,
-        data_return_mode=DataReturnMode.AS_INPUT,
-        fit_columns_on_grid_load=False,
-        theme='streamlit',
-        height=grid_height,
-        allow_unsafe_jscode=True
-    )
+    with phase("AgGrid"):
+        AgGrid(
+            df,
+            gridOptions=gridOptions,
+            update_mode=GridUpdateMode.NO_UPDATE,
+            data_return_mode=DataReturnMode.AS_INPUT,
+            fit_columns_on_grid_load=False,
+            theme='streamlit',
+            height=grid_height,
+            allow_unsafe_jscode=True
+        )
 
 
 def detailed_view():
@@ -3233,19 +2163,19 @@ def detailed_view():
     with col1:
         st.markdown("**Location**")
         location = st.selectbox("", ["AZ Goodyear", "IL Aurora", "AZ Phoenix", "IL Lake Zurich", "IL Burr Ridge"], 
-                               index=0, label_visibility="collapsed")
+                               index=0, label_visibility="collapsed", key="detailed_location")
 
     
     
     with col2:
         st.markdown("**Department**")
         selected_department = st.selectbox("", list(st.session_state.departments.keys()), 
-                                         index=0, label_visibility="collapsed")
+                                         index=0, label_visibility="collapsed", key="detailed_department")
     
     with col3:
         st.markdown("**Week**")
         week = st.selectbox("", ["2026-W08", "2026-W07", "2026-W09", "2026-W06", "2026-W10"], 
-                           index=0, label_visibility="collapsed")
+                           index=0, label_visibility="collapsed", key="detailed_week")
     
     with col4:
         st.markdown("**Date**")
@@ -3261,107 +2191,89 @@ def detailed_view():
             available_dates,
             default=[pd.to_datetime("2026-02-12")],
             format_func=lambda x: x.strftime("%Y-%m-%d"),
-            label_visibility="collapsed"
+            label_visibility="collapsed",
+            key="detailed_dates"
         )
     
     with col5:
         st.markdown("**Shift**")
         shifts = st.multiselect("", ["1st", "2nd", "3rd"], 
-                               default=["1st", "2nd", "3rd"], label_visibility="collapsed")
+                               default=["1st", "2nd", "3rd"], label_visibility="collapsed", key="detailed_shifts")
 
 
+    annotate(location=location, department=selected_department, week=week,
+             dates=[date.strftime("%Y-%m-%d") for date in selected_dates], shifts=list(shifts))
+    
+    # Planning KPIs and the HC/attendance grid rerun together (Expected HC depends on the hedge row);
+    # the roster details rerun on their own
+    render_planning_section(location, selected_department, week, selected_dates, shifts)
+    render_roster_section(selected_department, selected_dates, shifts)
+    
+    st.markdown("**Labor Planning Shift Optimizer** | Data as of " + datetime.now().strftime("%Y-%m-%d %H:%M"))
+
+
+@st.fragment
+@profiled("planning section")
+def render_planning_section(location, selected_department, week, selected_dates, shifts):
+    """Overview KPIs and the HC/attendance grid
+    
+    Runs as a fragment: hedge edits and table view changes rerun only this section.
+    """
+    from st_aggrid import AgGrid, DataReturnMode, GridUpdateMode
+    
+    annotate(location=location, department=selected_department, week=week,
+             dates=[date.strftime("%Y-%m-%d") for date in selected_dates], shifts=list(shifts))
+    
     # Calculate dynamic metrics based on filter selections
     primary_date = selected_dates[0] if selected_dates else pd.to_datetime("2026-02-12")
-    metrics = calculate_dynamic_metrics(location, selected_department, week, primary_date, shifts)
+    with phase("metrics"):
+        metrics = calculate_dynamic_metrics(location, selected_department, week, primary_date, shifts)
     gap_status, gap_class, gap_color = get_gap_status_info(metrics["gap"], metrics["gap_percentage"])
     show_alert = should_show_alert(metrics["gap"], metrics["gap_percentage"])
     
     # Generate dynamic data that actually varies by filters
     if selected_dates and shifts:
-        filtered_shift_data, filtered_hc_data, filtered_attendance_data = generate_dynamic_table_data(
-            location, selected_department, week, selected_dates, shifts
-        )
-        
-        # Adjust shift data to match overview totals
-        filtered_shift_data = validate_and_adjust_totals(filtered_shift_data, metrics, shifts)
-        # Define mappings for HC validation
-
-        employee_types = ['FTE', 'TEMP', 'NEW HIRES', 'Day Labor (Flex)', 'Day Labor (WW/GS)', 'Overtime (VEH/MEH)', 'Time Off (VER/MTO)']
-
-        data_key_mapping = {'FTE': 'FTE', 'TEMP': 'TEMP', 'NEW HIRES': 'NEW HIRES', 'Day Labor (Flex)': 'FLEX', 'Day Labor (WW/GS)': 'WW/GS', 'Overtime (VEH/MEH)': 'VEH/MEH', 'Time Off (VER/MTO)': 'PTO'}
-
-        attendance_key_mapping = {'FTE': 'FTE Attendance Assumption', 'TEMP': 'TEMP Attendance Assumption', 'NEW HIRES': 'NEW HIRES Show Up Rate', 'Day Labor (Flex)': 'FLEX Show Up Rate', 'Day Labor (WW/GS)': 'WW/GS Show Up Rate', 'Overtime (VEH/MEH)': 'VEH Show Up Rate', 'Time Off (VER/MTO)': 'PTO Rate'}
-
+        with phase("table data"):
+            filtered_shift_data, filtered_hc_data, filtered_attendance_data = generate_dynamic_table_data(
+                location, selected_department, week, selected_dates, shifts
+            )
         
-
+        if metrics.get('from_history'):
+            # Site history gives Needed HC and punches for every selected date/shift
+            metrics['needed'] = sum(data['Total Needed'] for data in filtered_shift_data.values())
+            metrics['punches'] = sum(data['Total Punches'] for data in filtered_shift_data.values())
+        else:
+            # Adjust shift data to match overview totals
+            with phase("validate/adjust"):
+                filtered_shift_data = validate_and_adjust_totals(filtered_shift_data, metrics, shifts)
         
-        # Calculate actual Expected HC from table data (sum across all shifts)
-        total_expected_hc = 0
-        for shift_key, hc_data in filtered_hc_data.items():
-            attendance_data = filtered_attendance_data.get(shift_key, {})
-            
-            # Extract date and shift for hedge lookup
-            parts = shift_key.split(' ')
-            date_str = parts[0]
-            shift_num = parts[-1]
-            hedge_key = f"{date_str}_{shift_num}st"
-            hedge_rate = st.session_state.hedge_rates.get(hedge_key, 0.0)
-            
-            # Ensure hedge_rate is numeric
-            try:
-                hedge_rate = float(hedge_rate)
-            except (ValueError, TypeError):
-                hedge_rate = 0.0
-            
-            for emp_type in employee_types:
-                data_key = data_key_mapping.get(emp_type, emp_type)
-                attendance_key = attendance_key_mapping.get(emp_type, f'{emp_type} Attendance Assumption')
-                scheduled_hc = hc_data.get(data_key, 0)
-                attendance_str = attendance_data.get(attendance_key, '0%')
-                attendance_pct = float(attendance_str.rstrip('%')) / 100.0
-                
-                # Apply hedge rate only to FTE and TEMP (as per user requirement)
-                if emp_type in ['FTE', 'TEMP']:
-                    hedged_attendance_pct = attendance_pct + (hedge_rate / 100.0)
-                    # Clamp to valid range [0, 1]
-                    hedged_attendance_pct = max(0, min(1, hedged_attendance_pct))
-                else:
-                    hedged_attendance_pct = attendance_pct
-                
-                # Time Off (VER/MTO) should be subtracted, not added
-                if emp_type == 'Time Off (VER/MTO)':
-                    total_expected_hc -= scheduled_hc * hedged_attendance_pct
-                else:
-                    total_expected_hc += scheduled_hc * hedged_attendance_pct
+        # Expected HC cube (date × shift × worker type) and grid, built once per filter selection;
+        # hedge edits recompute only the edited date/shift column
+        filter_key = normalize_filter_selection(location, selected_department, week, selected_dates, shifts)
+        with phase("Expected HC engine"):
+            planning_state = get_planning_state(filter_key, filtered_hc_data, filtered_attendance_data)
+        hc_engine = planning_state['hc_engine']
         
         # Override metrics with calculated Expected HC
-        metrics['expected'] = int(round(total_expected_hc))
+        metrics['expected'] = hc_engine.total
         
-        # Adjust Needed HC to be slightly higher than Expected HC (20-25% buffer)
+        # Without history, Needed HC is slightly higher than Expected HC (20-25% buffer)
         # This represents the target staffing level to meet operational needs
-        import random
-        buffer_pct = random.uniform(1.20, 1.25)  # 20-25% higher
-        metrics['needed'] = int(round(metrics['expected'] * buffer_pct))
+        if not metrics.get('from_history'):
+            metrics['needed'] = int(round(metrics['expected'] * planning_state['buffer_pct']))
         
         metrics['gap'] = metrics['expected'] - metrics['needed']
         metrics['gap_percentage'] = (metrics['gap'] / metrics['needed'] * 100) if metrics['needed'] > 0 else 0
         gap_status, gap_class, gap_color = get_gap_status_info(metrics["gap"], metrics["gap_percentage"])
         
-        
-        # Adjust HC data to match overview Expected HC total
-        filtered_hc_data = validate_and_adjust_hc_totals(filtered_hc_data, filtered_attendance_data, metrics['expected'], employee_types, data_key_mapping, attendance_key_mapping)
-        
-        # Filter employees - updated to use new structure
-        filtered_employees = filter_employee_data_by_selections(st.session_state.employee_data, selected_department, selected_dates, shifts)
-        
         # Create shift breakdowns for each metric (moved inside if block)
         try:
-            needed_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Needed', overview_total=metrics["needed"])
-            expected_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Expected', 
-                                                            filtered_hc_data=filtered_hc_data, 
-                                                            filtered_attendance_data=filtered_attendance_data)
-            gap_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Needed', overview_total=abs(metrics["gap"]))
-            punches_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Punches', overview_total=metrics["punches"])
+            with phase("breakdown text"):
+                needed_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Needed', overview_total=metrics["needed"])
+                expected_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Expected', 
+                                                                hc_engine=hc_engine)
+                gap_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Needed', overview_total=abs(metrics["gap"]))
+                punches_breakdown = create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, 'Total Punches', overview_total=metrics["punches"])
         except Exception as e:
             # Fallback to empty breakdowns if there's an error
             needed_breakdown = ""
@@ -3370,26 +2282,28 @@ def detailed_view():
             punches_breakdown = ""
             st.error(f"Error creating shift breakdowns: {str(e)}")
         
-        # Pre-calculate table to get actual Expected HC total BEFORE displaying overview
-        try:
-            table_df, table_gridOptions, table_custom_css, table_grid_height, actual_expected_hc = create_combined_hc_attendance_aggrid_table(
-                filtered_hc_data, filtered_attendance_data, metrics["expected"]
-            )
-            # Update metrics with actual table total
-            metrics["expected"] = actual_expected_hc
-            
-            # Recalculate gap with corrected expected HC
-            metrics['gap'] = metrics['expected'] - metrics['needed']
-            metrics['gap_percentage'] = (metrics['gap'] / metrics['needed'] * 100) if metrics['needed'] > 0 else 0
-        except Exception as e:
-            st.error(f"Error calculating expected HC: {str(e)}")
+        # Grid frame and options, rebuilt only for a new filter selection or table view mode
+        view_mode = st.session_state.get('table_view_mode', 'Roster & Expected')
+        if planning_state['grid'] is None or planning_state['grid_view_mode'] != view_mode:
+            try:
+                with phase("grid construction"):
+                    planning_state['grid'] = create_combined_hc_attendance_aggrid_table(
+                        filtered_hc_data, filtered_attendance_data, metrics["expected"], hc_engine=hc_engine
+                    )[:4]
+                planning_state['grid_view_mode'] = view_mode
+            except Exception as e:
+                st.error(f"Error calculating expected HC: {str(e)}")
+                planning_state['grid'] = None
+        
+        if planning_state['grid'] is not None:
+            table_df, table_gridOptions, table_custom_css, table_grid_height = planning_state['grid']
+        else:
             table_df, table_gridOptions, table_custom_css, table_grid_height = None, None, None, None
     else:
         # Empty data if no selections
         filtered_shift_data = {}
         filtered_hc_data = {}
         filtered_attendance_data = {}
-        filtered_employees = []
         # Initialize empty breakdowns
         needed_breakdown = ""
         expected_breakdown = ""
@@ -3398,60 +2312,61 @@ def detailed_view():
         # Initialize table variables
         table_df, table_gridOptions, table_custom_css, table_grid_height = None, None, None, None
     
-    # Weekly Overview section
-    st.markdown('<div class="section-header">Overview</div>', unsafe_allow_html=True)
-    
-    # Key metrics row - All three KPIs: Needed HC, Expected HC, Gap in HC
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        render_metric_with_tooltip("Needed HC", "Total required headcount")
-        st.markdown(f'<div class="metric-large">{metrics["needed"]}</div>', unsafe_allow_html=True)
-        # Dynamic change indicator
-        change_symbol = "&#8599;" if metrics["needed_change"] >= 0 else "&#8600;"
-        change_class = "metric-change-up" if metrics["needed_change"] >= 0 else "metric-change-down"
-        st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(metrics["needed_change"])}% vs last week</div>', unsafe_allow_html=True)
-        # Shift breakdown
-        if needed_breakdown:
-            st.markdown(f'<div class="shift-breakdown">{needed_breakdown}</div>', unsafe_allow_html=True)
-    
-    with col2:
-        render_metric_with_tooltip("Expected HC", "Expected headcount based on attendance")
-        st.markdown(f'<div class="metric-large">{metrics["expected"]}</div>', unsafe_allow_html=True)
-        # Dynamic change indicator  
-        change_symbol = "&#8599;" if metrics["expected_change"] >= 0 else "&#8600;"
-        change_class = "metric-change-up" if metrics["expected_change"] >= 0 else "metric-change-down"
-        st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(metrics["expected_change"])}% vs last week</div>', unsafe_allow_html=True)
-        # Shift breakdown
-        if expected_breakdown:
-            st.markdown(f'<div class="shift-breakdown">{expected_breakdown}</div>', unsafe_allow_html=True)
-    
-    with col3:
-        render_metric_with_tooltip("Gap in HC", "Expected - Needed")
-        st.markdown(f'<div class="metric-large" style="color: #d62728;">{abs(metrics["gap"])}</div>', unsafe_allow_html=True)
-        # Dynamic change indicator - similar to other metrics
-        gap_change = metrics.get("gap_change", 3)  # Default to 3% if not available
-        change_symbol = "&#8599;" if gap_change >= 0 else "&#8600;"
-        change_class = "metric-change-up" if gap_change >= 0 else "metric-change-down"
-        st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(gap_change)}% vs last week</div>', unsafe_allow_html=True)
-        # Shift breakdown
-        if gap_breakdown:
-            st.markdown(f'<div class="shift-breakdown">{gap_breakdown}</div>', unsafe_allow_html=True)
-    
-    with col4:
-        render_metric_with_tooltip("Punches", "Total attendance punches")
-        punches_value = metrics.get("punches", 0)
-        st.markdown(f'<div class="metric-large">{punches_value}</div>', unsafe_allow_html=True)
-        
-        # Dynamic change indicator
-        punches_change = metrics.get("punches_change", 4)  # Default to 4% if not available
-        change_symbol = "&#8599;" if punches_change >= 0 else "&#8600;"
-        change_class = "metric-change-up" if punches_change >= 0 else "metric-change-down"
-        st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(punches_change)}% vs last week</div>', unsafe_allow_html=True)
-        # Shift breakdown
-        if punches_breakdown:
-            st.markdown(f'<div class="shift-breakdown">{punches_breakdown}</div>', unsafe_allow_html=True)
+    with phase("overview HTML"):
+        # Weekly Overview section
+        st.markdown('<div class="section-header">Overview</div>', unsafe_allow_html=True)
+    
+        # Key metrics row - All three KPIs: Needed HC, Expected HC, Gap in HC
+    
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            render_metric_with_tooltip("Needed HC", "Total required headcount")
+            st.markdown(f'<div class="metric-large">{metrics["needed"]}</div>', unsafe_allow_html=True)
+            # Dynamic change indicator
+            change_symbol = "&#8599;" if metrics["needed_change"] >= 0 else "&#8600;"
+            change_class = "metric-change-up" if metrics["needed_change"] >= 0 else "metric-change-down"
+            st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(metrics["needed_change"])}% vs last week</div>', unsafe_allow_html=True)
+            # Shift breakdown
+            if needed_breakdown:
+                st.markdown(f'<div class="shift-breakdown">{needed_breakdown}</div>', unsafe_allow_html=True)
+    
+        with col2:
+            render_metric_with_tooltip("Expected HC", "Expected headcount based on attendance")
+            st.markdown(f'<div class="metric-large">{metrics["expected"]}</div>', unsafe_allow_html=True)
+            # Dynamic change indicator  
+            change_symbol = "&#8599;" if metrics["expected_change"] >= 0 else "&#8600;"
+            change_class = "metric-change-up" if metrics["expected_change"] >= 0 else "metric-change-down"
+            st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(metrics["expected_change"])}% vs last week</div>', unsafe_allow_html=True)
+            # Shift breakdown
+            if expected_breakdown:
+                st.markdown(f'<div class="shift-breakdown">{expected_breakdown}</div>', unsafe_allow_html=True)
+    
+        with col3:
+            render_metric_with_tooltip("Gap in HC", "Expected - Needed")
+            st.markdown(f'<div class="metric-large" style="color: #d62728;">{abs(metrics["gap"])}</div>', unsafe_allow_html=True)
+            # Dynamic change indicator - similar to other metrics
+            gap_change = metrics.get("gap_change", 3)  # Default to 3% if not available
+            change_symbol = "&#8599;" if gap_change >= 0 else "&#8600;"
+            change_class = "metric-change-up" if gap_change >= 0 else "metric-change-down"
+            st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(gap_change)}% vs last week</div>', unsafe_allow_html=True)
+            # Shift breakdown
+            if gap_breakdown:
+                st.markdown(f'<div class="shift-breakdown">{gap_breakdown}</div>', unsafe_allow_html=True)
+    
+        with col4:
+            render_metric_with_tooltip("Punches", "Total attendance punches")
+            punches_value = metrics.get("punches", 0)
+            st.markdown(f'<div class="metric-large">{punches_value}</div>', unsafe_allow_html=True)
+        
+            # Dynamic change indicator
+            punches_change = metrics.get("punches_change", 4)  # Default to 4% if not available
+            change_symbol = "&#8599;" if punches_change >= 0 else "&#8600;"
+            change_class = "metric-change-up" if punches_change >= 0 else "metric-change-down"
+            st.markdown(f'<div class="metric-change {change_class}">{change_symbol} {abs(punches_change)}% vs last week</div>', unsafe_allow_html=True)
+            # Shift breakdown
+            if punches_breakdown:
+                st.markdown(f'<div class="shift-breakdown">{punches_breakdown}</div>', unsafe_allow_html=True)
     # Department Details section
     st.markdown(f'<div class="section-header">{selected_department} Shift Details ({metrics["expected"]})</div>', unsafe_allow_html=True)
     
@@ -3484,14 +2399,10 @@ def detailed_view():
             options=['Roster & Expected', 'Roster & Punches', 'All Columns'],
             index=['Roster & Expected', 'Roster & Punches', 'All Columns'].index(st.session_state.get('table_view_mode', 'Roster & Expected')),
             key='table_view_selector',
+            on_change=select_table_view,
             label_visibility='collapsed'
         )
-        
-        # Update session state if changed
-        if st.session_state.table_view_mode != view_mode:
-            st.session_state.table_view_mode = view_mode
-            st.rerun()
-    
+
     with view_col2:
         # Display view description
         view_descriptions = {
@@ -3509,126 +2420,189 @@ def detailed_view():
         st.markdown("*Hover over cells to see detailed breakdowns and comparisons*")
     
     if table_df is not None:
-        grid_response = AgGrid(
-            table_df,
-            gridOptions=table_gridOptions,
-            update_mode=GridUpdateMode.VALUE_CHANGED,
-            data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
-            fit_columns_on_grid_load=False,
-            theme='streamlit',
-            height=table_grid_height,
-            allow_unsafe_jscode=True,
-            custom_css=table_custom_css,
-            reload_data=False
-        )
+        with phase("AgGrid"):
+            grid_response = AgGrid(
+                table_df,
+                gridOptions=table_gridOptions,
+                update_mode=GridUpdateMode.VALUE_CHANGED,
+                data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
+                fit_columns_on_grid_load=False,
+                theme='streamlit',
+                height=table_grid_height,
+                allow_unsafe_jscode=True,
+                custom_css=table_custom_css,
+                reload_data=False
+            )
         
         # Update hedge rates from edited table
         updated_df = grid_response['data']
         hedge_row = updated_df[updated_df['Employee Type'].str.contains('Hedge Attendance Rate', na=False)]
-    
-    if not hedge_row.empty:
-        columns_list = sorted(list(filtered_hc_data.keys()))
-        hedge_changed = False
         
-        for idx, shift_key in enumerate(columns_list):
-            parts = shift_key.split(' ')
-            date_str = parts[0]
-            shift_num = parts[-1]
-            hedge_key = f"{date_str}_{shift_num}st"
+        if not hedge_row.empty:
+            columns_list = sorted(list(filtered_hc_data.keys()))
+            hedge_changed = False
+        
+            for idx, shift_key in enumerate(columns_list):
+                parts = shift_key.split(' ')
+                date_str = parts[0]
+                shift_num = parts[-1]
+                hedge_key = f"{date_str}_{shift_num}st"
             
-            col_name = f'S{idx+1}_Roster'
-            new_hedge = hedge_row[col_name].values[0]
+                col_name = f'S{idx+1}_Roster'
+                new_hedge = hedge_row[col_name].values[0]
             
-            # Ensure new_hedge is a number (convert if string or other type)
-            try:
-                new_hedge = float(new_hedge) if new_hedge is not None else 0.0
-            except (ValueError, TypeError):
-                new_hedge = 0.0
+                # Ensure new_hedge is a number (convert if string or other type)
+                try:
+                    new_hedge = float(new_hedge) if new_hedge is not None else 0.0
+                except (ValueError, TypeError):
+                    new_hedge = 0.0
             
-            old_hedge = st.session_state.hedge_rates.get(hedge_key, 0.0)
+                old_hedge = st.session_state.hedge_rates.get(hedge_key, 0.0)
             
-            if new_hedge != old_hedge:
-                st.session_state.hedge_rates[hedge_key] = new_hedge
-                hedge_changed = True
+                if new_hedge != old_hedge:
+                    st.session_state.hedge_rates[hedge_key] = new_hedge
+                    hedge_changed = True
         
-        if hedge_changed:
-            st.rerun()
+            if hedge_changed:
+                # Recompute only the edited columns, then refresh the KPIs and grid (this fragment only)
+                sync_planning_hedges(planning_state, st.session_state.hedge_rates)
+                rerun_fragment()
+
+
+def rerun_fragment():
+    """Rerun the calling fragment, or the whole app when the fragment is drawn as part of a full rerun
+
+    st.rerun(scope="fragment") raises outside a fragment rerun; fragment_ids_this_run is
+    what Streamlit checks, and is private, so without it this falls back to a full rerun.
+    """
+    ctx = get_script_run_ctx()
+    if getattr(ctx, 'fragment_ids_this_run', None):
+        st.rerun(scope="fragment")
+    st.rerun()
+
+
+def select_table_view():
+    """Table view selector callback - runs before the rerun, so the grid is built in the new view at once"""
+    st.session_state.table_view_mode = st.session_state.table_view_selector
+
+
+def step_roster_page(step):
+    """Previous/Next button callback - runs before the fragment rerun, so the new page renders at once"""
+    st.session_state.roster_page = st.session_state.get('roster_page', 1) + step
+
+
+@st.fragment
+@profiled("roster section")
+def render_roster_section(selected_department, selected_dates, shifts):
+    """Roster details with employee filters, CSV download and the employee table
+    
+    Runs as a fragment: roster filter changes rerun only this section.
+    """
+    annotate(department=selected_department, dates=[date.strftime("%Y-%m-%d") for date in selected_dates],
+             shifts=list(shifts))
+    
+    roster = get_roster()
+    has_selection = bool(selected_dates and shifts)
     
     st.markdown(f'<div class="section-header">{selected_department} Roster Details</div>', unsafe_allow_html=True)
     
-    # Employee List Filters
+    # Employee List Filters - options are the distinct values within the department, dates and shifts
     st.markdown("**Filter Results:**")
     emp_col1, emp_col2, emp_col3 = st.columns(3)
     
-    # Convert filtered_employees list to DataFrame for easier filtering
-    if filtered_employees:
-        emp_df = pd.DataFrame(filtered_employees)
+    if has_selection:
+        with phase("roster filters"):
+            options = roster_filter_options(roster, selected_department, selected_dates, shifts)
     else:
-        emp_df = pd.DataFrame()
+        options = {'worker_types': [], 'schedules': [], 'roster_buckets': []}
     
     with emp_col1:
-        if not emp_df.empty:
-            worker_type_options = ["All"] + sorted(emp_df["Worker Type"].unique().tolist())
-        else:
-            worker_type_options = ["All"]
-        worker_type_filter = st.selectbox("Worker Type", worker_type_options)
+        worker_type_filter = st.selectbox("Worker Type", ["All"] + options['worker_types'])
         
     with emp_col2:
-        if not emp_df.empty:
-            schedule_options = ["All"] + sorted(emp_df["Workday Schedule"].unique().tolist())
-        else:
-            schedule_options = ["All"]
-        schedule_filter = st.selectbox("Workday Schedule", schedule_options)
+        schedule_filter = st.selectbox("Workday Schedule", ["All"] + options['schedules'])
         
     with emp_col3:
-        if not emp_df.empty:
-            roster_options = ["All"] + sorted(emp_df["Roster Bucket"].unique().tolist())
-        else:
-            roster_options = ["All"]
-        roster_filter = st.selectbox("Roster Bucket", roster_options)
-    
-    # Apply filters
-    filtered_emp_df = emp_df.copy()
-    if worker_type_filter != "All":
-        filtered_emp_df = filtered_emp_df[filtered_emp_df["Worker Type"] == worker_type_filter]
-    if schedule_filter != "All":
-        filtered_emp_df = filtered_emp_df[filtered_emp_df["Workday Schedule"] == schedule_filter]
-    if roster_filter != "All":
-        filtered_emp_df = filtered_emp_df[filtered_emp_df["Roster Bucket"] == roster_filter]
-    
-    # CSV Download button
-    if not filtered_emp_df.empty:
-        csv = filtered_emp_df.to_csv(index=False).encode('utf-8')
+        roster_filter = st.selectbox("Roster Bucket", ["All"] + options['roster_buckets'])
+    
+    # Employee ID search - a lookup in the roster's ID index, not a scan of every row
+    employee_search = st.text_input("Search Employee ID", key='roster_employee_search',
+                                    placeholder="Type any part of an Employee ID").strip()
+    
+    # Sorting and page size - applied by the store, so only the visible page is built and sent
+    sort_col1, sort_col2, sort_col3 = st.columns(3)
+    with sort_col1:
+        sort_by = st.selectbox("Sort by", ["Roster order"] + list(roster.columns), key='roster_sort_by')
+    with sort_col2:
+        sort_direction = st.selectbox("Order", ["Ascending", "Descending"], key='roster_sort_direction')
+    with sort_col3:
+        page_size = st.selectbox("Rows per page", ROSTER_PAGE_SIZES, key='roster_page_size')
+    
+    filters = dict(
+        employee_id_filter=employee_search or None,
+        worker_type_filter=None if worker_type_filter == "All" else [worker_type_filter],
+        schedule_filter=None if schedule_filter == "All" else [schedule_filter],
+        roster_bucket_filter=None if roster_filter == "All" else [roster_filter],
+    )
+    
+    # Back to the first page whenever the selection, filters or sort change
+    view_key = (selected_department, tuple(selected_dates or ()), tuple(shifts or ()),
+                employee_search, worker_type_filter, schedule_filter, roster_filter, sort_by, sort_direction, page_size)
+    if st.session_state.get('roster_view_key') != view_key:
+        st.session_state.roster_view_key = view_key
+        st.session_state.roster_page = 1
+    
+    # The store applies every filter, sorts and slices (codes in memory, ORDER BY/LIMIT in SQLite)
+    if has_selection:
+        with phase("roster page"):
+            page_df, page, page_count, total_rows = page_employee_data_by_selections(
+                roster, selected_department, selected_dates, shifts,
+                page=st.session_state.roster_page, page_size=page_size,
+                sort_by=None if sort_by == "Roster order" else sort_by,
+                ascending=sort_direction == "Ascending",
+                **filters,
+            )
+        st.session_state.roster_page = page
+    else:
+        page_df, page, page_count, total_rows = pd.DataFrame(), 1, 1, 0
+    
+    # CSV Download button - the full filtered list is only built when the download is clicked
+    if total_rows:
         st.download_button(
             label="Download Employee List as CSV",
-            data=csv,
+            data=lambda: filter_employee_data_by_selections(
+                roster, selected_department, selected_dates, shifts, **filters
+            ).to_csv(index=False).encode('utf-8'),
             file_name=f"{selected_department}_employee_list.csv",
             mime="text/csv",
             key='download-csv'
         )
     
-    # Employee details table
-    fig = create_employee_details_table_with_tooltips(selected_department, filtered_emp_df.to_dict('records') if not filtered_emp_df.empty else [])
-    #     st.error(f"âš ï¸ {selected_department} is understaffed by {abs(gap)} people")
+    #     st.error(f"âš ï¸ {selected_department} is understaffed by {abs(gap)} people")
     # elif gap > 0:
     #     st.success(f"âœ… {selected_department} has {gap} extra people")
     # else:
     #     st.info(f"âœ… {selected_department} staffing is balanced")
 
-    # Employee details table
-    fig = create_employee_details_table_with_tooltips(selected_department, filtered_emp_df.to_dict('records') if not filtered_emp_df.empty else [])
+    # Employee details table - current page only
+    with phase("roster table"):
+        fig = create_employee_details_table_with_tooltips(selected_department, page_df)
     if fig:
-        st.plotly_chart(fig, use_container_width=True)
+        with phase("Plotly"):
+            st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No employee data available for this department.")
     
-    # Footer - matching mockup pagination
+    # Footer - page navigation
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        st.button("◀ Previous", key='roster_prev_page', disabled=page <= 1, on_click=step_roster_page, args=(-1,))
     with col2:
-        st.markdown('<div style="text-align: center; color: #666;">-- 1 of 1 --</div>', unsafe_allow_html=True)
-    
-    st.markdown("**Labor Planning Shift Optimizer** | Data as of " + datetime.now().strftime("%Y-%m-%d %H:%M"))
+        st.markdown(f'<div style="text-align: center; color: #666;">-- {page} of {page_count} --<br>'
+                    f'<small>{total_rows:,} rows</small></div>', unsafe_allow_html=True)
+    with col3:
+        st.button("Next ▶", key='roster_next_page', disabled=page >= page_count, on_click=step_roster_page, args=(1,))
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Benchmarks for the shift_optimizer planning core (run with ``python -m benchmarks.<name>``)"""
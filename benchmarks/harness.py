@@ -0,0 +1,186 @@
+"""Timing, peak-memory and baseline helpers shared by the benchmark scripts"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+# Absolute slack on top of the relative tolerances, so timer noise on sub-millisecond
+# cases and small allocator differences don't count as regressions
+TIME_FLOOR_S = 0.002
+MEMORY_FLOOR_BYTES = 64 * 1024
+
+
+def measure(func, setup=None, repeat=5):
+    """Best/median wall time in seconds and traced peak memory in bytes for func()
+
+    setup() runs before every call and is not timed. Peak memory comes from a separate
+    tracemalloc run so tracing overhead doesn't leak into the timings.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'peak_bytes': peak}
+
+
+def load_baseline(path):
+    """Results keyed by case name from a baseline file, or None if there is none"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open() as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    with Path(path).open('w') as f:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baseline, time_tolerance, memory_tolerance):
+    """Messages for every case slower or hungrier than the baseline beyond the tolerances"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['best_s'] > reference['best_s'] * (1 + time_tolerance) + TIME_FLOOR_S:
+            regressions.append(f"{name}: time {format_seconds(result['best_s'])} vs baseline {format_seconds(reference['best_s'])}")
+        if result['peak_bytes'] > reference['peak_bytes'] * (1 + memory_tolerance) + MEMORY_FLOOR_BYTES:
+            regressions.append(f"{name}: peak memory {format_bytes(result['peak_bytes'])} vs baseline {format_bytes(reference['peak_bytes'])}")
+    return regressions
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def format_bytes(n_bytes):
+    for unit in ('B', 'KiB', 'MiB'):
+        if n_bytes < 1024:
+            return f"{n_bytes:.0f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} GiB"
+
+
+def format_change(value, reference):
+    if not reference:
+        return ''
+    return f"{(value / reference - 1) * 100:+.0f}%"
+
+
+def print_report(results, baseline=None):
+    baseline = baseline or {}
+    width = max(len(name) for name in results)
+    print(f"{'case':<{width}}  {'best':>10}  {'median':>10}  {'peak mem':>10}  {'Δ time':>7}  {'Δ mem':>7}")
+    for name, result in results.items():
+        reference = baseline.get(name, {})
+        print(f"{name:<{width}}  {format_seconds(result['best_s']):>10}  {format_seconds(result['median_s']):>10}  "
+              f"{format_bytes(result['peak_bytes']):>10}  "
+              f"{format_change(result['best_s'], reference.get('best_s')):>7}  "
+              f"{format_change(result['peak_bytes'], reference.get('peak_bytes')):>7}")
+
+
+def benchmark_parser(description):
+    """Argument parser with the options shared by every benchmark script"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--quick', action='store_true', help='run only the smallest scale of each benchmark')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case (best is compared)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--time-tolerance', type=float, default=0.25, help='allowed slowdown vs baseline (0.25 = 25%%)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10, help='allowed peak memory growth vs baseline')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    return parser
+
+
+def report_results(results, args):
+    """Write, save or compare results as the shared options ask; returns the exit code
+
+    0 when nothing regressed, 1 on a regression, 2 when nothing ran or there is no
+    baseline to compare with (so a missing baseline never passes the gate).
+    """
+    if not results:
+        print("No benchmark cases matched.", file=sys.stderr)
+        return 2
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        baseline.update(results)
+        save_baseline(args.baseline, baseline)
+        print_report(results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    print_report(results, baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 2
+
+    regressions = find_regressions(results, baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print("\nNo regressions against the baseline.")
+    return 0
+
+
+def run_cli(description, build_cases, argv=None):
+    """Parse the shared options, run the selected cases and gate on the baseline
+
+    build_cases(quick) returns a list of (name, prepare) pairs; prepare() builds the
+    inputs and returns (func, setup). Inputs are only built for cases that are run.
+    Returns the process exit code (see report_results).
+    """
+    args = benchmark_parser(description).parse_args(argv)
+
+    results = {}
+    for name, prepare in build_cases(args.quick):
+        if args.filter not in name:
+            continue
+        func, setup = prepare()
+        results[name] = measure(func, setup=setup, repeat=args.repeat)
+        print(f"  {name}: {format_seconds(results[name]['best_s'])}", file=sys.stderr)
+
+    return report_results(results, args)
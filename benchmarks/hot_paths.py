@@ -0,0 +1,189 @@
+"""Benchmarks for the planning hot paths at production scale
+
+Run from the repository root:
+
+    python -m benchmarks.hot_paths                  # full sweep, compared with benchmarks/baseline.json
+    python -m benchmarks.hot_paths --quick          # smallest scale of each benchmark
+    python -m benchmarks.hot_paths --save-baseline  # record the current numbers as the baseline
+
+Exits with status 1 if any case is slower or uses more peak memory than the
+baseline allows (see --time-tolerance / --memory-tolerance), and with status 2
+if there is no baseline to compare with.
+"""
+import atexit
+import functools
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shift_optimizer import planning
+from shift_optimizer.engine import ExpectedHCEngine
+from shift_optimizer.rollup import generate_rollup_data
+from shift_optimizer.sample_data import DEFAULT_DEPARTMENTS
+from shift_optimizer.sqlite_store import SQLiteEmployeeStore
+from shift_optimizer.synthetic import generate_store
+
+from .harness import run_cli
+
+ROW_SCALES = [1_000, 10_000, 100_000, 1_000_000]
+DATE_SCALES = [1, 7, 30, 60]
+DEPARTMENT_SCALES = [7, 20, 50]
+
+LOCATION = "AZ Goodyear"
+DEPARTMENT = "Kitchen"
+WEEK = "2026-W08"
+SHIFTS = ["1st", "2nd", "3rd"]
+FIRST_DATE = pd.Timestamp("2026-02-12")
+
+# Dates covered by the benchmark roster (filters select all of them) and the daily roster rate
+ROSTER_DATES = 7
+WORKDAY_RATE = 5 / 7
+
+
+def benchmark_dates(n_dates):
+    return list(pd.date_range(FIRST_DATE, periods=n_dates, freq='D'))
+
+
+def benchmark_departments(n_departments):
+    """The default departments, padded with generated ones up to n_departments"""
+    departments = dict(list(DEFAULT_DEPARTMENTS.items())[:n_departments])
+    rng = np.random.default_rng(n_departments)
+    for i in range(len(departments), n_departments):
+        departments[f'Department {i + 1:02d}'] = int(rng.integers(-10, 11))
+    return departments
+
+
+@functools.lru_cache(maxsize=1)
+def benchmark_store(n_rows):
+    """EmployeeStore with about n_rows synthetic roster rows over the default departments"""
+    employees_per_shift = n_rows / (len(DEFAULT_DEPARTMENTS) * len(SHIFTS) * ROSTER_DATES * WORKDAY_RATE)
+    return generate_store(departments=len(DEFAULT_DEPARTMENTS), days=ROSTER_DATES, start_date=FIRST_DATE,
+                          employees_per_shift=employees_per_shift, workday_rate=WORKDAY_RATE, seed=n_rows)
+
+
+# n_rows -> (SQLiteEmployeeStore, TemporaryDirectory holding its database); at most one is kept
+_sqlite_stores = {}
+
+
+def benchmark_sqlite_store(n_rows):
+    """SQLiteEmployeeStore over benchmark_store(n_rows) in a temporary directory
+
+    Only the latest is kept: building another one, or exiting, closes its pool and
+    deletes its directory.
+    """
+    if n_rows not in _sqlite_stores:
+        close_sqlite_stores()
+        directory = tempfile.TemporaryDirectory(prefix="shift_optimizer_bench_")
+        store = SQLiteEmployeeStore.create(benchmark_store(n_rows).to_frame(), Path(directory.name) / "roster.db")
+        _sqlite_stores[n_rows] = (store, directory)
+    return _sqlite_stores[n_rows][0]
+
+
+@atexit.register
+def close_sqlite_stores():
+    """Close the benchmark SQLite stores' connection pools and delete their directories"""
+    while _sqlite_stores:
+        _, (store, directory) = _sqlite_stores.popitem()
+        store.pool.close()
+        directory.cleanup()
+
+
+def rollup_case(n_dates, n_departments):
+    def prepare():
+        dates = benchmark_dates(n_dates)
+        departments = benchmark_departments(n_departments)
+        return (lambda: generate_rollup_data(dates, departments)), None
+    return prepare
+
+
+def table_data_case(n_dates):
+    def prepare():
+        dates = benchmark_dates(n_dates)
+        func = lambda: planning.generate_dynamic_table_data(LOCATION, DEPARTMENT, WEEK, dates, SHIFTS)
+        # Time the generation itself, not the memoized lookup
+        return func, planning._generate_dynamic_table_data.cache_clear
+    return prepare
+
+
+def hc_grid_case(n_dates):
+    def prepare():
+        _, hc_data, attendance_data = planning.generate_dynamic_table_data(LOCATION, DEPARTMENT, WEEK, benchmark_dates(n_dates), SHIFTS)
+
+        def func():
+            hc_engine = ExpectedHCEngine.from_table_data(hc_data, attendance_data, {})
+            return planning.build_hc_grid_frame(hc_data, attendance_data, hc_engine)
+        return func, None
+    return prepare
+
+
+def filter_case(n_rows, narrowed, backend='memory'):
+    def prepare():
+        store = benchmark_sqlite_store(n_rows) if backend == 'sqlite' else benchmark_store(n_rows)
+        dates = benchmark_dates(ROSTER_DATES)
+        if narrowed:
+            func = lambda: planning.filter_employee_data_by_selections(
+                store, DEPARTMENT, dates, SHIFTS, worker_type_filter=['FTE', 'TEMP'], employee_id_filter='12'
+            )
+        else:
+            func = lambda: planning.filter_employee_data_by_selections(store, DEPARTMENT, dates, SHIFTS)
+        return func, None
+    return prepare
+
+
+def page_case(n_rows, backend='memory'):
+    def prepare():
+        store = benchmark_sqlite_store(n_rows) if backend == 'sqlite' else benchmark_store(n_rows)
+        dates = benchmark_dates(ROSTER_DATES)
+        # A middle page sorted by a per-employee column: sort every match, build 50 rows
+        func = lambda: planning.page_employee_data_by_selections(
+            store, DEPARTMENT, dates, SHIFTS, page=3, page_size=50, sort_by='Employee Name', ascending=False
+        )
+        return func, None
+    return prepare
+
+
+def breakdown_case(n_dates):
+    def prepare():
+        dates = benchmark_dates(n_dates)
+        shift_data, hc_data, attendance_data = planning.generate_dynamic_table_data(LOCATION, DEPARTMENT, WEEK, dates, SHIFTS)
+        hc_engine = ExpectedHCEngine.from_table_data(hc_data, attendance_data, {})
+
+        def func():
+            planning.create_shift_breakdown_text(shift_data, dates, SHIFTS, 'Total Needed', overview_total=hc_engine.total)
+            planning.create_shift_breakdown_text(shift_data, dates, SHIFTS, 'Total Expected', hc_engine=hc_engine)
+        return func, None
+    return prepare
+
+
+def build_cases(quick=False):
+    rows = ROW_SCALES[:1] if quick else ROW_SCALES
+    dates = DATE_SCALES[:1] if quick else DATE_SCALES
+    departments = DEPARTMENT_SCALES[:1] if quick else DEPARTMENT_SCALES
+
+    cases = []
+    for n_dates in dates:
+        for n_departments in departments:
+            cases.append((f"generate_rollup_data[dates={n_dates},departments={n_departments}]", rollup_case(n_dates, n_departments)))
+    for n_dates in dates:
+        cases.append((f"generate_dynamic_table_data[dates={n_dates}]", table_data_case(n_dates)))
+    for n_dates in dates:
+        cases.append((f"hc_grid_frame[dates={n_dates}]", hc_grid_case(n_dates)))
+    for n_rows in rows:
+        cases.append((f"filter_employee_data_by_selections[rows={n_rows}]", filter_case(n_rows, narrowed=False)))
+        cases.append((f"filter_employee_data_by_selections[rows={n_rows},narrowed]", filter_case(n_rows, narrowed=True)))
+    for n_rows in rows:
+        cases.append((f"filter_employee_data_by_selections[sqlite,rows={n_rows}]", filter_case(n_rows, narrowed=False, backend='sqlite')))
+        cases.append((f"filter_employee_data_by_selections[sqlite,rows={n_rows},narrowed]", filter_case(n_rows, narrowed=True, backend='sqlite')))
+    for n_rows in rows:
+        cases.append((f"page_employee_data_by_selections[rows={n_rows}]", page_case(n_rows)))
+        cases.append((f"page_employee_data_by_selections[sqlite,rows={n_rows}]", page_case(n_rows, backend='sqlite')))
+    for n_dates in dates:
+        cases.append((f"create_shift_breakdown_text[dates={n_dates}]", breakdown_case(n_dates)))
+    return cases
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli("Benchmark the planning hot paths", build_cases))
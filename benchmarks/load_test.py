@@ -0,0 +1,316 @@
+"""Concurrent-session load test of app.py through Streamlit's AppTest (no browser)
+
+Each simulated planner is an AppTest session running a seeded script of
+interactions: switching between Rollup and Detailed view, changing dates,
+departments and shifts, and editing hedge rates. Sessions run in their own
+threads in one process, as a Streamlit server runs each session's script, and
+share the process-wide caches (roster, history). Run from the repository root:
+
+    python -m benchmarks.load_test                          # 1, 4 and 8 concurrent sessions
+    python -m benchmarks.load_test --sessions 16 --steps 40
+    python -m benchmarks.load_test --sessions 8 --max-p95-ms 1500   # exit 1 if p95 is slower
+
+Reports p50/p95/p99 rerun latency per concurrency level and per interaction,
+and the server's resident memory before, at peak and after each level.
+
+AppTest reruns the whole script for every interaction. A hedge edit in the
+browser reruns only the planning fragment, so hedge latencies here are an
+upper bound. AgGrid is a custom component AppTest cannot drive, so hedge edits
+are written to the session's hedge_rates, as the grid does, before the rerun.
+"""
+import argparse
+import json
+import random
+import resource
+import sys
+import threading
+import time
+import warnings
+from collections import Counter
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+from streamlit import config
+from streamlit.components.v2.component_manager import BidiComponentManager
+from streamlit.logger import set_log_level
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+from .harness import format_bytes
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+DEFAULT_SESSIONS = [1, 4, 8]
+DEFAULT_STEPS = 20
+DEFAULT_TIMEOUT_S = 120
+
+# RSS is sampled this often while a level runs, for its peak
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+DATES = list(pd.date_range("2026-02-12", periods=5, freq='D'))
+SHIFTS = ["1st", "2nd", "3rd"]
+HEDGE_RATES = [-20.0, -10.0, 0.0, 5.0, 10.0, 20.0]
+
+# Relative weight of each interaction; view switches happen whatever the current view
+ROLLUP_ACTIONS = {'detailed view': 3, 'rollup dates': 2}
+DETAILED_ACTIONS = {'rollup view': 1, 'dates': 2, 'department': 2, 'shifts': 1, 'hedge': 3}
+
+
+def current_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Background sampler of the process RSS, keeping its peak"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+        return False
+
+
+def emulate_server():
+    """Make concurrent AppTest runs share what a server shares between sessions
+
+    AppTest assumes one test at a time. Each run installs a new mock Runtime and
+    removes it when done, which pulls the runtime from under any other session
+    still running, and compiles the script into a fresh cache, which would add a
+    compile to every rerun (concurrent compiles can also fail in ast.parse on
+    CPython 3.11). Here every session sees one runtime and one ScriptCache, as
+    under `streamlit run`. Streamlit internals are patched, so this is for the
+    load test only.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    # AppTest sets this per run and restores it after; set for good so runs can't unset it for each other
+    config.set_option("global.appTest", True)
+
+    cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: cache
+
+
+def dates_subset(rng):
+    return sorted(rng.sample(DATES, rng.randint(1, len(DATES))))
+
+
+def apply_action(at, action, rng):
+    """Set up one interaction on the session; the caller times the rerun"""
+    if action == 'detailed view':
+        at.sidebar.radio[0].set_value("Detailed View")
+    elif action == 'rollup view':
+        at.sidebar.radio[0].set_value("Rollup View")
+    elif action == 'rollup dates':
+        at.multiselect(key="rollup_dates").set_value(dates_subset(rng))
+    elif action == 'dates':
+        at.multiselect(key="detailed_dates").set_value(dates_subset(rng))
+    elif action == 'department':
+        department = at.selectbox(key="detailed_department")
+        department.set_value(rng.choice(department.options))
+    elif action == 'shifts':
+        at.multiselect(key="detailed_shifts").set_value(sorted(rng.sample(SHIFTS, rng.randint(1, len(SHIFTS)))))
+    elif action == 'hedge':
+        # Same key format as the grid's hedge edits: "<date>_<shift number>st"
+        date = rng.choice(at.multiselect(key="detailed_dates").value or DATES)
+        hedge_key = f"{date.strftime('%Y-%m-%d')}_{rng.randint(1, len(SHIFTS))}st"
+        at.session_state['hedge_rates'] = {**at.session_state['hedge_rates'], hedge_key: rng.choice(HEDGE_RATES)}
+    else:
+        raise ValueError(f"Unknown action: {action!r}")
+
+
+def timed_run(at, timings, action):
+    """Rerun the session, recording (action, seconds, error message or None)"""
+    start = time.perf_counter()
+    try:
+        at.run()
+        error = at.exception[0].message if at.exception else None
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    timings.append((action, time.perf_counter() - start, error))
+    return error is None
+
+
+def run_session(seed, steps, timeout, timings, barrier):
+    """One simulated planner: open the app, then `steps` seeded interactions"""
+    rng = random.Random(seed)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+    barrier.wait()
+    if not timed_run(at, timings, 'open'):
+        return at
+    view = "Rollup View"
+    for _ in range(steps):
+        weights = ROLLUP_ACTIONS if view == "Rollup View" else DETAILED_ACTIONS
+        action = rng.choices(list(weights), weights=list(weights.values()))[0]
+        try:
+            apply_action(at, action, rng)
+        except Exception as exc:
+            # The widget the script needs is missing: the rerun before it rendered the wrong page
+            timings.append((action, None, f"{type(exc).__name__}: {exc}"))
+            break
+        if action.endswith('view'):
+            view = at.sidebar.radio[0].value
+        if not timed_run(at, timings, action):
+            break
+    return at
+
+
+def percentiles(seconds):
+    values = np.asarray([value for value in seconds if value is not None]) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (np.nan,) * 3
+    return {'reruns': len(values), 'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1),
+            'p99_ms': round(float(p99), 1), 'max_ms': round(float(values.max()), 1) if len(values) else None}
+
+
+def session_state_bytes(sessions):
+    """Mean measured session-state size across sessions (see shift_optimizer.memory)"""
+    sizes = []
+    for at in sessions:
+        try:
+            sizes.append(at.session_state['memory_accountant'].total_bytes)
+        except (KeyError, AttributeError):
+            continue
+    return int(np.mean(sizes)) if sizes else None
+
+
+def run_level(n_sessions, steps, timeout, seed):
+    """Run n_sessions concurrent sessions; latency and memory figures for the level"""
+    timings = []
+    results = [None] * n_sessions
+    barrier = threading.Barrier(n_sessions)
+
+    def target(i):
+        results[i] = run_session(seed + i, steps, timeout, timings, barrier)
+
+    threads = [threading.Thread(target=target, args=(i,), name=f"session-{i}") for i in range(n_sessions)]
+    rss_before = current_rss()
+    start = time.perf_counter()
+    with RssSampler() as sampler:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    sessions = [at for at in results if at is not None]
+    level = {
+        'sessions': n_sessions,
+        **percentiles([seconds for _, seconds, _ in timings]),
+        'errors': [f"{action}: {error}" for action, _, error in timings if error is not None],
+        'reruns_per_s': round(len(timings) / elapsed, 2),
+        'rss_before_bytes': rss_before,
+        'rss_peak_bytes': sampler.peak,
+        'rss_after_bytes': current_rss(),
+        'session_state_bytes': session_state_bytes(sessions),
+        'actions': {},
+    }
+    for action in dict.fromkeys(action for action, *_ in timings):
+        level['actions'][action] = percentiles([seconds for name, seconds, _ in timings if name == action])
+    sessions.clear()
+    results.clear()
+    return level
+
+
+def print_report(levels):
+    print(f"{'sessions':>8}  {'reruns':>6}  {'errors':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'reruns/s':>8}  "
+          f"{'RSS peak':>9}  {'RSS growth':>10}  {'state/session':>13}")
+    for level in levels:
+        growth = level['rss_peak_bytes'] - level['rss_before_bytes']
+        state = level['session_state_bytes']
+        print(f"{level['sessions']:>8}  {level['reruns']:>6}  {len(level['errors']):>6}  {level['p50_ms']:>6.0f}ms  "
+              f"{level['p95_ms']:>6.0f}ms  {level['p99_ms']:>6.0f}ms  {level['reruns_per_s']:>8.2f}  "
+              f"{format_bytes(level['rss_peak_bytes']):>9}  {format_bytes(growth):>10}  "
+              f"{format_bytes(state) if state is not None else '-':>13}")
+
+    last = levels[-1]
+    print(f"\nPer interaction at {last['sessions']} sessions:")
+    width = max(len(action) for action in last['actions'])
+    for action, stats in last['actions'].items():
+        print(f"  {action:<{width}}  {stats['reruns']:>5} reruns  p50 {stats['p50_ms']:>7.0f}ms  "
+              f"p95 {stats['p95_ms']:>7.0f}ms  p99 {stats['p99_ms']:>7.0f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent simulated planner sessions")
+    parser.add_argument('--sessions', type=int, nargs='+', default=DEFAULT_SESSIONS,
+                        help='concurrent sessions per level, one level per value')
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS, help='interactions per session after opening')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the interaction scripts')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT_S, help='seconds allowed per rerun')
+    parser.add_argument('--max-p95-ms', type=float, help='exit 1 if any level has a slower p95 rerun')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    # Keep the report readable: per-rerun warnings from the app would repeat for every session.
+    # The config is parsed first, since parsing it later resets the log level.
+    config.get_config_options()
+    set_log_level("error")
+    warnings.simplefilter("ignore", DeprecationWarning)
+    emulate_server()
+
+    # One warm-up session loads the shared caches, so the first level isn't charged for them
+    print("  warming up", file=sys.stderr)
+    run_level(1, 0, args.timeout, args.seed)
+
+    levels = []
+    for n_sessions in args.sessions:
+        levels.append(run_level(n_sessions, args.steps, args.timeout, args.seed))
+        level = levels[-1]
+        print(f"  {n_sessions} sessions: p95 {level['p95_ms']:.0f}ms, {len(level['errors'])} errors", file=sys.stderr)
+
+    print_report(levels)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(levels, f, indent=2)
+
+    errors = [error for level in levels for error in level['errors']]
+    if errors:
+        print(f"\n{len(errors)} reruns failed:")
+        for error, count in Counter(errors).most_common():
+            print(f"  {count} x {error}")
+        return 1
+    if args.max_p95_ms is not None and any(level['p95_ms'] > args.max_p95_ms for level in levels):
+        print(f"\np95 rerun latency above {args.max_p95_ms:.0f}ms.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Cold-start benchmark: import time and first render of app.py in fresh interpreters
+
+Each run starts a new Python process that imports Streamlit, then the modules
+app.py imports at the top, then renders the app once through AppTest (Rollup
+View, the landing page) and switches to Detailed View. Run from the repository
+root:
+
+    python -m benchmarks.startup                  # compared with benchmarks/baseline.json
+    python -m benchmarks.startup --save-baseline  # record the current numbers as the baseline
+    python -m benchmarks.startup --quick          # landing page only
+
+Times are best/median over --repeat processes; memory is the growth of the peak
+RSS during each step. Also lists the step that first loads each heavy UI module,
+so an import that moves back to the top of app.py shows up.
+"""
+import ast
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .harness import benchmark_parser, format_seconds, report_results
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+# Modules app.py should only load in the views that need them
+LAZY_MODULES = ['plotly.express', 'st_aggrid']
+
+STEPS = ['import[streamlit]', 'import[app]', 'first_render[Rollup View]', 'first_render[Detailed View]']
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def app_imports():
+    """Code object of app.py's module-level import statements"""
+    tree = ast.parse(APP_PATH.read_text(encoding='utf-8'), str(APP_PATH))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return compile(ast.Module(body=imports, type_ignores=[]), str(APP_PATH), 'exec')
+
+
+def cold_start(quick=False):
+    """Time each startup step in this (fresh) process and print the results as JSON"""
+    steps = {}
+    first_loaded = {}
+
+    def step(name, func):
+        rss, start = peak_rss(), time.perf_counter()
+        func()
+        steps[name] = {'seconds': time.perf_counter() - start, 'rss_bytes': peak_rss() - rss}
+        for module in LAZY_MODULES:
+            if module in sys.modules:
+                first_loaded.setdefault(module, name)
+
+    step('import[streamlit]', lambda: __import__('streamlit'))
+    sys.path.insert(0, str(APP_PATH.parent))
+    step('import[app]', lambda: exec(app_imports(), {'__name__': 'app_imports'}))
+
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # Parsing the config later would reset the log level
+    config.get_config_options()
+    set_log_level("error")
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=300)
+
+    def render(view=None):
+        if view is not None:
+            at.sidebar.radio[0].set_value(view)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    step('first_render[Rollup View]', render)
+    if not quick:
+        step('first_render[Detailed View]', lambda: render("Detailed View"))
+
+    print(json.dumps({'steps': steps, 'first_loaded': first_loaded, 'peak_rss_bytes': peak_rss()}))
+
+
+def run_cold_start(quick):
+    """Results of cold_start() in a new interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-c", f"from benchmarks.startup import cold_start; cold_start(quick={quick})"],
+        cwd=APP_PATH.parent, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Cold start failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs):
+    """Harness results per step, plus the time to the first rendered page"""
+    results = {}
+    for name in STEPS:
+        samples = [run['steps'][name] for run in runs if name in run['steps']]
+        if samples:
+            times = [sample['seconds'] for sample in samples]
+            results[name] = {'best_s': min(times), 'median_s': statistics.median(times),
+                             'peak_bytes': max(sample['rss_bytes'] for sample in samples)}
+
+    first_page = STEPS[:3]
+    totals = [sum(run['steps'][name]['seconds'] for name in first_page) for run in runs]
+    results['time_to_first_render'] = {'best_s': min(totals), 'median_s': statistics.median(totals),
+                                       'peak_bytes': max(run['peak_rss_bytes'] for run in runs)}
+    return results
+
+
+def main(argv=None):
+    parser = benchmark_parser("Benchmark app.py import time and first render in fresh interpreters")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for i in range(args.repeat):
+        runs.append(run_cold_start(args.quick))
+        total = sum(step['seconds'] for step in runs[-1]['steps'].values())
+        print(f"  cold start {i + 1}/{args.repeat}: {format_seconds(total)}", file=sys.stderr)
+
+    first_loaded = runs[-1]['first_loaded']
+    for module in LAZY_MODULES:
+        print(f"  {module}: {'first loaded in ' + first_loaded[module] if module in first_loaded else 'not loaded'}",
+              file=sys.stderr)
+
+    results = {name: result for name, result in summarize(runs).items() if args.filter in name}
+    return report_results(results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
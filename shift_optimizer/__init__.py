@@ -0,0 +1,66 @@
+"""Headless planning core for the Labor Planning Shift Optimizer
+
+Metrics, table data, Expected HC, rollup and roster filtering with no Streamlit
+dependency, so batch jobs, worker processes and benchmarks can import them directly.
+app.py is the UI layer on top. Submodules load on first attribute access, which keeps
+``import shift_optimizer`` cheap.
+"""
+import importlib
+
+_EXPORTS = {
+    'EmployeeStore': 'store',
+    'SQLiteEmployeeStore': 'sqlite_store',
+    'SubstringIndex': 'search',
+    'ExpectedHCEngine': 'engine',
+    'RollupEngine': 'rollup',
+    'compute_rollup_values': 'rollup',
+    'generate_rollup_data': 'rollup',
+    'build_hc_grid_frame': 'planning',
+    'calculate_dynamic_metrics': 'planning',
+    'create_shift_breakdown_text': 'planning',
+    'filter_employee_data_by_selections': 'planning',
+    'generate_dynamic_table_data': 'planning',
+    'normalize_filter_selection': 'planning',
+    'page_employee_data_by_selections': 'planning',
+    'roster_filter_options': 'planning',
+    'validate_and_adjust_totals': 'planning',
+    'format_percentage': 'formatting',
+    'format_table_value': 'formatting',
+    'seeded_rng': 'seeding',
+    'stable_seed': 'seeding',
+    'DEFAULT_DEPARTMENTS': 'sample_data',
+    'build_sample_store': 'sample_data',
+    'load_roster': 'dataset',
+    'read_archive': 'archive',
+    'write_archive': 'archive',
+    'ShiftHistory': 'history',
+    'current_history': 'history',
+    'read_history_csv': 'history',
+    'roster_source': 'dataset',
+    'source_fingerprint': 'dataset',
+    'generate_roster': 'synthetic',
+    'generate_store': 'synthetic',
+    'simulate_punch_columns': 'synthetic',
+    'RerunProfile': 'profiling',
+    'profile_run': 'profiling',
+    'configure_tracing': 'tracing',
+    'span': 'tracing',
+    'traced': 'tracing',
+    'SessionMemoryAccountant': 'memory',
+    'deep_sizeof': 'memory',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
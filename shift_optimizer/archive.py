@@ -0,0 +1,98 @@
+"""Partitioned Parquet history archive, one directory per Location/Week
+
+Layout is Hive-style (``<root>/Location=AZ%20Goodyear/Week=2026-W08/*.parquet``), keyed
+like the rollup's Location and Week selectors. Reads pass the selection as partition
+filters, so only the matching directories are opened, and name the columns they need,
+so wide rows (employee names, free text) are never decoded for the rollup.
+
+Build an archive from a history CSV with:
+
+    python -m shift_optimizer.archive sample_data.csv history_archive/
+"""
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .rollup import ROLLUP_SHIFTS
+from .tracing import traced
+
+ARCHIVE_PATH_ENV = "SHIFT_OPTIMIZER_ARCHIVE"
+PARTITION_COLUMNS = ['Location', 'Week']
+
+# The only columns the rollup reads from a partition
+ROLLUP_COLUMNS = ['Department', 'Shift', 'Expected_HC', 'Scheduled_HC', 'Actual_HC', 'Attendance_Rate']
+
+
+def archive_root():
+    """Configured archive directory, or None when the rollup should use modeled numbers"""
+    path = os.environ.get(ARCHIVE_PATH_ENV)
+    return Path(path) if path else None
+
+
+def write_archive(frame, root):
+    """Write frame under root partitioned by Location and Week
+
+    Partitions present in frame replace the ones on disk; other partitions are kept,
+    so weeks can be appended as they close.
+    """
+    frame.to_parquet(root, partition_cols=PARTITION_COLUMNS, index=False, existing_data_behavior='delete_matching')
+
+
+@traced(rows=len)
+def read_archive(root, locations=None, weeks=None, columns=None):
+    """Rows of the selected Location/Week partitions, limited to columns
+
+    None selects every location, week or column. Partition filters prune whole
+    directories before any file is opened.
+    """
+    filters = []
+    if locations is not None:
+        filters.append(('Location', 'in', list(locations)))
+    if weeks is not None:
+        filters.append(('Week', 'in', list(weeks)))
+
+    return pd.read_parquet(root, columns=columns, filters=filters or None)
+
+
+@traced
+def rollup_observed(root, location, week, departments):
+    """Observed daily needed/expected/punches shaped (3, department, shift), NaN where missing
+
+    Reads one Location/Week partition with ROLLUP_COLUMNS only. Several dates in a week
+    are averaged into one daily figure, as in shift_optimizer.history.
+    """
+    frame = read_archive(root, locations=[location], weeks=[week], columns=ROLLUP_COLUMNS)
+    observed = np.full((3, len(departments), len(ROLLUP_SHIFTS)), np.nan)
+    if frame.empty:
+        return observed
+
+    frame = frame.assign(Expected=frame['Scheduled_HC'] * frame['Attendance_Rate'])
+    daily = frame.groupby(['Department', 'Shift'], observed=True)[['Expected_HC', 'Expected', 'Actual_HC']].mean()
+
+    department_idx = {department: i for i, department in enumerate(departments)}
+    shift_idx = {shift: j for j, shift in enumerate(ROLLUP_SHIFTS)}
+    for (department, shift), values in zip(daily.index, np.rint(daily.to_numpy())):
+        if department in department_idx and shift in shift_idx:
+            observed[:, department_idx[department], shift_idx[shift]] = values
+    return observed
+
+
+def main(argv=None):
+    from .history import read_history_csv
+
+    parser = argparse.ArgumentParser(description="Build a Location/Week partitioned history archive from a CSV")
+    parser.add_argument('source', help='history CSV (sample_data.csv schema)')
+    parser.add_argument('root', help='archive directory; partitions in the CSV replace existing ones')
+    args = parser.parse_args(argv)
+
+    frame = read_history_csv(args.source)
+    write_archive(frame, args.root)
+    partitions = frame[PARTITION_COLUMNS].drop_duplicates()
+    print(f"Wrote {len(frame)} rows in {len(partitions)} partitions to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
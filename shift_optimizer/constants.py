@@ -0,0 +1,30 @@
+"""Worker types, table keys and cache sizes shared across the planning modules"""
+
+# Worker types in table order, with the HC and attendance keys used by generate_dynamic_table_data
+HC_EMPLOYEE_TYPES = ['FTE', 'TEMP', 'NEW HIRES', 'Day Labor (Flex)', 'Day Labor (WW/GS)', 'Overtime (VEH/MEH)', 'Time Off (VER/MTO)']
+
+HC_DATA_KEY_MAPPING = {
+    'FTE': 'FTE',
+    'TEMP': 'TEMP',
+    'NEW HIRES': 'NEW HIRES',
+    'Day Labor (Flex)': 'FLEX',
+    'Day Labor (WW/GS)': 'WW/GS',
+    'Overtime (VEH/MEH)': 'VEH/MEH',
+    'Time Off (VER/MTO)': 'PTO'
+}
+
+ATTENDANCE_KEY_MAPPING = {
+    'FTE': 'FTE Attendance Assumption',
+    'TEMP': 'TEMP Attendance Assumption',
+    'NEW HIRES': 'NEW HIRES Show Up Rate',
+    'Day Labor (Flex)': 'FLEX Show Up Rate',
+    'Day Labor (WW/GS)': 'WW/GS Show Up Rate',
+    'Overtime (VEH/MEH)': 'VEH Show Up Rate',
+    'Time Off (VER/MTO)': 'PTO Rate'
+}
+
+# Table rows stored as 0-1 rates; formatted as percentages only when rendered
+RATE_ROWS = set(ATTENDANCE_KEY_MAPPING.values()) | {'Total Attendance Assumption'}
+
+# Filter combinations kept by the table-data and metrics caches (least recently used evicted first)
+FILTER_CACHE_SIZE = 128
@@ -0,0 +1,66 @@
+"""Roster dataset loading and versioning
+
+The roster comes from the file named by SHIFT_OPTIMIZER_ROSTER_PATH (CSV or Parquet
+with the EmployeeStore columns, or a SQLite roster database) or, when that is unset,
+from the built-in sample. source_fingerprint() changes whenever the source does, so a
+process-wide cache keyed on it reloads the roster exactly when needed.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .punches import simulate_punch_columns
+from .sample_data import build_sample_store
+from .sqlite_store import SQLiteEmployeeStore
+from .store import EmployeeStore
+from .tracing import traced
+
+ROSTER_PATH_ENV = "SHIFT_OPTIMIZER_ROSTER_PATH"
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+# Bump when the built-in sample roster or its punch simulation changes
+SAMPLE_VERSION = 2
+
+
+def roster_source():
+    """Configured roster file, or None for the built-in sample"""
+    path = os.environ.get(ROSTER_PATH_ENV)
+    return Path(path) if path else None
+
+
+def source_fingerprint(path):
+    """Hashable version of a roster source: path, size and modification time of the file"""
+    if path is None:
+        return ("sample", SAMPLE_VERSION)
+    stat = Path(path).stat()
+    return (str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+@traced(rows=len)
+def load_roster(path=None, seed=42):
+    """Roster store for a roster file, or the sample roster when path is None
+
+    SQLite files (see shift_optimizer.sqlite_store) are queried in place; CSV and
+    Parquet files are loaded into an EmployeeStore, with simulated punches if they
+    have no punch columns. Treat the result as read-only: it is meant to be shared,
+    and filter() returns new frames.
+    """
+    if path is None:
+        return build_sample_store(seed=seed)
+
+    path = Path(path)
+    if path.suffix in SQLITE_SUFFIXES:
+        return SQLiteEmployeeStore(path)
+    if path.suffix == '.parquet':
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path, dtype={column: 'category' for column in EmployeeStore.CATEGORICAL_COLUMNS})
+
+    if 'Punched_In' not in frame.columns:
+        punches = simulate_punch_columns(frame['Worker Type'], frame['Workday Schedule'], np.random.default_rng(seed))
+        for column, values in punches.items():
+            frame[column] = values
+
+    return EmployeeStore(frame)
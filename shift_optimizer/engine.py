@@ -0,0 +1,124 @@
+"""Expected HC math shared by the KPIs, shift breakdowns and the HC/attendance grid"""
+import numpy as np
+
+from .constants import ATTENDANCE_KEY_MAPPING, HC_DATA_KEY_MAPPING, HC_EMPLOYEE_TYPES
+from .tracing import traced
+
+
+class ExpectedHCEngine:
+    """Expected HC for every date × shift × worker type, computed in one broadcast
+    
+    Expected HC = Roster HC × Attendance Assumption, rounded per cell. FTE and TEMP
+    attendance gets the date/shift hedge added and clamped to [0, 1], and Time Off
+    (VER/MTO) is subtracted. Every view reads expected HC, punches and totals from here.
+    """
+    
+    HEDGED = np.array([emp_type in ('FTE', 'TEMP') for emp_type in HC_EMPLOYEE_TYPES])
+    SIGNS = np.array([-1 if emp_type == 'Time Off (VER/MTO)' else 1 for emp_type in HC_EMPLOYEE_TYPES])
+    
+    # Actual punches relative to expected HC (slight over/under attendance per worker type)
+    PUNCH_VARIANCE = np.array([1.01, 0.98, 0.96, 1.02, 0.99, 1.00, 1.00])
+    
+    def __init__(self, dates, shifts, headcount, attendance, hedge):
+        """
+        Args:
+            dates: List of (date_str, day_abbr) tuples, e.g. ("2026-02-12", "Thu")
+            shifts: List of shift numbers, e.g. ["1", "2", "3"]
+            headcount: Roster HC array shaped (date, shift, worker type)
+            attendance: Attendance assumption fractions shaped (date, shift, worker type)
+            hedge: Hedge rates in percentage points shaped (date, shift)
+        """
+        self.dates = dates
+        self.shifts = shifts
+        self.headcount = headcount
+        self.attendance = attendance
+        self.hedge = hedge
+        self.shift_keys = {
+            f"{date_str} {day_abbr} Shift {shift_num}": (i, j)
+            for i, (date_str, day_abbr) in enumerate(dates)
+            for j, shift_num in enumerate(shifts)
+        }
+        self._compute()
+    
+    def _evaluate(self, headcount, attendance, hedge):
+        """Hedged attendance, expected HC and punches for any slice of the cube"""
+        hedged = np.clip(attendance + np.asarray(hedge)[..., None] / 100.0, 0, 1)
+        hedged_attendance = np.where(self.HEDGED, hedged, attendance)
+        
+        signed_expected = headcount * hedged_attendance * self.SIGNS
+        expected = np.rint(signed_expected).astype(int)
+        punches = np.rint(signed_expected * self.PUNCH_VARIANCE).astype(int)
+        return hedged_attendance, expected, punches
+    
+    def _compute(self):
+        """Broadcast expected HC, punches and totals over the whole cube"""
+        self.hedged_attendance, self.expected, self.punches = self._evaluate(self.headcount, self.attendance, self.hedge)
+        
+        self.shift_expected = self.expected.sum(axis=2)
+        self.shift_punches = self.punches.sum(axis=2)
+        self.total = int(self.shift_expected.sum())
+    
+    def update_hedge(self, shift_key, hedge_rate):
+        """Set one date/shift hedge and recompute only that column
+        
+        Returns True if the hedge changed (and the column was recomputed).
+        """
+        i, j = self.position(shift_key)
+        if self.hedge[i, j] == hedge_rate:
+            return False
+        
+        self.hedge[i, j] = hedge_rate
+        hedged_attendance, expected, punches = self._evaluate(self.headcount[i, j], self.attendance[i, j], self.hedge[i, j])
+        self.hedged_attendance[i, j] = hedged_attendance
+        self.expected[i, j] = expected
+        self.punches[i, j] = punches
+        
+        previous_shift_expected = self.shift_expected[i, j]
+        self.shift_expected[i, j] = expected.sum()
+        self.shift_punches[i, j] = punches.sum()
+        self.total += int(self.shift_expected[i, j] - previous_shift_expected)
+        return True
+    
+    @classmethod
+    @traced
+    def from_table_data(cls, filtered_hc_data, filtered_attendance_data, hedge_rates):
+        """Build the cube from generate_dynamic_table_data output (numeric HC and attendance rates)"""
+        dates = []
+        shifts = []
+        for shift_key in filtered_hc_data:
+            parts = shift_key.split(' ')
+            if (parts[0], parts[1]) not in dates:
+                dates.append((parts[0], parts[1]))
+            if parts[-1] not in shifts:
+                shifts.append(parts[-1])
+        
+        shape = (len(dates), len(shifts), len(HC_EMPLOYEE_TYPES))
+        headcount = np.zeros(shape)
+        attendance = np.zeros(shape)
+        hedge = np.zeros(shape[:2])
+        
+        for i, (date_str, day_abbr) in enumerate(dates):
+            for j, shift_num in enumerate(shifts):
+                shift_key = f"{date_str} {day_abbr} Shift {shift_num}"
+                hc_data = filtered_hc_data.get(shift_key, {})
+                attendance_data = filtered_attendance_data.get(shift_key, {})
+                
+                for k, emp_type in enumerate(HC_EMPLOYEE_TYPES):
+                    headcount[i, j, k] = hc_data.get(HC_DATA_KEY_MAPPING[emp_type], 0)
+                    attendance[i, j, k] = attendance_data.get(ATTENDANCE_KEY_MAPPING[emp_type], 0.0)
+                
+                # Hedge key format: "2026-02-12_1st" (date_shift)
+                try:
+                    hedge[i, j] = float(hedge_rates.get(f"{date_str}_{shift_num}st", 0.0))
+                except (ValueError, TypeError):
+                    hedge[i, j] = 0.0
+        
+        return cls(dates, shifts, headcount, attendance, hedge)
+    
+    def position(self, shift_key):
+        """(date, shift) index for a key like '2026-02-12 Thu Shift 1'"""
+        return self.shift_keys[shift_key]
+    
+    def shift_total(self, shift_key):
+        """Total Expected HC for one date/shift column"""
+        return int(self.shift_expected[self.position(shift_key)])
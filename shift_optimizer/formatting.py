@@ -0,0 +1,14 @@
+"""Display formatting for stored table values"""
+from .constants import RATE_ROWS
+
+
+def format_percentage(rate, decimals=0):
+    """Render a 0-1 rate as a percentage string (e.g. 0.9 -> '90%')"""
+    return f"{rate * 100:.{decimals}f}%"
+
+
+def format_table_value(row_name, value):
+    """Render a stored table value for display - rate rows become percentage strings"""
+    if row_name in RATE_ROWS and isinstance(value, (int, float)):
+        return format_percentage(value)
+    return value
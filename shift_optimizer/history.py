@@ -0,0 +1,179 @@
+"""Site staffing history (sample_data.csv schema): chunked CSV ingestion with a Parquet cache
+
+Each row is one location × department × shift on one date with the planned (Expected_HC),
+scheduled (Scheduled_HC) and punched (Actual_HC) headcount. The CSV is read in chunks
+with explicit dtypes, validated, and cached as Parquet next to the source, so later loads
+skip parsing entirely. The planning functions look figures up per (location, week,
+department, shift) and fall back to the modeled numbers where the history has none.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .dataset import source_fingerprint
+from .tracing import traced
+
+HISTORY_PATH_ENV = "SHIFT_OPTIMIZER_HISTORY_PATH"
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent.parent / "sample_data.csv"
+
+KEY_COLUMNS = ['Location', 'Week', 'Department', 'Shift']
+HC_COLUMNS = ['Expected_HC', 'Scheduled_HC', 'Actual_HC']
+
+HISTORY_DTYPES = {
+    'Week': 'category',
+    'Location': 'category',
+    'Department': 'category',
+    'Shift': 'category',
+    'Expected_HC': 'int32',
+    'Scheduled_HC': 'int32',
+    'Actual_HC': 'int32',
+    'Attendance_Rate': 'float32',
+    'Gap': 'int32',
+}
+
+CHUNK_SIZE = 100_000
+
+
+def validate_history(frame):
+    """Raise ValueError describing every schema or consistency problem in a history chunk"""
+    missing = [column for column in ['Date', *HISTORY_DTYPES] if column not in frame.columns]
+    if missing:
+        raise ValueError(f"History is missing columns: {', '.join(missing)}")
+
+    problems = []
+    if frame[['Date', *KEY_COLUMNS]].isna().any().any():
+        problems.append("empty Date/Location/Week/Department/Shift values")
+    if (frame[HC_COLUMNS] < 0).any().any():
+        problems.append("negative headcounts")
+    if not frame['Attendance_Rate'].between(0, 1).all():
+        problems.append("Attendance_Rate outside 0-1")
+    if problems:
+        raise ValueError(f"Invalid history rows: {'; '.join(problems)}")
+
+
+def _concat_chunks(chunks):
+    """Concatenate chunks, unioning the categories so categorical columns stay categorical"""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals(parts)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+@traced(rows=len)
+def read_history_csv(path, chunksize=CHUNK_SIZE):
+    """Validated history frame from a CSV, parsed chunk by chunk with explicit dtypes"""
+    chunks = []
+    with pd.read_csv(path, dtype=HISTORY_DTYPES, parse_dates=['Date'], chunksize=chunksize) as reader:
+        for chunk in reader:
+            validate_history(chunk)
+            chunks.append(chunk.reset_index(drop=True))
+
+    if not chunks:
+        return pd.read_csv(path, dtype=HISTORY_DTYPES, parse_dates=['Date'])
+
+    frame = _concat_chunks(chunks)
+    if frame.duplicated(['Date', 'Location', 'Department', 'Shift']).any():
+        raise ValueError("Invalid history rows: duplicate Date/Location/Department/Shift rows")
+    return frame
+
+
+@traced(rows=len)
+def load_history_frame(path):
+    """History frame for a CSV, from the Parquet cache beside it when that is current
+
+    The cache is rewritten whenever the CSV is newer. A cache that can't be written
+    (read-only checkout, no Parquet engine) only costs the parse on the next load.
+    """
+    path = Path(path)
+    cache_path = path.with_suffix('.parquet')
+    if cache_path.exists() and cache_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        try:
+            return pd.read_parquet(cache_path)
+        except (ImportError, OSError, ValueError):
+            pass
+
+    frame = read_history_csv(path)
+    try:
+        frame.to_parquet(cache_path, index=False)
+    except (ImportError, OSError):
+        pass
+    return frame
+
+
+class ShiftHistory:
+    """Daily staffing figures per (location, week, department, shift)
+
+    Weeks with several dates are averaged into one daily figure. Instances compare and
+    hash by version (the source fingerprint), so they can be part of lru_cache keys and
+    a changed source never serves stale cached tables.
+    """
+
+    def __init__(self, frame, version):
+        self.version = version
+        self.figures = {}
+        if frame.empty:
+            return
+
+        daily = frame.groupby(KEY_COLUMNS, observed=True).agg(
+            needed=('Expected_HC', 'mean'),
+            scheduled=('Scheduled_HC', 'mean'),
+            punches=('Actual_HC', 'mean'),
+            attendance=('Attendance_Rate', 'mean'),
+        )
+        # Attendance is stored as float32; rounding it as float32 would leave 0.8 as 0.800000011920929
+        for key, needed, scheduled, punches, attendance in zip(
+            daily.index, np.rint(daily['needed']).astype(int), np.rint(daily['scheduled']).astype(int),
+            np.rint(daily['punches']).astype(int), daily['attendance'].astype('float64').round(4),
+        ):
+            self.figures[key] = {
+                'needed': int(needed),
+                'scheduled': int(scheduled),
+                'punches': int(punches),
+                'attendance': float(attendance),
+            }
+
+    def __len__(self):
+        return len(self.figures)
+
+    def __eq__(self, other):
+        return isinstance(other, ShiftHistory) and self.version == other.version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def lookup(self, location, week, department, shift):
+        """Figures for one shift, or None if the history doesn't cover it"""
+        return self.figures.get((location, week, department, shift))
+
+
+EMPTY_HISTORY = ShiftHistory(pd.DataFrame(), ("empty",))
+
+_loaded = {}
+
+
+def history_source():
+    """Configured history CSV, or the sample_data.csv shipped with the repo"""
+    return Path(os.environ.get(HISTORY_PATH_ENV) or DEFAULT_HISTORY_PATH)
+
+
+def current_history():
+    """ShiftHistory for the configured source, reloaded only when the file changes"""
+    path = history_source()
+    if not path.exists():
+        return EMPTY_HISTORY
+
+    version = source_fingerprint(path)
+    history = _loaded.get(path)
+    if history is None or history.version != version:
+        history = ShiftHistory(load_history_frame(path), version)
+        _loaded[path] = history
+    return history
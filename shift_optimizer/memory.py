@@ -0,0 +1,124 @@
+"""Per-session memory accounting with an LRU-evicted budget for derived entries
+
+A SessionMemoryAccountant measures the deep size of every entry in a session's state
+(any mapping, st.session_state included) and, when the session is over its budget,
+removes entries registered as evictable - caches and other derived values the app
+rebuilds on demand - least recently used first. Inputs such as hedge rates, department
+settings and widget values are never evicted. The budget comes from
+SHIFT_OPTIMIZER_SESSION_BUDGET_MB (default 64).
+"""
+import itertools
+import os
+import sys
+import types
+import weakref
+
+import numpy as np
+import pandas as pd
+
+SESSION_BUDGET_ENV = "SHIFT_OPTIMIZER_SESSION_BUDGET_MB"
+DEFAULT_SESSION_BUDGET_MB = 64
+
+# Not followed when sizing: shared by every session, not owned by one
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+_accountants = weakref.WeakSet()
+
+
+def session_budget_bytes():
+    """Per-session budget from SHIFT_OPTIMIZER_SESSION_BUDGET_MB"""
+    return int(float(os.environ.get(SESSION_BUDGET_ENV) or DEFAULT_SESSION_BUDGET_MB) * 2**20)
+
+
+def deep_sizeof(obj, seen=None):
+    """Bytes reachable from obj, each object counted once
+
+    pandas objects report their deep memory usage and NumPy arrays their buffers;
+    containers, instance dicts and slots are followed. Classes, modules and
+    functions are shared and not counted.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    pending = [obj]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, _SHARED_TYPES):
+            continue
+        seen.add(id(item))
+
+        if isinstance(item, pd.DataFrame):
+            total += int(item.memory_usage(deep=True).sum())
+            continue
+        if isinstance(item, (pd.Series, pd.Index)):
+            total += int(item.memory_usage(deep=True))
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, np.ndarray):
+            if item.base is not None:
+                pending.append(item.base)
+            continue
+
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        if hasattr(item, '__dict__'):
+            pending.append(vars(item))
+        for slot in getattr(type(item), '__slots__', ()):
+            if hasattr(item, slot):
+                pending.append(getattr(item, slot))
+    return total
+
+
+class SessionMemoryAccountant:
+    """Deep size of one session's state, kept under budget_bytes by LRU eviction
+
+    touch() marks an evictable entry as used; enforce() measures every entry and
+    evicts evictable ones, least recently used (or never touched) first, until the
+    session fits. The accountant skips itself when stored in the state it measures.
+    """
+
+    def __init__(self, evictable, budget_bytes=None):
+        self.evictable = frozenset(evictable)
+        self.budget_bytes = session_budget_bytes() if budget_bytes is None else budget_bytes
+        self.sizes = {}
+        self.evicted = []
+        self._last_used = {}
+        self._clock = itertools.count()
+        _accountants.add(self)
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes.values())
+
+    def touch(self, key):
+        self._last_used[key] = next(self._clock)
+
+    def measure(self, state):
+        """Deep size per entry of state, shared objects counted once for the whole session"""
+        seen = {id(self)}
+        self.sizes = {key: deep_sizeof(state[key], seen) for key in list(state.keys()) if state[key] is not self}
+        return self.sizes
+
+    def enforce(self, state):
+        """Measure state and evict evictable entries LRU-first until it fits; returns the evicted keys"""
+        self.measure(state)
+        total = self.total_bytes
+        self.evicted = []
+        candidates = sorted((key for key in self.sizes if key in self.evictable),
+                            key=lambda key: self._last_used.get(key, -1))
+        for key in candidates:
+            if total <= self.budget_bytes:
+                break
+            total -= self.sizes.pop(key)
+            del state[key]
+            self._last_used.pop(key, None)
+            self.evicted.append(key)
+        return self.evicted
+
+
+def process_session_bytes():
+    """(live sessions, their total measured bytes) across every accountant in this process"""
+    accountants = list(_accountants)
+    return len(accountants), sum(accountant.total_bytes for accountant in accountants)
@@ -0,0 +1,699 @@
+"""Filter-driven planning data: metrics, table data, shift breakdowns and the grid frame"""
+import functools
+import json
+import re
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .constants import FILTER_CACHE_SIZE, HC_DATA_KEY_MAPPING, HC_EMPLOYEE_TYPES
+from .formatting import format_percentage
+from .history import current_history
+from .seeding import seeded_rng
+from .tracing import traced
+
+# Rows of the combined HC/attendance grid: worker types, then the hedge and total rows
+HC_GRID_ROWS = HC_EMPLOYEE_TYPES + ['Hedge Attendance Rate (+/-) ✏️', 'Total Expected HC']
+
+# Page sizes offered for the roster details table
+ROSTER_PAGE_SIZES = [25, 50, 100]
+
+
+def normalize_filter_selection(location, department, week, selected_dates, shifts):
+    """Hashable filter tuple used as the cache key - dates become 'YYYY-MM-DD' strings"""
+    date_strs = tuple(pd.Timestamp(date).strftime("%Y-%m-%d") for date in selected_dates) if selected_dates else ()
+    return location, department, week, date_strs, tuple(shifts) if shifts else ()
+
+def previous_week(week):
+    """ISO week label before week, e.g. '2026-W08' -> '2026-W07'"""
+    year, number = week.split('-W')
+    year, number, _ = (datetime.fromisocalendar(int(year), int(number), 1) - timedelta(weeks=1)).isocalendar()
+    return f"{year}-W{number:02d}"
+
+def _percent_change(current, previous):
+    return int(round((current / previous - 1) * 100)) if previous else 0
+
+@traced
+def calculate_dynamic_metrics(location, department, week, selected_date, shifts, history=None):
+    """Calculate dynamic metrics based on filter selections
+    
+    Uses the site history (see shift_optimizer.history) when it covers every selected
+    shift, and the modeled multipliers otherwise; history-backed metrics carry
+    'from_history': True. Memoized per (location, department, week, shifts, history
+    version); selected_date doesn't affect the result. Returns a fresh dict so callers
+    can override values.
+    """
+    history = current_history() if history is None else history
+    return dict(_calculate_dynamic_metrics(location, department, week, tuple(shifts) if shifts else (), history))
+
+def _history_totals(history, location, department, week, shifts):
+    """Summed daily needed/expected/punches for the shifts, or None if any shift is missing"""
+    figures = [history.lookup(location, week, department, shift) for shift in shifts]
+    if not figures or None in figures:
+        return None
+    return {
+        'needed': sum(f['needed'] for f in figures),
+        'expected': sum(round(f['scheduled'] * f['attendance']) for f in figures),
+        'punches': sum(f['punches'] for f in figures),
+    }
+
+@functools.lru_cache(maxsize=FILTER_CACHE_SIZE)
+@traced
+def _calculate_dynamic_metrics(location, department, week, shifts, history):
+    """Uncached metrics calculation behind calculate_dynamic_metrics"""
+    
+    totals = _history_totals(history, location, department, week, shifts)
+    if totals is not None:
+        previous = _history_totals(history, location, department, previous_week(week), shifts) or {}
+        needed, expected, punches = totals['needed'], totals['expected'], totals['punches']
+        gap = needed - expected
+        return {
+            "needed": needed,
+            "expected": expected,
+            "gap": gap,
+            "needed_change": _percent_change(needed, previous.get('needed')),
+            "expected_change": _percent_change(expected, previous.get('expected')),
+            "gap_change": _percent_change(gap, previous.get('needed', 0) - previous.get('expected', 0)),
+            "punches": punches,
+            "punches_change": _percent_change(punches, previous.get('punches')),
+            "gap_percentage": int((gap / needed * 100)) if needed > 0 else 0,
+            "from_history": True,
+        }
+    
+    # Base metrics that vary by location
+    base_metrics = {
+        "AZ Goodyear": {"needed": 100, "expected": 80, "gap": 20},
+        "IL Aurora": {"needed": 85, "expected": 75, "gap": 10}, 
+        "AZ Phoenix": {"needed": 120, "expected": 95, "gap": 25},
+        "IL Lake Zurich": {"needed": 90, "expected": 85, "gap": 5},
+        "IL Burr Ridge": {"needed": 75, "expected": 70, "gap": 5}
+    }
+    
+    # Department multipliers
+    dept_multipliers = {
+        "Kitchen": 1.0,
+        "Production": 0.8,
+        "Sanitation": 0.6,
+        "Quality": 0.4,
+        "Warehouse": 0.9,
+        "Fulfillment": 0.7,
+        "Shipping": 0.5
+    }
+    
+    # Week variations (recent weeks have different patterns)
+    week_variations = {
+        "2026-W08": 1.0,
+        "2026-W07": 0.95,
+        "2026-W09": 1.05,
+        "2026-W06": 0.9,
+        "2026-W10": 1.1
+    }
+    
+    # Shift adjustments (fewer shifts selected = lower numbers)
+    shift_multiplier = len(shifts) / 3.0 if shifts else 1.0
+    
+    # Get base metrics for location
+    base = base_metrics.get(location, base_metrics["AZ Goodyear"])
+    
+    # Apply all multipliers
+    dept_mult = dept_multipliers.get(department, 1.0)
+    week_mult = week_variations.get(week, 1.0)
+    
+    # Calculate final metrics
+    needed = int(base["needed"] * dept_mult * week_mult * shift_multiplier)
+    expected = int(base["expected"] * dept_mult * week_mult * shift_multiplier)
+    gap = needed - expected
+    
+    # Calculate percentage changes vs "last week"
+    needed_change = int((week_mult - 0.95) * 100)  # Simulate vs previous week
+    expected_change = int((week_mult - 0.9) * 100 + 10)  # Different baseline
+    
+    gap_change = 3  # Default gap change vs previous week
+    
+    # Calculate punches (approximately 90-95% of expected)
+    punches = int(expected * 0.92)
+    punches_change = 4  # Default punches change vs previous week
+    
+    return {
+        "needed": needed,
+        "expected": expected, 
+        "gap": gap,
+        "needed_change": needed_change,
+        "expected_change": expected_change,
+        "gap_change": gap_change,
+        "punches": punches,
+        "punches_change": punches_change,
+        "gap_percentage": int((gap / needed * 100)) if needed > 0 else 0
+    }
+
+def get_gap_status_info(gap, gap_percentage):
+    """Get gap status with appropriate styling and messaging"""
+    if gap == 0:
+        return "✅ Fully Staffed", "gap-neutral", "#28a745"
+    elif gap > 0:
+        return f"↘️ Understaffed by {abs(gap_percentage)}%", "gap-negative", "#dc3545"
+    else:
+        return f"📊 Overstaffed by {abs(gap_percentage)}%", "gap-positive", "#28a745"
+
+def should_show_alert(gap, gap_percentage):
+    """Determine if critical staffing alert should be shown"""
+    return gap > 0 and abs(gap_percentage) >= 15  # Show alert if understaffed by 15% or more
+
+@traced(rows=lambda tables: len(tables[0]))
+def generate_dynamic_table_data(location, department, week, selected_dates, shifts, history=None):
+    """Generate dynamic table data based on all filter selections
+    
+    Shifts covered by the site history get its needed, scheduled, punched and attendance
+    figures; the rest use the modeled multipliers. Memoized per normalized filter tuple
+    and history version, so reruns from unrelated widgets (roster filters, hedge edits)
+    reuse the same dicts. Callers must treat the returned data as read-only.
+    """
+    history = current_history() if history is None else history
+    return _generate_dynamic_table_data(*normalize_filter_selection(location, department, week, selected_dates, shifts), history)
+
+def _apply_history(shift_data, hc_data, attendance_data, figures):
+    """Overwrite one shift's modeled table data with its history figures in place
+    
+    The scheduled HC and the expected HC (rounded once, as a total) are split between FTE
+    and TEMP in the template's proportions, or all FTE if the template has neither. Each
+    type's attendance is its expected over its scheduled HC, so the Expected HC engine's
+    per-cell rounding adds up to the history's expected HC.
+    """
+    scheduled, attendance = figures['scheduled'], figures['attendance']
+    expected = round(scheduled * attendance)
+    shift_data['Total Needed'] = figures['needed']
+    shift_data['Total Expected'] = expected
+    shift_data['Total Gap'] = expected - figures['needed']
+    shift_data['Total Attendance Assumption'] = attendance
+    shift_data['Total Punches'] = figures['punches']
+    
+    template_hc = hc_data['FTE'] + hc_data['TEMP']
+    fte = round(scheduled * hc_data['FTE'] / template_hc) if template_hc else scheduled
+    temp = scheduled - fte
+    expected_fte = round(expected * fte / scheduled) if scheduled else 0
+    hc_data.update({data_key: 0 for data_key in HC_DATA_KEY_MAPPING.values()})
+    hc_data['FTE'] = fte
+    hc_data['TEMP'] = temp
+    
+    attendance_data['FTE Attendance Assumption'] = expected_fte / fte if fte else attendance
+    attendance_data['TEMP Attendance Assumption'] = (expected - expected_fte) / temp if temp else attendance
+
+@functools.lru_cache(maxsize=FILTER_CACHE_SIZE)
+@traced(rows=lambda tables: len(tables[0]))
+def _generate_dynamic_table_data(location, department, week, date_strs, shifts, history):
+    """Uncached table data generation behind generate_dynamic_table_data"""
+    
+    # Base multipliers by location (similar to Overview section)
+    location_multipliers = {
+        "AZ Goodyear": 1.0,
+        "IL Aurora": 0.85, 
+        "AZ Phoenix": 1.2,
+        "IL Lake Zurich": 0.9,
+        "IL Burr Ridge": 0.75
+    }
+    
+    # Department multipliers
+    dept_multipliers = {
+        "Kitchen": 1.0,
+        "Production": 0.8,
+        "Sanitation": 0.6,
+        "Quality": 0.4,
+        "Warehouse": 0.9,
+        "Fulfillment": 0.7,
+        "Shipping": 0.5
+    }
+    
+    # Week variations
+    week_variations = {
+        "2026-W08": 1.0,
+        "2026-W07": 0.95,
+        "2026-W09": 1.05,
+        "2026-W06": 0.9,
+        "2026-W10": 1.1
+    }
+    
+    # Get multipliers
+    loc_mult = location_multipliers.get(location, 1.0)
+    dept_mult = dept_multipliers.get(department, 1.0)
+    week_mult = week_variations.get(week, 1.0)
+    
+    # Shift multipliers - different staffing levels per shift
+    shift_multipliers = {
+        "1st": 1.2,   # Morning shift - typically needs more staff
+        "2nd": 1.0,   # Afternoon shift - standard staffing
+        "3rd": 0.7    # Night shift - typically needs less staff
+    }
+    
+    # Base template data - will be modified by multipliers
+    base_shift_template = {
+        'Total Needed': 91,
+        'Total Expected': 79,
+        'Total Gap': -12,
+        'Total Attendance Assumption': 0.89,
+        'Total Punches': 106,
+        'tooltip_needed': 'â€¢ FTE: 35\nâ€¢ TEMP: 35\nâ€¢ WW: 20\nâ€¢ FLEX: 0',
+        'tooltip_expected': '+3% vs prev week',
+        'tooltip_gap': '+3% vs prev week',
+        'tooltip_attendance': '+3% vs prev week',
+        'tooltip_punches': '+3% vs prev week'
+    }
+    
+    base_hc_template = {
+        'FTE': 48,
+        'TEMP': 30,
+        'NEW HIRES': 0,
+        'FLEX': 1,
+        'WW/GS': 0,
+        'VEH/MEH': 2,
+        'PTO': 1,
+        'tooltip_fte': '+15 vs prev week',
+        'tooltip_temp': '+3% vs prev week'
+    }
+    
+    # Attendance and show-up rates are stored as 0-1 floats and formatted at render time
+    base_attendance_template = {
+        'FTE Attendance Assumption': 0.90,
+        'TEMP Attendance Assumption': 0.84,
+        'NEW HIRES Show Up Rate': 0.50,
+        'FLEX Show Up Rate': 0.50,
+        'WW/GS Show Up Rate': 1.00,
+        'VEH Show Up Rate': 0.80,
+        'PTO Rate': 0.50,
+        'tooltip_fte': '+15% vs prev week',
+        'tooltip_temp': '+3% vs prev week'
+    }
+    
+    # Generate dynamic data for each selected date and shift
+    dynamic_shift_data = {}
+    dynamic_hc_data = {}
+    dynamic_attendance_data = {}
+    
+    for date_str in date_strs:
+        day_str = datetime.strptime(date_str, "%Y-%m-%d").strftime("%a")
+        
+        for shift in shifts:
+            shift_num = shift[0]  # Convert "1st" to "1"
+            key = f"{date_str} {day_str} Shift {shift_num}"
+            
+            # Get shift multiplier
+            shift_mult = shift_multipliers.get(shift, 1.0)
+            
+            # Apply multipliers to shift data
+            shift_data = base_shift_template.copy()
+            shift_data['Total Needed'] = int(shift_data['Total Needed'] * loc_mult * dept_mult * week_mult * shift_mult)
+            shift_data['Total Expected'] = int(shift_data['Total Expected'] * loc_mult * dept_mult * week_mult * shift_mult)
+            shift_data['Total Gap'] = shift_data['Total Expected'] - shift_data['Total Needed']
+            shift_data['Total Punches'] = int(shift_data['Total Punches'] * loc_mult * dept_mult * week_mult * shift_mult)
+            
+            # Add shift data to dictionary
+            dynamic_shift_data[key] = shift_data
+            
+            # Apply multipliers to HC data
+            hc_data = base_hc_template.copy()
+            hc_data['FTE'] = int(hc_data['FTE'] * loc_mult * dept_mult * week_mult * shift_mult)
+            hc_data['TEMP'] = int(hc_data['TEMP'] * loc_mult * dept_mult * week_mult * shift_mult)
+            hc_data['FLEX'] = int(hc_data['FLEX'] * loc_mult * dept_mult * week_mult * shift_mult)
+            
+            dynamic_hc_data[key] = hc_data
+            
+            # Attendance data (percentages don't change much, but can vary slightly)
+            attendance_data = base_attendance_template.copy()
+            dynamic_attendance_data[key] = attendance_data
+            
+            figures = history.lookup(location, week, department, shift)
+            if figures is not None:
+                _apply_history(shift_data, hc_data, attendance_data, figures)
+    
+    return dynamic_shift_data, dynamic_hc_data, dynamic_attendance_data
+
+@traced(rows=len)
+def build_hc_grid_frame(filtered_hc_data, filtered_attendance_data, hc_engine):
+    """DataFrame behind the combined HC and Attendance Assumption grid
+    
+    One row per HC_GRID_ROWS entry and a block of columns per date/shift (S1_Roster,
+    S1_Attendance, S1_Expected, ...) in sorted shift-key order. Roster, attendance,
+    expected HC and punches all come from the ExpectedHCEngine.
+    """
+    # Employee types in order, followed by the hedge and total rows
+    employee_types = HC_GRID_ROWS
+    
+    columns_list = sorted(list(filtered_hc_data.keys()))
+    
+    # Build dataframe
+    table_data = {'Employee Type': []}
+    
+    # Initialize columns for each shift - now with 5 columns: Roster, Attendance, Expected, Punches, Variance
+    for idx in range(len(columns_list)):
+        col_prefix = f'S{idx+1}'
+        table_data[f'{col_prefix}_Roster'] = []  # Renamed from Scheduled
+        table_data[f'{col_prefix}_Attendance'] = []
+        table_data[f'{col_prefix}_Expected'] = []
+        table_data[f'{col_prefix}_Punches'] = []  # NEW: Actual punches
+        table_data[f'{col_prefix}_Punch_Variance'] = []  # NEW: Variance from expected
+        table_data[f'{col_prefix}_Variance'] = []  # WoW variance for tooltip coloring
+        table_data[f'{col_prefix}_Tooltip'] = []
+        table_data[f'{col_prefix}_Attendance_Tooltip'] = []
+        # Enhanced tooltip data columns
+        table_data[f'{col_prefix}_Current_HC'] = []
+        table_data[f'{col_prefix}_Previous_HC'] = []
+        table_data[f'{col_prefix}_Absolute_Change'] = []
+        table_data[f'{col_prefix}_Cohort_Breakdown'] = []
+    
+    # Populate data rows
+    for emp_type in employee_types:
+        if emp_type == 'Hedge Attendance Rate (+/-) ✏️':
+            # Hedge row
+            table_data['Employee Type'].append(emp_type)
+            for idx, shift_key in enumerate(columns_list):
+                hedge_rate = float(hc_engine.hedge[hc_engine.position(shift_key)])
+                
+                col_prefix = f'S{idx+1}'
+                table_data[f'{col_prefix}_Roster'].append(hedge_rate)
+                table_data[f'{col_prefix}_Attendance'].append('')
+                table_data[f'{col_prefix}_Expected'].append('')  # Empty for hedge row
+                table_data[f'{col_prefix}_Punches'].append('')  # Empty for hedge row
+                table_data[f'{col_prefix}_Punch_Variance'].append('')  # Empty for hedge row
+                table_data[f'{col_prefix}_Variance'].append(None)
+                table_data[f'{col_prefix}_Tooltip'].append('')
+                table_data[f'{col_prefix}_Attendance_Tooltip'].append('')
+                # Enhanced tooltip data (empty for hedge row)
+                table_data[f'{col_prefix}_Current_HC'].append(0)
+                table_data[f'{col_prefix}_Previous_HC'].append(0)
+                table_data[f'{col_prefix}_Absolute_Change'].append(0)
+                table_data[f'{col_prefix}_Cohort_Breakdown'].append('{}')
+                
+        elif emp_type == 'Total Expected HC':
+            # Total row - per-shift sums from the engine
+            table_data['Employee Type'].append(emp_type)
+            for idx, shift_key in enumerate(columns_list):
+                col_prefix = f'S{idx+1}'
+                position = hc_engine.position(shift_key)
+                total_expected = int(hc_engine.shift_expected[position])
+                total_punches = int(hc_engine.shift_punches[position])
+                table_data[f'{col_prefix}_Roster'].append('')  # Empty for total row
+                table_data[f'{col_prefix}_Attendance'].append('')  # Empty for total row
+                table_data[f'{col_prefix}_Expected'].append(total_expected)
+                table_data[f'{col_prefix}_Punches'].append(total_punches)
+                table_data[f'{col_prefix}_Punch_Variance'].append(total_punches - total_expected)
+                table_data[f'{col_prefix}_Variance'].append(None)
+                table_data[f'{col_prefix}_Tooltip'].append('')
+                table_data[f'{col_prefix}_Attendance_Tooltip'].append('')
+                # Enhanced tooltip data (empty for total row)
+                table_data[f'{col_prefix}_Current_HC'].append(0)
+                table_data[f'{col_prefix}_Previous_HC'].append(0)
+                table_data[f'{col_prefix}_Absolute_Change'].append(0)
+                table_data[f'{col_prefix}_Cohort_Breakdown'].append('{}')
+        else:
+            # Regular employee type row
+            table_data['Employee Type'].append(emp_type)
+            type_idx = HC_EMPLOYEE_TYPES.index(emp_type)
+            data_key = HC_DATA_KEY_MAPPING[emp_type]
+            
+            for idx, shift_key in enumerate(columns_list):
+                hc_data = filtered_hc_data.get(shift_key, {})
+                attendance_data = filtered_attendance_data.get(shift_key, {})
+                cell = hc_engine.position(shift_key) + (type_idx,)
+                
+                hc_value = int(hc_engine.headcount[cell])
+                tooltip_hc = hc_data.get(f'tooltip_{data_key.lower()}', '+3% vs prev week')
+                tooltip_att = attendance_data.get(f'tooltip_{data_key.lower()}', '+3% vs prev week')
+                
+                # Extract variance percentage
+                variance = None
+                match = re.search(r'([+-]?\d+)%?\s*vs\s*prev\s*week', tooltip_hc)
+                if match:
+                    variance = float(match.group(1))
+                
+                # Calculate previous week HC and cohort breakdown for enhanced tooltips
+                current_hc = hc_value
+                if variance is not None:
+                    # Calculate previous HC from variance percentage
+                    previous_hc = round(current_hc / (1 + variance/100))
+                    absolute_change = current_hc - previous_hc
+                    
+                    # Generate realistic demographic cohort breakdown
+                    # Distribute the change across demographic cohorts realistically
+                    cohort_breakdown = {}
+                    if absolute_change != 0:
+                        rng = seeded_rng("cohort", emp_type, shift_key)  # Same split in every process
+                        
+                        # Internal cohort codes
+                        cohorts = ['Cohort A', 'Cohort B', 'Cohort C', 'Cohort D']
+                        
+                        # Generate proportions that sum to absolute_change
+                        remaining = absolute_change
+                        for i, cohort in enumerate(cohorts[:-1]):
+                            # Allocate 20-40% of remaining to this cohort
+                            proportion = rng.uniform(0.2, 0.4)
+                            cohort_value = round(remaining * proportion)
+                            cohort_breakdown[cohort] = cohort_value
+                            remaining -= cohort_value
+                        
+                        # Last cohort gets remainder
+                        cohort_breakdown[cohorts[-1]] = remaining
+                        
+                        # Remove cohorts with 0 change
+                        cohort_breakdown = {k: v for k, v in cohort_breakdown.items() if v != 0}
+                else:
+                    previous_hc = current_hc
+                    absolute_change = 0
+                    cohort_breakdown = {}
+                
+                # Display the attendance assumption (hedged for FTE and TEMP)
+                modified_attendance_value = format_percentage(hc_engine.hedged_attendance[cell])
+                
+                col_prefix = f'S{idx+1}'
+                table_data[f'{col_prefix}_Roster'].append(hc_value)  # Renamed from Scheduled
+                table_data[f'{col_prefix}_Attendance'].append(modified_attendance_value)  # Show modified attendance
+                table_data[f'{col_prefix}_Variance'].append(variance)
+                table_data[f'{col_prefix}_Tooltip'].append(tooltip_hc)
+                table_data[f'{col_prefix}_Attendance_Tooltip'].append(tooltip_att)
+                
+                # Add enhanced tooltip data
+                table_data[f'{col_prefix}_Current_HC'].append(current_hc)
+                table_data[f'{col_prefix}_Previous_HC'].append(previous_hc)
+                table_data[f'{col_prefix}_Absolute_Change'].append(absolute_change)
+                
+                # Store cohort breakdown as JSON string
+                table_data[f'{col_prefix}_Cohort_Breakdown'].append(json.dumps(cohort_breakdown))
+                
+                # Expected HC = Roster × Modified Attendance (negative for Time Off)
+                expected_hc = int(hc_engine.expected[cell])
+                table_data[f'{col_prefix}_Expected'].append(expected_hc)
+                
+                # Add actual punch data
+                punch_count = int(hc_engine.punches[cell])
+                table_data[f'{col_prefix}_Punches'].append(punch_count)
+                
+                # Calculate punch variance (Actual - Expected)
+                punch_variance = punch_count - expected_hc
+                table_data[f'{col_prefix}_Punch_Variance'].append(punch_variance)
+    
+    return pd.DataFrame(table_data)
+
+
+def patch_hc_grid_column(df, hc_engine, shift_key, col_prefix):
+    """Rewrite one shift's hedge-dependent cells in a create_combined_hc_attendance_aggrid_table frame
+    
+    Rows follow HC_EMPLOYEE_TYPES, then the hedge row, then the total row.
+    """
+    position = hc_engine.position(shift_key)
+    n_types = len(HC_EMPLOYEE_TYPES)
+    hedge_row, total_row = n_types, n_types + 1
+    
+    expected = hc_engine.expected[position]
+    punches = hc_engine.punches[position]
+    df.loc[:n_types - 1, f'{col_prefix}_Attendance'] = [format_percentage(rate) for rate in hc_engine.hedged_attendance[position]]
+    df.loc[:n_types - 1, f'{col_prefix}_Expected'] = expected.tolist()
+    df.loc[:n_types - 1, f'{col_prefix}_Punches'] = punches.tolist()
+    df.loc[:n_types - 1, f'{col_prefix}_Punch_Variance'] = (punches - expected).tolist()
+    
+    df.at[hedge_row, f'{col_prefix}_Roster'] = float(hc_engine.hedge[position])
+    
+    total_expected = int(hc_engine.shift_expected[position])
+    total_punches = int(hc_engine.shift_punches[position])
+    df.at[total_row, f'{col_prefix}_Expected'] = total_expected
+    df.at[total_row, f'{col_prefix}_Punches'] = total_punches
+    df.at[total_row, f'{col_prefix}_Punch_Variance'] = total_punches - total_expected
+
+@traced(rows=len)
+def validate_and_adjust_totals(filtered_shift_data, overview_metrics, shifts):
+    """Ensure table totals match overview metrics"""
+    if not filtered_shift_data or not shifts:
+        return filtered_shift_data
+    
+    # Calculate current table totals
+    table_needed_total = sum(data['Total Needed'] for data in filtered_shift_data.values())
+    table_expected_total = sum(data['Total Expected'] for data in filtered_shift_data.values())
+    
+    # Get target totals from overview
+    target_needed = overview_metrics['needed']
+    target_expected = overview_metrics['expected']
+    
+    # Calculate adjustment ratios
+    needed_ratio = target_needed / table_needed_total if table_needed_total > 0 else 1
+    expected_ratio = target_expected / table_expected_total if table_expected_total > 0 else 1
+    
+    # Adjust each shift's values proportionally
+    adjusted_data = {}
+    for key, data in filtered_shift_data.items():
+        adjusted_data[key] = data.copy()
+        adjusted_data[key]['Total Needed'] = int(data['Total Needed'] * needed_ratio)
+        adjusted_data[key]['Total Expected'] = int(data['Total Expected'] * expected_ratio)
+        adjusted_data[key]['Total Gap'] = adjusted_data[key]['Total Expected'] - adjusted_data[key]['Total Needed']
+    
+    return adjusted_data
+
+@traced
+def create_shift_breakdown_text(filtered_shift_data, selected_dates, shifts, metric_key, hc_engine=None, overview_total=None):
+    """
+    Create shift breakdown text for each date and shift combination.
+    For 'Total Expected', reads the per-shift totals from the ExpectedHCEngine (matching the table).
+    For other metrics, distributes the overview_total proportionally across shifts.
+    
+    Args:
+        filtered_shift_data: Dict with keys like "2026-02-12 Thu Shift 1" containing metric values
+        selected_dates: List of selected date objects
+        shifts: List of selected shift strings (e.g., ["1st", "2nd"])
+        metric_key: The metric to display (e.g., 'Total Needed', 'Total Expected')
+        hc_engine: ExpectedHCEngine holding the Expected HC per date and shift
+        overview_total: The total from overview KPIs to distribute proportionally
+    
+    Returns:
+        HTML string with breakdown by date and shift
+    """
+    if not filtered_shift_data or not selected_dates or not shifts:
+        return ""
+    
+    # If overview_total is provided, calculate proportional distribution
+    if overview_total is not None:
+        # First, calculate the sum from filtered_shift_data to get proportions
+        shift_totals = {}
+        sum_from_data = 0
+        
+        for date in selected_dates:
+            date_str = date.strftime("%Y-%m-%d")
+            day_abbr = date.strftime("%a")
+            
+            for shift in shifts:
+                shift_num = shift[0]
+                key = f"{date_str} {day_abbr} Shift {shift_num}"
+                
+                if key in filtered_shift_data:
+                    value = filtered_shift_data[key].get(metric_key, 0)
+                    shift_totals[key] = value
+                    sum_from_data += value
+        
+        # Calculate proportional values that sum to overview_total
+        # Use absolute values for proportion calculation to handle negative gaps
+        shift_abs_totals = {k: abs(v) for k, v in shift_totals.items()}
+        sum_abs = sum(shift_abs_totals.values())
+        
+        breakdown_lines = []
+        for date in selected_dates:
+            date_str = date.strftime("%Y-%m-%d")
+            day_abbr = date.strftime("%a")
+            
+            shift_values = []
+            for shift in shifts:
+                shift_num = shift[0]
+                key = f"{date_str} {day_abbr} Shift {shift_num}"
+                
+                if key in shift_totals:
+                    # Proportionally distribute using absolute values
+                    if sum_abs > 0:
+                        proportion = shift_abs_totals[key] / sum_abs
+                        adjusted_value = round(overview_total * proportion)
+                    else:
+                        adjusted_value = 0
+                    shift_values.append(f"Shift {shift_num}: {adjusted_value}")
+            
+            if shift_values:
+                breakdown_lines.append(f"{day_abbr} {' | '.join(shift_values)}")
+        
+        return "<br>".join(breakdown_lines) if breakdown_lines else ""
+    
+    # Original logic for Expected HC
+    breakdown_lines = []
+    
+    for date in selected_dates:
+        date_str = date.strftime("%Y-%m-%d")
+        day_abbr = date.strftime("%a")  # e.g., "Thu", "Fri"
+        
+        shift_values = []
+        for shift in shifts:
+            # Extract shift number (e.g., "1st" -> "1")
+            shift_num = shift[0]
+            # Build the key to match the data structure
+            key = f"{date_str} {day_abbr} Shift {shift_num}"
+            
+            if key in filtered_shift_data:
+                # For Total Expected, read the engine's per-shift total (matching table logic)
+                if metric_key == 'Total Expected' and hc_engine is not None:
+                    value = hc_engine.shift_total(key)
+                else:
+                    # For other metrics, read from filtered_shift_data
+                    value = filtered_shift_data[key].get(metric_key, 0)
+                
+                shift_values.append(f"Shift {shift_num}: {value}")
+        
+        if shift_values:
+            breakdown_lines.append(f"{day_abbr} {' | '.join(shift_values)}")
+    
+    return "<br>".join(breakdown_lines) if breakdown_lines else ""
+
+@traced(rows=len)
+def filter_employee_data_by_selections(employee_data, selected_department, selected_dates, shifts, worker_type_filter=None, employee_id_filter=None, schedule_filter=None, roster_bucket_filter=None):
+    """Filter employee data based on department, dates, shifts, and additional filters
+    
+    Returns a DataFrame built from the store's (Department, Date, Shift) index instead of
+    scanning every row; works with EmployeeStore and SQLiteEmployeeStore.
+    """
+    # Convert selected dates to string format for the (Department, Date, Shift) index
+    date_filters = [date.strftime("%Y-%m-%d") for date in selected_dates] if selected_dates else []
+    
+    return employee_data.filter(
+        selected_department,
+        dates=date_filters,
+        shifts=shifts,
+        worker_types=worker_type_filter,
+        employee_id=employee_id_filter,
+        schedules=schedule_filter,
+        roster_buckets=roster_bucket_filter
+    )
+
+@traced(rows=lambda page: page[3])
+def page_employee_data_by_selections(employee_data, selected_department, selected_dates, shifts, page, page_size,
+                                     sort_by=None, ascending=True, worker_type_filter=None, employee_id_filter=None,
+                                     schedule_filter=None, roster_bucket_filter=None):
+    """One page of the filtered roster, sorted and sliced by the store
+    
+    Only the rows of the requested page are built into a DataFrame. page is 1-based
+    and clamped to the available pages.
+    
+    Returns:
+        (page DataFrame, page number actually shown, page count, total matching rows)
+    """
+    date_filters = [date.strftime("%Y-%m-%d") for date in selected_dates] if selected_dates else []
+    filters = dict(dates=date_filters, shifts=shifts, worker_types=worker_type_filter, employee_id=employee_id_filter,
+                   schedules=schedule_filter, roster_buckets=roster_bucket_filter)
+    
+    # The row count is only known after the first query; a page past the end is re-read
+    frame, total = employee_data.page(selected_department, sort_by=sort_by, ascending=ascending,
+                                      offset=(max(page, 1) - 1) * page_size, limit=page_size, **filters)
+    page_count = max(-(-total // page_size), 1)
+    if page > page_count or page < 1:
+        page = min(max(page, 1), page_count)
+        frame, total = employee_data.page(selected_department, sort_by=sort_by, ascending=ascending,
+                                          offset=(page - 1) * page_size, limit=page_size, **filters)
+    return frame, page, page_count, total
+
+@traced
+def roster_filter_options(employee_data, selected_department, selected_dates, shifts):
+    """Worker Type / Workday Schedule / Roster Bucket options for the roster-detail filters
+    
+    Distinct values within the department, dates and shifts, computed by the store
+    (index lookups in memory, SELECT DISTINCT in SQLite) without materializing rows.
+    """
+    date_filters = [date.strftime("%Y-%m-%d") for date in selected_dates] if selected_dates else []
+    return employee_data.filter_options(selected_department, dates=date_filters, shifts=shifts)
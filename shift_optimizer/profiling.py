@@ -0,0 +1,206 @@
+"""Opt-in rerun profiling: phase timings and browser payload sizes, logged as JSONL
+
+Set SHIFT_OPTIMIZER_PROFILE=1 to enable. Each rerun (a full script run or a fragment
+rerun) gets a RerunProfile; the UI wraps its phases in phase() and reports the size
+of every message it sends with RerunProfile.payload(). Finished profiles are appended
+to a rotating JSONL log (SHIFT_OPTIMIZER_PROFILE_LOG, default rerun_profile.jsonl), one
+record per rerun with the location and week, so runs from different sites can be
+compared:
+
+    python -m shift_optimizer.profiling rerun_profile.jsonl
+
+Runs and phases are also trace spans (shift_optimizer.tracing), and annotate() fields
+become trace context, so SHIFT_OPTIMIZER_TRACE alone records them in the trace file.
+With both off, phase() and annotate() return after a context-variable lookup.
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from .tracing import add_trace_context, span, trace_context
+
+PROFILE_ENV = "SHIFT_OPTIMIZER_PROFILE"
+PROFILE_LOG_ENV = "SHIFT_OPTIMIZER_PROFILE_LOG"
+DEFAULT_PROFILE_LOG = "rerun_profile.jsonl"
+
+# Rotate the log at 5 MiB, keeping three old files
+LOG_MAX_BYTES = 5 * 2**20
+LOG_BACKUP_COUNT = 3
+
+_active = contextvars.ContextVar("rerun_profile", default=None)
+_logger_lock = threading.Lock()
+
+
+def profiling_enabled():
+    """True when SHIFT_OPTIMIZER_PROFILE is set to 1/true/yes/on"""
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def profile_log_path():
+    return Path(os.environ.get(PROFILE_LOG_ENV) or DEFAULT_PROFILE_LOG)
+
+
+class RerunProfile:
+    """Timings and payload sizes of one rerun
+
+    Phases nest: a phase opened inside another is recorded as "outer / inner", and a
+    phase entered several times accumulates its time and call count. Payloads are
+    grouped by the phase that was open when they were sent and by element type.
+    """
+
+    def __init__(self, run, **context):
+        self.run = run
+        self.context = context
+        self.started_at = time.time()
+        self.seconds = None
+        self.phases = {}
+        self.payloads = {}
+        self._stack = []
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        self._stack.append(name)
+        path = " / ".join(self._stack)
+        start = time.perf_counter()
+        try:
+            with span(name, "phase"):
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            entry = self.phases.setdefault(path, [0.0, 0])
+            entry[0] += elapsed
+            entry[1] += 1
+
+    def payload(self, element, nbytes):
+        """Record one message of nbytes sent to the browser for an element type"""
+        key = (" / ".join(self._stack) or "(outside phases)", element)
+        entry = self.payloads.setdefault(key, [0, 0])
+        entry[0] += nbytes
+        entry[1] += 1
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._start
+
+    @property
+    def payload_bytes(self):
+        return sum(nbytes for nbytes, _ in self.payloads.values())
+
+    def record(self):
+        """JSON-serializable summary, one line of the profile log"""
+        return {
+            'started_at': round(self.started_at, 3),
+            'run': self.run,
+            **self.context,
+            'ms': round((self.seconds or 0) * 1000, 2),
+            'payload_bytes': self.payload_bytes,
+            'phases': [{'phase': path, 'ms': round(seconds * 1000, 2), 'calls': calls}
+                       for path, (seconds, calls) in self.phases.items()],
+            'payloads': [{'phase': path, 'element': element, 'bytes': nbytes, 'messages': count}
+                         for (path, element), (nbytes, count) in self.payloads.items()],
+        }
+
+
+def active_profile():
+    """Profile of the rerun running in this thread, or None"""
+    return _active.get()
+
+
+@contextlib.contextmanager
+def profile_run(run, **context):
+    """Profile the enclosed rerun, or time it as a phase of the rerun already being profiled
+
+    Yields the new RerunProfile, or None when profiling is off or the run is nested.
+    A new profile is written to the profile log when the block exits.
+    """
+    outer = _active.get()
+    if outer is not None:
+        with outer.phase(run):
+            yield None
+        return
+
+    with trace_context(run=run, **context), span(run, "rerun"):
+        if not profiling_enabled():
+            yield None
+            return
+
+        profile = RerunProfile(run, **context)
+        token = _active.set(profile)
+        try:
+            yield profile
+        finally:
+            profile.finish()
+            _active.reset(token)
+            write_profile(profile)
+
+
+def phase(name):
+    """Time the enclosed block as a phase of the active profile and trace it as a span"""
+    profile = _active.get()
+    return profile.phase(name) if profile is not None else span(name, "phase")
+
+
+def annotate(**fields):
+    """Add fields (location, week, ...) to the active profile's log record and the trace context"""
+    profile = _active.get()
+    if profile is not None:
+        profile.context.update(fields)
+    add_trace_context(**fields)
+
+
+def profile_logger():
+    """Logger appending one JSON line per profile to the rotating profile log"""
+    path = str(profile_log_path().resolve())
+    logger = logging.getLogger(__name__)
+    with _logger_lock:
+        if not any(getattr(handler, 'baseFilename', None) == path for handler in logger.handlers):
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                          encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+def write_profile(profile):
+    profile_logger().info(json.dumps(profile.record(), default=str))
+
+
+def summarize_log(path, by=('location', 'run')):
+    """Median and p95 milliseconds per phase, grouped by the given record fields"""
+    import pandas as pd
+
+    records = pd.read_json(path, lines=True)
+    by = [column for column in by if column in records.columns]
+    phases = records[[*by, 'phases']].explode('phases').dropna(subset=['phases'])
+    phases = phases.assign(phase=phases['phases'].str['phase'], ms=phases['phases'].str['ms'])
+    totals = records.assign(phase='(rerun)')[[*by, 'phase', 'ms']]
+    frame = pd.concat([totals, phases[[*by, 'phase', 'ms']]], ignore_index=True)
+    grouped = frame.groupby([*by, 'phase'], sort=True)['ms']
+    return pd.DataFrame({'reruns': grouped.size(), 'median_ms': grouped.median().round(2),
+                         'p95_ms': grouped.quantile(0.95).round(2)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a rerun profile log per site and phase")
+    parser.add_argument('path', nargs='?', default=str(profile_log_path()), help='profile JSONL log')
+    parser.add_argument('--by', nargs='+', default=['location', 'run'], help='record fields to group by')
+    args = parser.parse_args(argv)
+
+    print(summarize_log(args.path, by=args.by).to_string())
+
+
+if __name__ == "__main__":
+    main()
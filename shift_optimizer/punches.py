@@ -0,0 +1,72 @@
+"""Punch-in model shared by the sample roster and the synthetic generator
+
+Punches are simulated on whole columns: minutes since midnight as integer arrays,
+one random draw per column, formatted to 'HH:MM' only at the end.
+"""
+import numpy as np
+import pandas as pd
+
+# Punch rates should be very close to attendance assumptions (±1-3% variance)
+# This ensures Actual Punches ≈ Expected HC
+PUNCH_RATES = {
+    'FTE': 0.91,          # Attendance assumption ~90%, so 91% is 1% over
+    'TEMP': 0.86,         # Attendance assumption ~84%, so 86% is 2% over
+    'NEW HIRES': 0.48,    # Show up rate ~50%, so 48% is 2% under
+    'FLEX': 0.51,         # Show up rate ~50%, so 51% is 1% over
+    'WW/GS': 0.99         # Show up rate ~100%, so 99% is 1% under
+}
+
+MINUTES_PER_DAY = 24 * 60
+
+# 'HH:MM' label for every minute of the day; punch times are codes into this table
+MINUTE_LABELS = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(MINUTES_PER_DAY)]
+
+
+def parse_schedule(schedule):
+    """('HH:MM-HH:MM') -> (start minute, end minute) of the day"""
+    start, end = schedule.split('-')
+    start_hour, start_min = map(int, start.split(':'))
+    end_hour, end_min = map(int, end.split(':'))
+    return start_hour * 60 + start_min, end_hour * 60 + end_min
+
+
+def simulate_punch_columns(worker_types, schedules, rng):
+    """Punch columns for roster rows, using the sample punch-rate model
+
+    Each row punches in with its worker type's PUNCH_RATES probability (0.90 for other
+    types). Punch in/out land within ±5 minutes of the scheduled start/end and hours
+    worked within ±15 minutes of the scheduled length. Times wrap at midnight, so
+    overnight schedules like 22:00-06:00 work out to 8 hours.
+
+    Args:
+        worker_types: Worker type per row (array-like of str or Categorical)
+        schedules: Workday schedule per row, e.g. '06:00-14:00'
+        rng: NumPy Generator
+
+    Returns:
+        Dict of Punched_In, Punch_Time, Punch_Out_Time (Categoricals of 'HH:MM', NaN when
+        not punched in) and Hours_Worked (0 when not punched in)
+    """
+    worker_types = pd.Categorical(worker_types)
+    schedules = pd.Categorical(schedules)
+    n_rows = len(worker_types)
+
+    type_rates = np.array([PUNCH_RATES.get(worker_type, 0.90) for worker_type in worker_types.categories])
+    rates = type_rates[worker_types.codes]
+
+    bounds = np.array([parse_schedule(schedule) for schedule in schedules.categories]).reshape(-1, 2)
+    start_minutes = bounds[schedules.codes, 0]
+    end_minutes = bounds[schedules.codes, 1]
+
+    punched_in = rng.random(n_rows) < rates
+    punch_in = (start_minutes + rng.integers(-5, 6, n_rows)) % MINUTES_PER_DAY
+    punch_out = (end_minutes + rng.integers(-5, 6, n_rows)) % MINUTES_PER_DAY
+    scheduled_hours = ((end_minutes - start_minutes) % MINUTES_PER_DAY) / 60
+    hours_worked = np.round(scheduled_hours + rng.uniform(-0.25, 0.25, n_rows), 2)
+
+    return {
+        'Punched_In': punched_in,
+        'Punch_Time': pd.Categorical.from_codes(np.where(punched_in, punch_in, -1), categories=MINUTE_LABELS),
+        'Punch_Out_Time': pd.Categorical.from_codes(np.where(punched_in, punch_out, -1), categories=MINUTE_LABELS),
+        'Hours_Worked': np.where(punched_in, hours_worked, 0.0),
+    }
@@ -0,0 +1,121 @@
+"""Department × shift × date rollup, computed as arrays and cached per date"""
+import numpy as np
+import pandas as pd
+
+from .seeding import stable_seed_grid, stable_uniform
+from .tracing import traced
+
+
+# Rollup shifts and their staffing multipliers
+ROLLUP_SHIFTS = ['1st', '2nd', '3rd']
+ROLLUP_SHIFT_MULTIPLIERS = np.array([1.2, 1.0, 0.8])
+
+# Per-date rollup columns, in display order
+ROLLUP_METRICS = ['Needed', 'Expected', 'Expected_Gap', 'Punches', 'Actual_Gap']
+
+
+def generate_rollup_draws(departments, date_strs):
+    """Random draws for the given departments and dates, each shaped (department, shift, date)
+    
+    Seeded per department and date, so a department's numbers don't depend on which
+    other departments or dates are shown, or in what order.
+    """
+    n_shifts = len(ROLLUP_SHIFTS)
+    uniforms = stable_uniform(stable_seed_grid(departments, date_strs, "rollup"), 3 * n_shifts)
+    uniforms = uniforms.reshape(len(departments), len(date_strs), 3, n_shifts).transpose(2, 0, 3, 1)
+    # Integer offsets in -5..5 and factors in the same ranges as before
+    expected_offsets = np.floor(uniforms[0] * 11) - 5
+    needed_factors = 1.20 + 0.05 * uniforms[1]
+    punch_factors = 0.98 + 0.04 * uniforms[2]
+    return expected_offsets, needed_factors, punch_factors
+
+
+@traced
+def compute_rollup_values(departments, date_strs, observed=None):
+    """Rollup values shaped (department/shift row, date, metric) for the given dates
+    
+    departments maps each department to its multiplier. Computes needed/expected/
+    punches as (department, shift, date) arrays in one pass and adds department
+    totals by reducing over the shift axis. Rows are each department's shifts
+    followed by its total row; metrics follow ROLLUP_METRICS. observed, shaped
+    (3, department, shift), replaces the modeled needed/expected/punches wherever it
+    isn't NaN (see shift_optimizer.archive.rollup_observed).
+    """
+    n_departments = len(departments)
+    dept_multipliers = np.array(list(departments.values()), dtype=float)
+    
+    expected_offsets, needed_factors, punch_factors = generate_rollup_draws(list(departments), date_strs)
+    
+    base_expected = np.trunc(100 * dept_multipliers[:, None, None] * ROLLUP_SHIFT_MULTIPLIERS[None, :, None])
+    expected = base_expected + expected_offsets
+    needed = np.trunc(expected * needed_factors)
+    punches = np.trunc(expected * punch_factors)
+    
+    if observed is not None:
+        observed = observed[..., None]
+        needed, expected, punches = np.where(np.isnan(observed), np.stack([needed, expected, punches]), observed)
+    
+    # Department totals as an extra row after the shift rows -> (metric, department, shift + total, date)
+    cube = np.stack([needed, expected, punches])
+    cube = np.concatenate([cube, cube.sum(axis=2, keepdims=True)], axis=2)
+    needed, expected, punches = cube
+    
+    wide = np.stack([needed, expected, expected - needed, punches, punches - expected], axis=-1)
+    return wide.reshape(n_departments * (len(ROLLUP_SHIFTS) + 1), len(date_strs), len(ROLLUP_METRICS)).astype(int)
+
+
+class RollupEngine:
+    """Rollup values cached as one column block per date
+    
+    Changing the date selection only computes the newly added dates and drops the
+    removed ones; dates that stay selected reuse their cached block. observed figures
+    (from the history archive) override the modeled ones; source names where they came
+    from, so callers can tell when the engine needs rebuilding.
+    """
+    
+    def __init__(self, departments, observed=None, source=None):
+        self.departments = dict(departments)
+        self.observed = observed
+        self.source = source
+        self.blocks = {}
+        
+        names = list(self.departments)
+        self.department_labels = [label for dept in names for label in [dept] * len(ROLLUP_SHIFTS) + [f'{dept} - Total']]
+        self.shift_labels = (ROLLUP_SHIFTS + ['']) * len(names)
+    
+    def matches(self, departments, source=None):
+        return self.departments == dict(departments) and self.source == source
+    
+    @traced
+    def update(self, date_strs):
+        """Compute blocks for newly selected dates and drop deselected ones"""
+        missing = [date_str for date_str in dict.fromkeys(date_strs) if date_str not in self.blocks]
+        if missing:
+            values = compute_rollup_values(self.departments, missing, self.observed)
+            for i, date_str in enumerate(missing):
+                self.blocks[date_str] = values[:, i, :]
+        
+        selected = set(date_strs)
+        for date_str in [d for d in self.blocks if d not in selected]:
+            del self.blocks[date_str]
+    
+    @traced(rows=len)
+    def frame(self, selected_dates):
+        """Wide rollup DataFrame with one row per department/shift and one column per date/metric"""
+        date_strs = [date.strftime("%Y-%m-%d") for date in selected_dates]
+        date_keys = [date.strftime("%Y-%m-%d %a") for date in selected_dates]
+        self.update(date_strs)
+        
+        values = np.concatenate([self.blocks[date_str] for date_str in date_strs], axis=1)
+        columns = [f'{date_key}_{metric}' for date_key in date_keys for metric in ROLLUP_METRICS]
+        
+        rollup_df = pd.DataFrame(values, columns=columns)
+        rollup_df.insert(0, 'Department', self.department_labels)
+        rollup_df.insert(1, 'Shift', self.shift_labels)
+        return rollup_df
+
+
+@traced(rows=len)
+def generate_rollup_data(selected_dates, departments):
+    """Wide rollup DataFrame for the given dates and {department: multiplier} settings"""
+    return RollupEngine(departments).frame(selected_dates)
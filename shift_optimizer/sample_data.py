@@ -0,0 +1,78 @@
+"""Sample roster and department settings used when no real data is configured"""
+import numpy as np
+import pandas as pd
+
+from .punches import simulate_punch_columns
+from .store import EmployeeStore
+
+# Department gap settings shown in the department selectors and used by the rollup
+DEFAULT_DEPARTMENTS = {
+    'Kitchen': -7,
+    'Production': 7,
+    'Sanitation': 10,
+    'Quality': 0,
+    'Warehouse': -2,
+    'Fulfillment': 0,
+    'Shipping': 5
+}
+
+# Sample data based on the mockup - exact values from PDF
+SAMPLE_EMPLOYEE_RECORDS = [
+    # Kitchen Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'EMP001', 'Employee Name': 'John Smith', 'Hire Date': '2023-01-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'EMP002', 'Employee Name': 'Mary Davis', 'Hire Date': '2022-08-20', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP101', 'Employee Name': 'Mike Wilson', 'Hire Date': '2026-02-01', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'EMP005', 'Employee Name': 'Carlos Rodriguez', 'Hire Date': '2023-11-08', 'Workday Schedule': '06:00-14:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'EMP003', 'Employee Name': 'Lisa Brown', 'Hire Date': '2021-12-10', 'Workday Schedule': '14:00-22:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'NEW HIRES', 'Employee ID': 'NEW001', 'Employee Name': 'David Garcia', 'Hire Date': '2026-02-10', 'Workday Schedule': '14:00-22:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Training'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'TEMP', 'Employee ID': 'TMP102', 'Employee Name': 'Amanda Taylor', 'Hire Date': '2026-01-28', 'Workday Schedule': '14:00-22:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'EMP004', 'Employee Name': 'Jennifer Lee', 'Hire Date': '2023-06-05', 'Workday Schedule': '22:00-06:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FLEX', 'Employee ID': 'FLX201', 'Employee Name': 'Robert Martinez', 'Hire Date': '2024-03-12', 'Workday Schedule': '22:00-06:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Flexible'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'EMP006', 'Employee Name': 'Patricia White', 'Hire Date': '2022-05-18', 'Workday Schedule': '22:00-06:00', 'Department': 'Kitchen', 'Manager': 'Sarah Johnson', 'Roster Bucket': 'Active'},
+    
+    # Production Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'PRD001', 'Employee Name': 'James Wilson', 'Hire Date': '2023-03-22', 'Workday Schedule': '06:00-14:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'PRD002', 'Employee Name': 'Emma Johnson', 'Hire Date': '2022-11-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP201', 'Employee Name': 'Kevin Chen', 'Hire Date': '2026-01-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'PRD003', 'Employee Name': 'Rachel Adams', 'Hire Date': '2023-07-10', 'Workday Schedule': '14:00-22:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FLEX', 'Employee ID': 'FLX301', 'Employee Name': 'Anthony Davis', 'Hire Date': '2024-01-08', 'Workday Schedule': '14:00-22:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Flexible'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'PRD004', 'Employee Name': 'Stephanie Lee', 'Hire Date': '2022-09-05', 'Workday Schedule': '22:00-06:00', 'Department': 'Production', 'Manager': 'Michael Thompson', 'Roster Bucket': 'Active'},
+    
+    # Sanitation Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'SAN001', 'Employee Name': 'Daniel Brown', 'Hire Date': '2023-02-14', 'Workday Schedule': '06:00-14:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP301', 'Employee Name': 'Maria Gonzalez', 'Hire Date': '2026-01-20', 'Workday Schedule': '06:00-14:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'SAN002', 'Employee Name': 'Christopher Moore', 'Hire Date': '2023-05-30', 'Workday Schedule': '14:00-22:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FTE', 'Employee ID': 'SAN003', 'Employee Name': 'Jessica Taylor', 'Hire Date': '2022-12-12', 'Workday Schedule': '22:00-06:00', 'Department': 'Sanitation', 'Manager': 'Linda Rodriguez', 'Roster Bucket': 'Active'},
+    
+    # Quality Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'QUA001', 'Employee Name': 'Thomas Anderson', 'Hire Date': '2023-04-18', 'Workday Schedule': '06:00-14:00', 'Department': 'Quality', 'Manager': 'Janet Wilson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'QUA002', 'Employee Name': 'Nicole Martinez', 'Hire Date': '2022-10-25', 'Workday Schedule': '06:00-14:00', 'Department': 'Quality', 'Manager': 'Janet Wilson', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'NEW HIRES', 'Employee ID': 'NEW002', 'Employee Name': 'Brian Clark', 'Hire Date': '2026-02-05', 'Workday Schedule': '14:00-22:00', 'Department': 'Quality', 'Manager': 'Janet Wilson', 'Roster Bucket': 'Training'},
+    
+    # Warehouse Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'WHR001', 'Employee Name': 'Matthew Garcia', 'Hire Date': '2023-01-30', 'Workday Schedule': '06:00-14:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'WHR002', 'Employee Name': 'Ashley Thompson', 'Hire Date': '2022-08-15', 'Workday Schedule': '06:00-14:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP401', 'Employee Name': 'Ryan Miller', 'Hire Date': '2026-01-25', 'Workday Schedule': '06:00-14:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'WHR003', 'Employee Name': 'Michelle White', 'Hire Date': '2023-06-20', 'Workday Schedule': '14:00-22:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '3rd', 'Worker Type': 'FLEX', 'Employee ID': 'FLX401', 'Employee Name': 'Steven Lopez', 'Hire Date': '2024-02-14', 'Workday Schedule': '22:00-06:00', 'Department': 'Warehouse', 'Manager': 'Robert Kim', 'Roster Bucket': 'Flexible'},
+    
+    # Fulfillment Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'FUL001', 'Employee Name': 'Amanda Rodriguez', 'Hire Date': '2023-03-08', 'Workday Schedule': '06:00-14:00', 'Department': 'Fulfillment', 'Manager': 'David Chang', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'TEMP', 'Employee ID': 'TMP501', 'Employee Name': 'Jonathan Smith', 'Hire Date': '2026-02-08', 'Workday Schedule': '06:00-14:00', 'Department': 'Fulfillment', 'Manager': 'David Chang', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'FTE', 'Employee ID': 'FUL002', 'Employee Name': 'Samantha Davis', 'Hire Date': '2022-11-30', 'Workday Schedule': '14:00-22:00', 'Department': 'Fulfillment', 'Manager': 'David Chang', 'Roster Bucket': 'Active'},
+    
+    # Shipping Department
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'SHP001', 'Employee Name': 'Gregory Wilson', 'Hire Date': '2023-05-12', 'Workday Schedule': '06:00-14:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '1st', 'Worker Type': 'FTE', 'Employee ID': 'SHP002', 'Employee Name': 'Kimberly Johnson', 'Hire Date': '2022-07-22', 'Workday Schedule': '06:00-14:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'TEMP', 'Employee ID': 'TMP601', 'Employee Name': 'Eric Brown', 'Hire Date': '2026-01-18', 'Workday Schedule': '14:00-22:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Active'},
+    {'Date': '2026-02-12', 'Day of Week': 'Monday', 'Shift': '2nd', 'Worker Type': 'NEW HIRES', 'Employee ID': 'NEW003', 'Employee Name': 'Catherine Martinez', 'Hire Date': '2026-02-12', 'Workday Schedule': '14:00-22:00', 'Department': 'Shipping', 'Manager': 'Patricia Lee', 'Roster Bucket': 'Training'},
+]
+
+
+def build_sample_store(seed=42):
+    """EmployeeStore over the sample roster with simulated punches"""
+    frame = pd.DataFrame.from_records(SAMPLE_EMPLOYEE_RECORDS)
+    punches = simulate_punch_columns(frame['Worker Type'], frame['Workday Schedule'], np.random.default_rng(seed))
+    for column, values in punches.items():
+        frame[column] = values
+    return EmployeeStore(frame)
@@ -0,0 +1,80 @@
+"""N-gram substring index for type-ahead search over short keys (Employee IDs)
+
+Every 1-, 2- and 3-character substring of every key maps to the sorted positions of
+the keys containing it, stored as slices of one flat int32 array. A query of up to
+three characters is a single slice; a longer one takes the shortest posting of its
+3-grams and checks only those keys for the whole query. Built once per roster, so a
+keystroke costs a dictionary lookup instead of a scan of every key.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_GRAM = 3
+
+# Bits per code point when a gram is packed into one integer (MAX_GRAM * 21 bits fit in int64)
+CODE_POINT_BITS = 21
+
+
+def _gram_key(gram):
+    """Integer key of a gram of up to MAX_GRAM characters"""
+    key = 0
+    for char in gram:
+        key = key << CODE_POINT_BITS | ord(char)
+    return key
+
+
+class SubstringIndex:
+    """Case-insensitive "contains" lookups over a fixed list of keys"""
+
+    def __init__(self, keys):
+        self.keys = np.char.upper(np.asarray(pd.Series(keys, dtype=object).astype(str), dtype=str))
+        n_keys = len(self.keys)
+        positions = np.arange(n_keys, dtype=np.int32)
+
+        # Code points of every key, one row per key (NUL padded), packed into gram keys per offset
+        width = self.keys.dtype.itemsize // 4
+        chars = self.keys.view(np.uint32).reshape(n_keys, width).astype(np.int64)
+        lengths = np.char.str_len(self.keys)
+        grams, owners = [], []
+        for n in range(1, MAX_GRAM + 1):
+            for start in range(width - n + 1):
+                fits = lengths >= start + n
+                packed = chars[fits, start]
+                for offset in range(1, n):
+                    packed = packed << CODE_POINT_BITS | chars[fits, start + offset]
+                grams.append(packed)
+                owners.append(positions[fits])
+
+        # One sorted, de-duplicated (gram, key) list; each gram's keys are one contiguous slice
+        codes, uniques = pd.factorize(np.concatenate(grams))
+        stride = max(n_keys, 1)
+        pairs = np.sort(codes.astype(np.int64) * stride + np.concatenate(owners))
+        pairs = pairs[np.diff(pairs, prepend=-1) != 0]
+        self.postings = (pairs % stride).astype(np.int32)
+        bounds = np.searchsorted(pairs // stride, np.arange(len(uniques) + 1)).tolist()
+        self.spans = dict(zip(uniques.tolist(), zip(bounds[:-1], bounds[1:])))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _posting(self, gram):
+        start, stop = self.spans.get(_gram_key(gram), (0, 0))
+        return self.postings[start:stop]
+
+    def lookup(self, query):
+        """Sorted positions of the keys containing query (case-insensitive)"""
+        query = query.upper()
+        if not query:
+            return np.arange(len(self.keys), dtype=np.int32)
+        if len(query) <= MAX_GRAM:
+            return self._posting(query)
+
+        # Every key containing the query contains each of its 3-grams: check the rarest one's keys
+        candidates = min((self._posting(query[i:i + MAX_GRAM]) for i in range(len(query) - MAX_GRAM + 1)), key=len)
+        return candidates[np.char.find(self.keys[candidates], query) >= 0]
+
+    def mask(self, query):
+        """Boolean mask over the keys, True where the key contains query"""
+        mask = np.zeros(len(self.keys), dtype=bool)
+        mask[self.lookup(query)] = True
+        return mask
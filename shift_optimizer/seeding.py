@@ -0,0 +1,57 @@
+"""Process-stable seeding for the simulated planning numbers"""
+import hashlib
+
+import numpy as np
+
+
+def stable_seed(*parts):
+    """64-bit seed derived from the given parts, identical in every process
+    
+    Python's hash() of a string is salted per process, so seeding with it gives different
+    numbers after a restart or on another server worker.
+    """
+    key = "|".join(str(part) for part in parts).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def seeded_rng(*parts):
+    """NumPy Generator seeded with stable_seed(*parts)"""
+    return np.random.default_rng(stable_seed(*parts))
+
+
+# SplitMix64 constants (golden-ratio increment and finalizer multipliers)
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(x):
+    """SplitMix64 finalizer, elementwise over a uint64 array (arithmetic wraps mod 2**64)"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * _MIX_1
+    x = x ^ (x >> np.uint64(27))
+    x = x * _MIX_2
+    return x ^ (x >> np.uint64(31))
+
+
+def stable_seed_grid(row_parts, column_parts, *parts):
+    """Seeds shaped (row, column), one per pair, each depending only on its own row and column
+    
+    Equivalent in purpose to stable_seed(*parts, row, column) for every pair, but hashes
+    each row and column once and mixes them as arrays.
+    """
+    rows = np.array([stable_seed(*parts, "row", part) for part in row_parts], dtype=np.uint64)
+    columns = np.array([stable_seed(*parts, "column", part) for part in column_parts], dtype=np.uint64)
+    return _splitmix64(rows[:, None] ^ _splitmix64(columns[None, :]))
+
+
+def stable_uniform(seeds, n):
+    """n floats in [0, 1) per seed, shaped seeds.shape + (n,)
+    
+    Counter-based (SplitMix64 of seed + i * gamma), so each seed's draws depend only
+    on that seed and a whole grid of seeds is drawn without one Generator per seed.
+    """
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    counters = np.arange(1, n + 1, dtype=np.uint64) * _GOLDEN_GAMMA
+    bits = _splitmix64(seeds[..., None] + counters)
+    return (bits >> np.uint64(11)).astype(np.float64) * 2.0**-53
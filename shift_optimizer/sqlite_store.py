@@ -0,0 +1,190 @@
+"""SQLite roster backend with the EmployeeStore interface
+
+Roster assignments and punches live in one indexed table in a local SQLite file, so a
+roster larger than memory can back the app and filters run as indexed SQL instead of
+pandas masks. Connections come from a small thread-safe pool and the database runs in
+WAL mode, so concurrent Streamlit sessions read in parallel instead of queueing on
+one connection.
+
+Create a database from the sample roster (or a synthetic one) with:
+
+    python -m shift_optimizer.sqlite_store roster.db
+    python -m shift_optimizer.sqlite_store roster.db --synthetic --employees-per-shift 200
+"""
+import argparse
+import contextlib
+import queue
+import sqlite3
+
+import pandas as pd
+
+from .store import OPTION_COLUMNS, EmployeeStore
+
+TABLE = "roster"
+DEFAULT_SHIFTS = ["1st", "2nd", "3rd"]
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shareable across threads
+
+    connection() blocks until one is free (up to timeout seconds), so a burst of
+    sessions waits briefly instead of opening unbounded connections.
+    """
+
+    def __init__(self, path, size=4, timeout=30.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._idle.put(self._connect())
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextlib.contextmanager
+    def connection(self):
+        connection = self._idle.get(timeout=self.timeout)
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class SQLiteEmployeeStore:
+    """Roster store backed by an indexed SQLite table
+
+    filter() has the same arguments and returns the same DataFrame (categorical
+    columns, original roster order) as EmployeeStore.filter, with every predicate
+    evaluated by SQLite.
+    """
+
+    CATEGORICAL_COLUMNS = EmployeeStore.CATEGORICAL_COLUMNS
+
+    def __init__(self, path, pool_size=4):
+        self.path = str(path)
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as connection:
+            self.columns = [row[1] for row in connection.execute(f"PRAGMA table_info({TABLE})")]
+
+    @classmethod
+    def create(cls, frame, path, pool_size=4):
+        """Write a roster frame to path (replacing any roster there) and open it"""
+        with contextlib.closing(sqlite3.connect(str(path))) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            frame.to_sql(TABLE, connection, if_exists='replace', index=False, chunksize=50_000)
+            connection.execute(f"CREATE INDEX {TABLE}_lookup ON {TABLE} (Department, Date, Shift)")
+            if 'Location' in frame.columns:
+                connection.execute(f"CREATE INDEX {TABLE}_location_lookup ON {TABLE} (Location, Department, Date, Shift)")
+            connection.execute(f"ANALYZE {TABLE}")
+            connection.commit()
+        return cls(path, pool_size=pool_size)
+
+    def _query(self, sql, params=()):
+        with self.pool.connection() as connection:
+            return pd.read_sql_query(sql, connection, params=params)
+
+    def __len__(self):
+        with self.pool.connection() as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+    def _where(self, department, dates=None, shifts=None, worker_types=None, employee_id=None,
+               schedules=None, roster_buckets=None):
+        """WHERE clause and parameters for the filter() arguments"""
+        shifts = shifts if shifts else DEFAULT_SHIFTS
+        clauses, params = ["Department = ?"], [department]
+
+        for column, allowed in (('Date', dates), ('Shift', shifts), ('Worker Type', worker_types),
+                                ('Workday Schedule', schedules), ('Roster Bucket', roster_buckets)):
+            if allowed:
+                allowed = list(allowed)
+                clauses.append(f"{_quote(column)} IN ({_placeholders(allowed)})")
+                params.extend(allowed)
+
+        if employee_id:
+            clauses.append('instr(upper("Employee ID"), ?) > 0')
+            params.append(employee_id.upper())
+
+        return " AND ".join(clauses), params
+
+    def filter(self, department, dates=None, shifts=None, worker_types=None, employee_id=None,
+               schedules=None, roster_buckets=None):
+        """Return the matching roster rows as a DataFrame, filtered by an indexed query"""
+        where, params = self._where(department, dates, shifts, worker_types, employee_id, schedules, roster_buckets)
+        return self._roster_frame(f"SELECT * FROM {TABLE} WHERE {where} ORDER BY rowid", params)
+
+    def page(self, department, dates=None, shifts=None, worker_types=None, employee_id=None,
+             schedules=None, roster_buckets=None, sort_by=None, ascending=True, offset=0, limit=None):
+        """One sorted page of the matching rows (ORDER BY ... LIMIT/OFFSET) and the total number of matches"""
+        if sort_by is not None and sort_by not in self.columns:
+            raise ValueError(f"Unknown roster column: {sort_by!r}")
+        where, params = self._where(department, dates, shifts, worker_types, employee_id, schedules, roster_buckets)
+
+        order = "rowid"
+        if sort_by is not None:
+            order = f"{_quote(sort_by)} IS NULL, {_quote(sort_by)} {'ASC' if ascending else 'DESC'}, rowid"
+        frame = self._roster_frame(
+            f"SELECT * FROM {TABLE} WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            [*params, -1 if limit is None else limit, offset],
+        )
+        with self.pool.connection() as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE {where}", params).fetchone()[0]
+        return frame, total
+
+    def _roster_frame(self, sql, params):
+        """Query result with the EmployeeStore dtypes (categoricals, boolean punches)"""
+        frame = self._query(sql, params)
+        for column in self.CATEGORICAL_COLUMNS:
+            if column in frame.columns:
+                frame[column] = frame[column].astype('category')
+        if 'Punched_In' in frame.columns:
+            # SQLite has no boolean type; punches are stored as 0/1
+            frame['Punched_In'] = frame['Punched_In'].astype(bool)
+        return frame
+
+    def filter_options(self, department, dates=None, shifts=None):
+        """Sorted distinct Worker Type / Workday Schedule / Roster Bucket values for the selection"""
+        where, params = self._where(department, dates, shifts)
+        options = {}
+        for key, column in OPTION_COLUMNS.items():
+            rows = self._query(f"SELECT DISTINCT {_quote(column)} AS value FROM {TABLE} WHERE {where} ORDER BY value", params)
+            options[key] = rows['value'].dropna().tolist()
+        return options
+
+
+def main(argv=None):
+    from .sample_data import build_sample_store
+    from .synthetic import generate_roster
+
+    parser = argparse.ArgumentParser(description="Write a roster to a SQLite database for SHIFT_OPTIMIZER_ROSTER_PATH")
+    parser.add_argument('path', help='database file; an existing roster table is replaced')
+    parser.add_argument('--synthetic', action='store_true', help='write a synthetic roster instead of the sample')
+    parser.add_argument('--locations', type=int, default=1)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--employees-per-shift', type=float, default=30)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        frame = generate_roster(locations=args.locations, days=args.days, employees_per_shift=args.employees_per_shift)
+    else:
+        frame = build_sample_store().to_frame()
+    store = SQLiteEmployeeStore.create(frame, args.path)
+    print(f"Wrote {len(store)} roster rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
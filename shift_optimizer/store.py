@@ -0,0 +1,175 @@
+"""Columnar, indexed employee roster, normalized into employees and daily assignments"""
+import numpy as np
+import pandas as pd
+
+from .search import SubstringIndex
+
+# Columns offered as roster-detail filter options, keyed by the filter() argument
+OPTION_COLUMNS = {
+    'worker_types': 'Worker Type',
+    'schedules': 'Workday Schedule',
+    'roster_buckets': 'Roster Bucket',
+}
+
+
+class EmployeeStore:
+    """Columnar roster store with categorical columns and a (Department, Date, Shift) index
+
+    The roster is kept normalized: `employees` holds one row per Employee ID with the
+    attributes that don't change from day to day (name, hire date, worker type,
+    manager, ...), and `assignments` holds one row per rostered day with the employee's
+    row number, categorical date/shift codes and the punch fields as integers (hours
+    worked in hundredths). filter() joins the two only for the rows it returns, so
+    memory grows with the employee count, not with employees × days.
+    """
+
+    CATEGORICAL_COLUMNS = ['Date', 'Day of Week', 'Shift', 'Worker Type', 'Workday Schedule',
+                           'Department', 'Manager', 'Roster Bucket']
+
+    # Attributes moved to the employee table when every row of an employee agrees on them
+    EMPLOYEE_COLUMNS = ['Employee Name', 'Hire Date', 'Worker Type', 'Workday Schedule', 'Department',
+                        'Manager', 'Roster Bucket', 'Location']
+
+    def __init__(self, frame):
+        frame = frame.reset_index(drop=True)
+        for column in self.CATEGORICAL_COLUMNS:
+            if column in frame.columns:
+                frame[column] = frame[column].astype('category')
+        self.columns = list(frame.columns)
+
+        employee_idx, employee_ids = pd.factorize(frame['Employee ID'])
+        self.employee_idx = employee_idx.astype(np.int32)
+        first_rows = np.unique(self.employee_idx, return_index=True)[1]
+
+        per_employee = [column for column in self.EMPLOYEE_COLUMNS if column in frame.columns]
+        if per_employee:
+            varying = frame[per_employee].apply(lambda values: pd.factorize(values)[0]).groupby(self.employee_idx).nunique().max()
+            per_employee = [column for column in per_employee if varying[column] <= 1]
+
+        self.employees = frame[['Employee ID', *per_employee]].take(first_rows).reset_index(drop=True)
+        self.assignments = frame.drop(columns=['Employee ID', *per_employee])
+        if 'Hours_Worked' in self.assignments.columns:
+            hours = self.assignments['Hours_Worked'].fillna(0).to_numpy()
+            self.assignments['Hours_Worked'] = np.rint(hours * 100).astype(np.int32)
+
+        # Backing array of every roster column and whether it is indexed by employee or by assignment row
+        self._arrays = {
+            column: (self.employees[column].array, True) if column in self.employees.columns
+            else (self.assignments[column].array, False)
+            for column in self.columns
+        }
+
+        # Row positions for every (Department, Date, Shift) combination, built once
+        keys = {column: pd.Categorical.from_codes(*self._codes(column, slice(None))) for column in ('Department', 'Date', 'Shift')}
+        groups = pd.DataFrame(keys).groupby(['Department', 'Date', 'Shift'], observed=True, sort=False).indices
+        self.index = {key: rows.astype(np.int32) for key, rows in groups.items()}
+
+        # N-gram index over the IDs, one entry per employee, so an Employee ID search is a lookup, not a scan
+        self.employee_id_index = SubstringIndex(employee_ids)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build the store from a list of roster dicts"""
+        return cls(pd.DataFrame.from_records(records))
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def _column(self, column, positions):
+        """One roster column for the given assignment rows, joined from the employee table if needed"""
+        values, per_employee = self._arrays[column]
+        values = values.take(self.employee_idx[positions] if per_employee else positions)
+        return values / 100 if column == 'Hours_Worked' else values
+
+    def _codes(self, column, positions):
+        """Category codes and categories of a categorical column for the given assignment rows"""
+        source = self.employees if column in self.employees.columns else self.assignments
+        rows = self.employee_idx[positions] if source is self.employees else positions
+        return source[column].cat.codes.to_numpy()[rows], source[column].cat.categories
+
+    def _rows(self, positions):
+        """Wide roster DataFrame (original column order) for the given assignment rows"""
+        return pd.DataFrame({column: self._column(column, positions) for column in self.columns})
+
+    def to_frame(self):
+        """The whole roster as one wide DataFrame"""
+        return self._rows(np.arange(len(self)))
+
+    def positions(self, department, dates=None, shifts=None):
+        """Row positions for a department, optionally limited to dates and shifts (index lookups only)"""
+        shifts = shifts if shifts else ["1st", "2nd", "3rd"]
+
+        if dates:
+            keys = [(department, date, shift) for date in dates for shift in shifts]
+        else:
+            keys = [key for key in self.index if key[0] == department and key[2] in shifts]
+
+        blocks = [self.index[key] for key in keys if key in self.index]
+        if not blocks:
+            return np.empty(0, dtype=np.intp)
+
+        # Keep the original roster order
+        return np.sort(np.concatenate(blocks))
+
+    def matching(self, department, dates=None, shifts=None, worker_types=None, employee_id=None,
+                 schedules=None, roster_buckets=None):
+        """Row positions matching every filter, in roster order (nothing is materialized)"""
+        positions = self.positions(department, dates, shifts)
+        mask = np.ones(len(positions), dtype=bool)
+
+        for column, allowed in (('Worker Type', worker_types),
+                                ('Workday Schedule', schedules),
+                                ('Roster Bucket', roster_buckets)):
+            if allowed and len(positions):
+                codes, categories = self._codes(column, positions)
+                allowed_codes = categories.get_indexer(list(allowed))
+                mask &= np.isin(codes, allowed_codes[allowed_codes >= 0])
+
+        if employee_id and len(positions):
+            mask &= self.employee_id_index.mask(employee_id)[self.employee_idx[positions]]
+
+        return positions[mask]
+
+    def filter(self, department, dates=None, shifts=None, worker_types=None, employee_id=None,
+               schedules=None, roster_buckets=None):
+        """Return the matching roster rows as a DataFrame using index lookups plus vectorized masks"""
+        return self._rows(self.matching(department, dates, shifts, worker_types, employee_id, schedules, roster_buckets))
+
+    def _sort_key(self, column, positions, ascending=True):
+        """Integer keys ordering the given rows by column value, missing values last either way"""
+        values, per_employee = self._arrays[column]
+        rows = self.employee_idx[positions] if per_employee else positions
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Rank of each category label; code -1 (missing) picks the trailing rank
+            missing = len(values.categories)
+            keys = np.append(np.argsort(np.argsort(values.categories)), missing)[values.codes[rows]]
+        else:
+            keys, uniques = pd.Series(values.take(rows)).factorize(sort=True)
+            missing = len(uniques)
+            keys = np.where(keys >= 0, keys, missing)
+        return keys if ascending else np.where(keys < missing, missing - 1 - keys, missing)
+
+    def page(self, department, dates=None, shifts=None, worker_types=None, employee_id=None,
+             schedules=None, roster_buckets=None, sort_by=None, ascending=True, offset=0, limit=None):
+        """One sorted page of the matching rows and the total number of matches
+
+        Filters and sorting run on codes for all matches; only the offset:offset+limit
+        slice is joined into a DataFrame. Ties keep roster order.
+        """
+        if sort_by is not None and sort_by not in self._arrays:
+            raise ValueError(f"Unknown roster column: {sort_by!r}")
+        positions = self.matching(department, dates, shifts, worker_types, employee_id, schedules, roster_buckets)
+        if sort_by is not None and len(positions):
+            positions = positions[np.argsort(self._sort_key(sort_by, positions, ascending), kind='stable')]
+        stop = None if limit is None else offset + limit
+        return self._rows(positions[offset:stop]), len(positions)
+
+    def filter_options(self, department, dates=None, shifts=None):
+        """Sorted distinct Worker Type / Workday Schedule / Roster Bucket values for the selection"""
+        positions = self.positions(department, dates, shifts)
+        options = {}
+        for key, column in OPTION_COLUMNS.items():
+            codes, categories = self._codes(column, positions)
+            used = np.unique(codes[codes >= 0])
+            options[key] = sorted(categories[used].tolist())
+        return options
@@ -0,0 +1,129 @@
+"""Vectorized synthetic rosters and punches for load tests and benchmarks
+
+Every column is drawn as a NumPy array in one pass (no per-row Python), and string
+columns are emitted as pandas Categoricals, so millions of roster rows take seconds
+and stay compact in memory.
+"""
+import numpy as np
+import pandas as pd
+
+from .punches import simulate_punch_columns
+from .sample_data import DEFAULT_DEPARTMENTS
+from .store import EmployeeStore
+
+DEFAULT_LOCATIONS = ["AZ Goodyear", "IL Aurora", "AZ Phoenix", "IL Lake Zurich", "IL Burr Ridge"]
+
+SHIFTS = ['1st', '2nd', '3rd']
+SHIFT_SCHEDULES = ['06:00-14:00', '14:00-22:00', '22:00-06:00']
+
+# Worker-type mix with the roster bucket and hire-date age range (days before the first date)
+WORKER_TYPES = ['FTE', 'TEMP', 'NEW HIRES', 'FLEX', 'WW/GS']
+WORKER_TYPE_SHARES = [0.55, 0.25, 0.08, 0.08, 0.04]
+WORKER_TYPE_BUCKETS = ['Active', 'Active', 'Training', 'Flexible', 'Flexible']
+WORKER_TYPE_ID_PREFIXES = ['EMP', 'TMP', 'NEW', 'FLX', 'WWG']
+HIRE_AGE_DAYS = np.array([[180, 3650], [0, 120], [0, 14], [90, 1095], [30, 730]])
+
+FIRST_NAMES = ['John', 'Mary', 'Mike', 'Carlos', 'Lisa', 'David', 'Amanda', 'Jennifer', 'Robert', 'Patricia',
+               'James', 'Emma', 'Kevin', 'Rachel', 'Anthony', 'Stephanie', 'Daniel', 'Maria', 'Christopher', 'Jessica',
+               'Thomas', 'Nicole', 'Brian', 'Matthew', 'Ashley', 'Ryan', 'Michelle', 'Steven', 'Jonathan', 'Samantha',
+               'Gregory', 'Kimberly', 'Eric', 'Catherine', 'Sarah', 'Michael', 'Linda', 'Janet', 'Kim', 'Chang']
+LAST_NAMES = ['Smith', 'Davis', 'Wilson', 'Rodriguez', 'Brown', 'Garcia', 'Taylor', 'Lee', 'Martinez', 'White',
+              'Johnson', 'Chen', 'Adams', 'Gonzalez', 'Moore', 'Anderson', 'Clark', 'Thompson', 'Miller', 'Lopez',
+              'Kim', 'Chang', 'Nguyen', 'Patel', 'Young', 'King', 'Wright', 'Scott', 'Green', 'Baker']
+
+
+def _pad_names(count, defaults, label):
+    """The first count defaults, then generated '<label> NN' names"""
+    names = list(defaults[:count])
+    names += [f"{label} {i + 1:02d}" for i in range(len(names), count)]
+    return names
+
+
+def _resolve(value, defaults, label):
+    return _pad_names(value, defaults, label) if isinstance(value, int) else list(value)
+
+
+def generate_roster(locations=1, departments=7, days=7, employees_per_shift=30, start_date="2026-02-12",
+                    workday_rate=5 / 7, seed=0):
+    """Synthetic roster with punches for locations × departments × days
+
+    Each (location, department, shift) gets a Poisson(employees_per_shift) team with a
+    fixed worker type, schedule, hire date, name and the department's manager. Every
+    employee is rostered on each day with probability workday_rate. Expect about
+    locations × departments × 3 × employees_per_shift × days × workday_rate rows.
+
+    Args:
+        locations: Number of locations or a list of names (defaults first, then generated)
+        departments: Number of departments or a list of names
+        days: Number of consecutive dates starting at start_date
+        employees_per_shift: Mean team size per location/department/shift
+        start_date: First roster date
+        workday_rate: Chance that an employee works a given day
+        seed: Seed for the NumPy Generator; the same arguments give the same roster
+
+    Returns:
+        DataFrame with the EmployeeStore roster columns plus Location and the punch
+        columns; string columns are Categoricals, rows ordered by date
+    """
+    rng = np.random.default_rng(seed)
+    location_names = _resolve(locations, DEFAULT_LOCATIONS, "Location")
+    department_names = _resolve(departments, list(DEFAULT_DEPARTMENTS), "Department")
+    dates = pd.date_range(start_date, periods=days, freq='D')
+    n_locations, n_departments = len(location_names), len(department_names)
+
+    # Employees: one team per (location, department, shift)
+    team_sizes = np.maximum(rng.poisson(employees_per_shift, n_locations * n_departments * len(SHIFTS)), 1)
+    team = np.repeat(np.arange(len(team_sizes)), team_sizes)
+    n_employees = len(team)
+    location_idx, department_idx, shift_idx = np.unravel_index(team, (n_locations, n_departments, len(SHIFTS)))
+
+    type_idx = rng.choice(len(WORKER_TYPES), n_employees, p=WORKER_TYPE_SHARES)
+    age_low, age_high = HIRE_AGE_DAYS[type_idx, 0], HIRE_AGE_DAYS[type_idx, 1]
+    hire_age = age_low + (rng.random(n_employees) * (age_high - age_low + 1)).astype(int)
+    name_idx = rng.integers(0, len(FIRST_NAMES) * len(LAST_NAMES), n_employees)
+
+    # One manager per (location, department), drawn from the same name pool
+    full_names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    manager_idx = rng.integers(0, len(full_names), n_locations * n_departments)[location_idx * n_departments + department_idx]
+
+    prefixes = np.array(WORKER_TYPE_ID_PREFIXES)[type_idx]
+    employee_ids = [f"{prefix}{serial:07d}" for prefix, serial in zip(prefixes.tolist(), range(n_employees))]
+    hire_codes, hire_dates = pd.factorize((dates[0] - pd.to_timedelta(hire_age, unit='D')).strftime("%Y-%m-%d"))
+    bucket_codes, bucket_names = pd.factorize(pd.Index(WORKER_TYPE_BUCKETS))
+    weekday_codes, weekday_names = pd.factorize(dates.day_name())
+
+    # Roster rows: (day, employee) pairs the employee works, ordered by date
+    day_idx, employee_idx = np.nonzero(rng.random((days, n_employees)) < workday_rate)
+
+    def categorical(codes, categories):
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    date_labels = dates.strftime("%Y-%m-%d")
+    row_type_idx = type_idx[employee_idx]
+    row_shift_idx = shift_idx[employee_idx]
+
+    frame = pd.DataFrame({
+        'Location': categorical(location_idx[employee_idx], location_names),
+        'Date': categorical(day_idx, date_labels),
+        'Day of Week': categorical(weekday_codes[day_idx], weekday_names),
+        'Shift': categorical(row_shift_idx, SHIFTS),
+        'Worker Type': categorical(row_type_idx, WORKER_TYPES),
+        'Employee ID': categorical(employee_idx, employee_ids),
+        'Employee Name': categorical(name_idx[employee_idx], full_names),
+        'Hire Date': categorical(hire_codes[employee_idx], hire_dates),
+        'Workday Schedule': categorical(row_shift_idx, SHIFT_SCHEDULES),
+        'Department': categorical(department_idx[employee_idx], department_names),
+        'Manager': categorical(manager_idx[employee_idx], full_names),
+        'Roster Bucket': categorical(bucket_codes[row_type_idx], bucket_names),
+    })
+
+    punches = simulate_punch_columns(frame['Worker Type'], frame['Workday Schedule'], rng)
+    for column, values in punches.items():
+        frame[column] = values
+
+    return frame
+
+
+def generate_store(**kwargs):
+    """EmployeeStore over generate_roster(**kwargs)"""
+    return EmployeeStore(generate_roster(**kwargs))
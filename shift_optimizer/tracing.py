@@ -0,0 +1,174 @@
+"""Nested trace spans written to a Chrome trace file for offline profiling
+
+Set SHIFT_OPTIMIZER_TRACE to a file path to enable. Every span() block and @traced
+function call becomes a complete ("X") event with its duration, rows processed and
+the fields of the enclosing trace_context() (session, run, location, week, dates,
+shifts, ...). The file is a JSON array that is appended to as spans close and never
+closed, which Perfetto (ui.perfetto.dev) and chrome://tracing both accept, so a
+trace can be opened while the server is still running.
+
+When tracing is off, span() returns a shared no-op object and a @traced function
+adds one global lookup per call.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+TRACE_PATH_ENV = "SHIFT_OPTIMIZER_TRACE"
+
+_tracer = None
+_context = contextvars.ContextVar("trace_context", default=None)
+
+
+class ChromeTraceWriter:
+    """Thread-safe appender of Chrome trace events, one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._named_threads = set()
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if new_file:
+            self._file.write("[\n")
+        self._write({'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                     'args': {'name': f"shift_optimizer ({self.pid})"}})
+
+    def _write(self, event):
+        self._file.write(json.dumps(event, default=str) + ",\n")
+        self._file.flush()
+
+    def complete(self, name, category, ts, dur, args):
+        """Write one complete event; ts and dur in microseconds"""
+        thread = threading.current_thread()
+        with self._lock:
+            if thread.ident not in self._named_threads:
+                self._named_threads.add(thread.ident)
+                self._write({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': thread.ident,
+                             'args': {'name': thread.name}})
+            self._write({'name': name, 'cat': category, 'ph': 'X', 'ts': ts, 'dur': dur,
+                         'pid': self.pid, 'tid': thread.ident, 'args': args})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Span:
+    """One timed block; set() adds fields (rows=...) to the event before it is written
+
+    The trace context is merged in when the span closes, so fields annotated while
+    it is open (the location chosen inside a rerun) land on the enclosing span too.
+    """
+
+    __slots__ = ('name', 'category', 'args', 'context', '_ts', '_start')
+
+    def __init__(self, name, category, args, context=None):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.context = context
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self._ts = time.time_ns() // 1000
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = (time.perf_counter_ns() - self._start) / 1000
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        tracer = _tracer
+        if tracer is not None:
+            args = {**self.context, **self.args} if self.context else self.args
+            tracer.complete(self.name, self.category, self._ts, duration, args)
+        return False
+
+
+class _NullSpan:
+    """Span stand-in while tracing is off"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def configure_tracing(path):
+    """Write spans to path from now on, or stop tracing when path is None"""
+    global _tracer
+    previous, _tracer = _tracer, ChromeTraceWriter(path) if path else None
+    if previous is not None:
+        previous.close()
+
+
+def tracing_enabled():
+    return _tracer is not None
+
+
+def span(name, category="app", **args):
+    """Trace the enclosed block as a span named name (no-op when tracing is off)"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(name, category, args, _context.get())
+
+
+def traced(func=None, *, name=None, rows=None):
+    """Decorator tracing each call as a span named after the function
+
+    rows, if given, maps the return value to the number of rows processed
+    (e.g. rows=len), recorded on the span.
+    """
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with span(label, func.__module__) as active:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    active.set(rows=rows(result))
+                return result
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+@contextlib.contextmanager
+def trace_context(**fields):
+    """Add fields to every span opened inside the block (merged over any outer context)"""
+    token = _context.set({**(_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def add_trace_context(**fields):
+    """Add fields to the innermost trace_context() for the rest of its block"""
+    context = _context.get()
+    if context is not None:
+        context.update(fields)
+
+
+configure_tracing(os.environ.get(TRACE_PATH_ENV))